@@ -3,41 +3,134 @@ from aio_pika import connect_robust, IncomingMessage
 from aio_pika.exceptions import ConnectionClosed, ChannelClosed  # type: ignore
 import json
 import asyncio
+import os
+import socket
+from typing import Any, Dict, Optional
 
 from fastapi import FastAPI
 
+from events.dispatcher import AckBatcher, MessageDispatcher
+
 from service.gateway_service import GatewayService
+from service.rendezvous import CORRELATION_ID_HEADER
 
-from utils.logger import logger_config
+from utils import json_codec
+from utils.logger import logger_config, payload_preview, should_log_payload
 from utils.config import get_settings
+from utils.tracing import tracing
 
 log = logger_config(__name__)
 settings = get_settings()
 
+FANOUT_ROUTING = "fanout"
+DIRECT_ROUTING = "direct"
+
+
+def default_replica_id() -> str:
+    """
+    REPLICA_ID names the pod; with several workers in it each needs its own
+    exclusive reply queue, so the pid is appended.
+    """
+    if not settings.REPLICA_ID:
+        return f"{socket.gethostname()}-{os.getpid()}"
+    if settings.APP_WORKERS > 1:
+        return f"{settings.REPLICA_ID}-{os.getpid()}"
+    return settings.REPLICA_ID
+
 
 class Consumer:
     def __init__(
         self,
         connection: aio_pika.abc.AbstractRobustConnection,
         exchange_name: str = settings.EXCHANGE_NAME,
+        routing_mode: str = settings.EVENT_ROUTING_MODE,
+        reply_exchange_name: str = settings.REPLY_EXCHANGE_NAME,
+        replica_id: Optional[str] = None,
+        subscribe_broadcasts: bool = settings.EVENT_BROADCAST_SUBSCRIPTION,
     ):
+        if routing_mode not in (FANOUT_ROUTING, DIRECT_ROUTING):
+            raise ValueError(f"Unknown event routing mode: {routing_mode}")
         self.exchange_name = exchange_name
+        self.routing_mode = routing_mode
+        self.reply_exchange_name = reply_exchange_name
+        self.replica_id = replica_id or default_replica_id()
         self.connection = connection
         self.channel = None
         self.exchange = None
         self.queue = None
+        self.dispatcher = MessageDispatcher(
+            self._handle,
+            workers=settings.CONSUMER_WORKERS,
+            queue_size=settings.CONSUMER_PREFETCH_COUNT,
+            ack_batcher=AckBatcher(
+                batch_size=settings.CONSUMER_ACK_BATCH_SIZE,
+                interval=settings.CONSUMER_ACK_INTERVAL_MS / 1000,
+            ),
+        )
+        self.subscribe_broadcasts = (
+            routing_mode == DIRECT_ROUTING and subscribe_broadcasts
+        )
+        self.broadcast_channel = None
+        self.broadcast_queue = None
+        # Own channel and acks: multiple-acks on the reply channel must not
+        # cover broadcast deliveries that are still being applied
+        self.broadcast_dispatcher = MessageDispatcher(
+            self._handle_broadcast,
+            workers=1,
+            queue_size=settings.CONSUMER_PREFETCH_COUNT,
+            ack_batcher=AckBatcher(
+                batch_size=settings.CONSUMER_ACK_BATCH_SIZE,
+                interval=settings.CONSUMER_ACK_INTERVAL_MS / 1000,
+            ),
+        )
+
+    @property
+    def reply_to(self) -> Optional[str]:
+        """
+        Routing key upstreams may reply to this replica with, None in fanout mode.
+        """
+        if self.routing_mode == DIRECT_ROUTING:
+            return f"{settings.QUEUE_NAME}.{self.replica_id}"
+        return None
 
     async def connect(self):
+        """
+        In fanout mode the queue is bound to the fanout exchange and every replica
+        handles every event. In direct mode it is bound only to the reply exchange
+        under `reply_to`, so only this replica gets the events its requests wait
+        for; upstreams must honour X-Reply-To. Broadcasts on the fanout exchange
+        then go to a separate queue that only updates the directory, team views
+        and team update streams, unless `subscribe_broadcasts` is off.
+        """
         self.channel = await self.connection.channel()
+        await self.channel.set_qos(prefetch_count=settings.CONSUMER_PREFETCH_COUNT)
         self.exchange = await self.channel.declare_exchange(
             self.exchange_name, aio_pika.ExchangeType.FANOUT, durable=True
         )
-        self.queue = await self.channel.declare_queue(exclusive=True, durable=True)
-        await self.queue.bind(self.exchange)
+        if self.routing_mode == DIRECT_ROUTING:
+            self.queue = await self.channel.declare_queue(
+                self.reply_to, exclusive=True, auto_delete=True
+            )
+            reply_exchange = await self.channel.declare_exchange(
+                self.reply_exchange_name, aio_pika.ExchangeType.DIRECT, durable=True
+            )
+            await self.queue.bind(reply_exchange, routing_key=self.reply_to)
+        else:
+            self.queue = await self.channel.declare_queue(exclusive=True, durable=True)
+            await self.queue.bind(self.exchange)
         if not self.queue:
             raise ConnectionError(
                 f"Failed to declare and bind queue to {self.exchange_name}"
             )
+        if self.subscribe_broadcasts:
+            self.broadcast_channel = await self.connection.channel()
+            await self.broadcast_channel.set_qos(
+                prefetch_count=settings.CONSUMER_PREFETCH_COUNT
+            )
+            self.broadcast_queue = await self.broadcast_channel.declare_queue(
+                exclusive=True
+            )
+            await self.broadcast_queue.bind(self.exchange)
 
     async def consume(self, app: FastAPI):
         while True:
@@ -45,34 +138,113 @@ class Consumer:
                 if not self.queue:
                     await self.connect()
                 if self.queue:
+                    if self.broadcast_queue:
+                        self.broadcast_dispatcher.start()
+                        await self.broadcast_queue.consume(
+                            lambda message: self.broadcast_dispatcher.submit(
+                                app, message
+                            ),
+                            no_ack=False,
+                        )
+                    self.dispatcher.start()
                     await self.queue.consume(
                         lambda message: self._callback(app, message), no_ack=False
                     )
-                    log.info(f"Starting to consume messages from {self.exchange_name}")
+                    log.info(
+                        "Starting to consume messages from %s (%s)",
+                        self.exchange.name,
+                        self.routing_mode,
+                    )
                     break
             except (ConnectionClosed, ChannelClosed) as e:
-                log.error(f"Connection closed, retrying... {e}")
+                log.error("Connection closed, retrying... %s", e)
                 await asyncio.sleep(5)
                 await self.connect()
 
     async def _callback(self, app: FastAPI, message: IncomingMessage):
-        async with message.process():
-            try:
-                message_data = json.loads(message.body.decode("utf-8"))
-                log.info(f"Received message: {message_data}")
-                await GatewayService.handle_message(app, message_data)
-            except json.JSONDecodeError as e:
-                log.error(
-                    f"Failed to decode message: {message.body.decode('utf-8')} - Error: {e}"
-                )
+        await self.dispatcher.submit(app, message)
+
+    @staticmethod
+    def _decode(message: IncomingMessage) -> Optional[Dict[str, Any]]:
+        try:
+            message_data = json_codec.loads(message.body)
+        except json.JSONDecodeError as e:
+            log.error(
+                "Failed to decode message: %s - Error: %s",
+                payload_preview(message.body.decode("utf-8", errors="replace")),
+                e,
+            )
+            return None
+        if should_log_payload(log):
+            log.debug("Received message: %s", payload_preview(message_data))
+        if not isinstance(message_data, dict):
+            log.error(
+                "Discarding message that is not a JSON object: %s",
+                payload_preview(message_data),
+            )
+            return None
+        return message_data
+
+    async def _handle_broadcast(self, app: FastAPI, message: IncomingMessage):
+        message_data = self._decode(message)
+        if message_data is not None:
+            GatewayService.apply_broadcast(
+                message_data["event_type"], message_data["data"]
+            )
+
+    async def _handle(self, app: FastAPI, message: IncomingMessage):
+        message_data = self._decode(message)
+        if message_data is not None:
+            correlation_id = self._correlation_id(message, message_data)
+            # Continues the trace of whoever published the event, when propagated
+            with tracing.span(
+                f"process {message_data.get('event_type')}",
+                {
+                    "messaging.system": "rabbitmq",
+                    "messaging.operation.type": "process",
+                    "messaging.destination.name": self.exchange.name
+                    if self.exchange
+                    else None,
+                    "messaging.message.conversation_id": correlation_id,
+                },
+                kind="consumer",
+                context=tracing.extract(message.headers),
+            ):
+                await GatewayService.handle_message(app, message_data, correlation_id)
+
+    @staticmethod
+    def _correlation_id(message: IncomingMessage, message_data: Any) -> Optional[str]:
+        if message.correlation_id:
+            return message.correlation_id
+        if isinstance(message_data, dict) and message_data.get("correlation_id"):
+            return message_data["correlation_id"]
+        headers = message.headers or {}
+        for name in (CORRELATION_ID_HEADER, CORRELATION_ID_HEADER.lower()):
+            value = headers.get(name)
+            if value:
+                return value.decode() if isinstance(value, bytes) else str(value)
+        return None
+
+    def stats(self):
+        stats = self.dispatcher.stats()
+        if self.broadcast_queue:
+            stats["broadcast"] = self.broadcast_dispatcher.stats()
+        return stats
 
     async def close(self):
+        await self.dispatcher.stop()
+        await self.broadcast_dispatcher.stop()
         if self.connection:
             await self.connection.close()
             log.info("Connection closed")
 
 
 async def start_consumer(loop, app: FastAPI) -> Consumer:
+    """
+    Runs in every worker's lifespan. Each worker declares its own exclusive queue
+    (fanout) or reply queue keyed by replica and pid (direct), so events reach the
+    process whose requests are waiting for them.
+    """
     connection = await connect_robust(
         host=settings.BROKER_HOST,
         port=settings.BROKER_PORT,
@@ -84,5 +256,7 @@ async def start_consumer(loop, app: FastAPI) -> Consumer:
     )
     consumer = Consumer(connection)
     await consumer.connect()
+    GatewayService.reply_to = consumer.reply_to
+    log.info("Consumer started for replica %s", consumer.replica_id)
     asyncio.create_task(consumer.consume(app))
     return consumer
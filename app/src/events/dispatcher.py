@@ -0,0 +1,185 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from aio_pika import IncomingMessage
+
+from utils.logger import logger_config
+from utils.metrics import (
+    CONSUMER_FAILED,
+    CONSUMER_HANDLED,
+    CONSUMER_HANDLER_LATENCY,
+    CONSUMER_IN_FLIGHT,
+    CONSUMER_QUEUE_DEPTH,
+)
+
+log = logger_config(__name__)
+
+
+class AckBatcher:
+    """
+    Acknowledges handled messages with a single multiple-ack per batch.
+    Messages can finish out of order, so only the contiguous prefix of handled
+    deliveries is acked; later ones wait until the earlier ones are done.
+    Delivery tags are per channel: when a reconnect replaces the channel, the
+    deliveries still tracked for the old one are forgotten (the broker redelivers them).
+    """
+
+    def __init__(self, batch_size: int, interval: float):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.acks_sent = 0
+        self.messages_acked = 0
+        self._outstanding: OrderedDict[Optional[int], IncomingMessage] = OrderedDict()
+        self._completed: Set[Optional[int]] = set()
+        self._timer: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self._channel: Any = None
+
+    @property
+    def outstanding(self) -> int:
+        return len(self._outstanding)
+
+    def track(self, message: IncomingMessage) -> None:
+        if message.channel is not self._channel:
+            if self._outstanding:
+                log.warning(
+                    "Channel replaced, dropping %s unacked deliveries",
+                    len(self._outstanding),
+                )
+            self.reset()
+            self._channel = message.channel
+        self._outstanding[message.delivery_tag] = message
+
+    def reset(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._outstanding.clear()
+        self._completed.clear()
+
+    async def complete(self, message: IncomingMessage) -> None:
+        if self._outstanding.get(message.delivery_tag) is not message:
+            # Delivered on a channel that has since been replaced
+            return
+        self._completed.add(message.delivery_tag)
+        if len(self._completed) >= self.batch_size:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.interval)
+        self._timer = None
+        try:
+            await self.flush()
+        except Exception as e:
+            log.error("Failed to ack handled messages: %s", e)
+
+    async def flush(self) -> None:
+        async with self._lock:
+            if self._timer is not None and self._timer is not asyncio.current_task():
+                self._timer.cancel()
+            self._timer = None
+            last: Optional[IncomingMessage] = None
+            count = 0
+            while self._outstanding:
+                delivery_tag = next(iter(self._outstanding))
+                if delivery_tag not in self._completed:
+                    break
+                last = self._outstanding.pop(delivery_tag)
+                self._completed.discard(delivery_tag)
+                count += 1
+            if last is None:
+                return
+            await last.ack(multiple=True)
+            self.acks_sent += 1
+            self.messages_acked += count
+
+
+class MessageDispatcher:
+    """
+    Bounded pool of workers handling consumed messages off the consumer callback.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any, IncomingMessage], Awaitable[None]],
+        workers: int,
+        queue_size: int,
+        ack_batcher: AckBatcher,
+    ):
+        self.handler = handler
+        self.workers = workers
+        self.ack_batcher = ack_batcher
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.in_flight = 0
+        self.handled = 0
+        self.failed = 0
+        self.handler_time_total = 0.0
+        self.handler_time_max = 0.0
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        CONSUMER_QUEUE_DEPTH.set_function(self.queue.qsize)
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._work()) for _ in range(self.workers)
+            ]
+
+    async def submit(self, context: Any, message: IncomingMessage) -> None:
+        self.ack_batcher.track(message)
+        await self.queue.put((context, message))
+
+    async def _work(self) -> None:
+        while True:
+            context, message = await self.queue.get()
+            self.in_flight += 1
+            CONSUMER_IN_FLIGHT.inc()
+            started = time.perf_counter()
+            try:
+                await self.handler(context, message)
+                CONSUMER_HANDLED.inc()
+            except Exception as e:
+                self.failed += 1
+                CONSUMER_FAILED.inc()
+                log.error("Failed to handle message %s: %s", message.delivery_tag, e)
+            finally:
+                elapsed = time.perf_counter() - started
+                CONSUMER_HANDLER_LATENCY.observe(elapsed)
+                self.handled += 1
+                self.handler_time_total += elapsed
+                if elapsed > self.handler_time_max:
+                    self.handler_time_max = elapsed
+                self.in_flight -= 1
+                CONSUMER_IN_FLIGHT.dec()
+                self.queue.task_done()
+            # A closed or reconnecting channel must not take the worker down with it
+            try:
+                await self.ack_batcher.complete(message)
+            except Exception as e:
+                log.error("Failed to ack message %s: %s", message.delivery_tag, e)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.ack_batcher.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "queue_depth": self.queue.qsize(),
+            "in_flight": self.in_flight,
+            "unacked": self.ack_batcher.outstanding,
+            "handled": self.handled,
+            "failed": self.failed,
+            "handler_time_avg": (
+                self.handler_time_total / self.handled if self.handled else 0.0
+            ),
+            "handler_time_max": self.handler_time_max,
+            "acks_sent": self.ack_batcher.acks_sent,
+            "messages_acked": self.ack_batcher.messages_acked,
+        }
@@ -28,12 +28,33 @@ class RatingError(BaseServiceError):
         super().__init__(message, status_code)
 
 
+class EventError(BaseServiceError):
+    def __init__(self, message: str, status_code: int = 503):
+        super().__init__(message, status_code)
+
+
+class DeadlineExceededError(BaseServiceError):
+    def __init__(self, message: str, status_code: int = 504):
+        super().__init__(message, status_code)
+
+
+class UpstreamUnavailableError(BaseServiceError):
+    def __init__(self, message: str, status_code: int = 503):
+        super().__init__(message, status_code)
+
+
+class UpstreamResponseError(BaseServiceError):
+    def __init__(self, service: str, status_code: int = 502):
+        self.service = service
+        super().__init__(f"Invalid response from the {service} service", status_code)
+
+
 app = FastAPI()
 
 
 @app.exception_handler(TeamError)
 async def team_error_handler(request: Request, exc: TeamError):
-    log.error(f"TeamError: {exc.message}")
+    log.error("TeamError: %s", exc.message)
     return JSONResponse(
         status_code=exc.status_code,
         content={"message": exc.message},
@@ -42,7 +63,7 @@ async def team_error_handler(request: Request, exc: TeamError):
 
 @app.exception_handler(PlayerError)
 async def player_error_handler(request: Request, exc: PlayerError):
-    log.error(f"PlayerError: {exc.message}")
+    log.error("PlayerError: %s", exc.message)
     return JSONResponse(
         status_code=exc.status_code,
         content={"message": exc.message},
@@ -51,7 +72,18 @@ async def player_error_handler(request: Request, exc: PlayerError):
 
 @app.exception_handler(RatingError)
 async def rating_error_handler(request: Request, exc: RatingError):
-    log.error(f"RatingError: {exc.message}")
+    log.error("RatingError: %s", exc.message)
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"message": exc.message},
+    )
+
+
+async def service_error_handler(request: Request, exc: BaseServiceError):
+    """
+    Registered on the application in main.py for every BaseServiceError subclass.
+    """
+    log.error("%s: %s", type(exc).__name__, exc.message)
     return JSONResponse(
         status_code=exc.status_code,
         content={"message": exc.message},
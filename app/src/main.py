@@ -1,32 +1,56 @@
 import asyncio
+import math
+import os
+import tempfile
 from contextlib import asynccontextmanager
+from typing import Any, Dict
 import uvicorn
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from utils.logger import logger_config
+from utils.logger import configure_logging, logger_config
 from utils.config import get_settings
+from utils.json_codec import JSON_BACKEND, FastJSONResponse
+from utils.metrics import MetricsMiddleware, mark_worker_dead
+from utils.load_shedding import LoadShedder, LoadSheddingMiddleware
+from utils.tracing import MEMORY_EXPORTER, TracingMiddleware, tracing
+
+from exceptions.gateway_exceptions import BaseServiceError, service_error_handler
 
 from events.consumer import Consumer, start_consumer
 
+from service.gateway_service import GatewayService
+
 from routes.gateway_router import app_router
 from routes.health_router import health_router
+from routes.metrics_router import metrics_router
+from routes.admin_router import admin_router, traces_router
 from routes.graphql_router import graphql_app, graphql_router
 
 log = logger_config(__name__)
 settings = get_settings()
+configure_logging(settings)
+
+CGROUP_CPU_MAX = "/sys/fs/cgroup/cpu.max"
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     loop = asyncio.get_event_loop()
+    tracing.configure_from_settings(settings)
+    app.state.http_clients = GatewayService.start_http_clients()
     consumer: Consumer = await start_consumer(loop, app)
     app.state.consumer = consumer
+    app.state.load_shedder.monitor.start()
     try:
         yield
     finally:
+        await app.state.load_shedder.monitor.stop()
         await consumer.close()
+        await GatewayService.close_http_clients()
+        tracing.shutdown()
+        mark_worker_dead()
 
 
 def init_app():
@@ -56,6 +80,11 @@ def init_app():
     log.info(f"Broker: {settings.BROKER_URL}")
     log.info(f"Queue name: {settings.QUEUE_NAME}")
     log.info(f"Exchange name: {settings.EXCHANGE_NAME}")
+    log.info(f"Event routing mode: {settings.EVENT_ROUTING_MODE}")
+    log.info(f"JSON backend: {JSON_BACKEND}")
+    log.info(
+        f"Tracing: {settings.TRACING_ENABLED} ({settings.TRACING_EXPORTER}, ratio {settings.TRACING_SAMPLE_RATIO})"
+    )
 
     app = FastAPI(
         title=settings.IMAGE_NAME,
@@ -64,7 +93,14 @@ def init_app():
         openapi_url=f"{settings.API_PREFIX}/openapi.json",
         docs_url=settings.DOC_URL,
         lifespan=lifespan,
+        default_response_class=FastJSONResponse,
+    )
+
+    load_shedder = LoadShedder.from_settings(
+        settings, event_waiters=lambda: len(GatewayService.rendezvous)
     )
+    app.state.load_shedder = load_shedder
+    app.add_middleware(LoadSheddingMiddleware, shedder=load_shedder)
 
     origins = ["*"]
 
@@ -76,7 +112,18 @@ def init_app():
         allow_headers=["*"],
     )
 
+    app.add_middleware(MetricsMiddleware)
+
+    # Outermost, so shed and failed requests are traced too
+    app.add_middleware(TracingMiddleware, tracer=tracing)
+    app.add_exception_handler(BaseServiceError, service_error_handler)  # type: ignore[arg-type]
+
     app.include_router(health_router)
+    app.include_router(metrics_router)
+    if settings.PROFILING_ENABLED:
+        app.include_router(admin_router)
+    if settings.TRACING_ENABLED and settings.TRACING_EXPORTER == MEMORY_EXPORTER:
+        app.include_router(traces_router)
     app.include_router(graphql_router)
     app.include_router(graphql_app(), prefix=settings.API_PREFIX)
     app.include_router(app_router, prefix=settings.API_PREFIX)
@@ -89,5 +136,53 @@ def init_app():
 app = init_app()
 
 
+def available_cpus() -> int:
+    """
+    CPUs this process may use: its affinity mask, capped by the cgroup v2 CPU quota
+    (the pod's CPU limit), which os.cpu_count() ignores.
+    """
+    cpus = len(os.sched_getaffinity(0))
+    try:
+        with open(CGROUP_CPU_MAX) as file:
+            quota, period = file.read().split()
+    except (OSError, ValueError):
+        return cpus
+    if quota == "max":
+        return cpus
+    return max(1, min(cpus, math.ceil(int(quota) / int(period))))
+
+
+def server_options() -> Dict[str, Any]:
+    workers = settings.APP_WORKERS or available_cpus()
+    return {
+        "host": settings.APP_HOST,
+        "port": settings.APP_PORT,
+        "workers": workers,
+        "loop": settings.APP_LOOP,
+        "http": settings.APP_HTTP,
+        "backlog": settings.APP_BACKLOG,
+        "timeout_keep_alive": settings.APP_KEEP_ALIVE,
+        "access_log": False,
+        "reload": False,
+    }
+
+
+def run() -> None:
+    """
+    Production launcher: APP_WORKERS processes (one per available CPU when 0), each
+    with its own event loop, upstream pools and broker consumer. No reload, no
+    debugger. Workers inherit the resolved worker count, so each one derives its own
+    reply queue, and share a Prometheus multiprocess directory so /metrics covers
+    all of them. Health, readiness and /admin still describe the answering worker.
+    """
+    options = server_options()
+    if options["workers"] > 1:
+        os.environ["APP_WORKERS"] = str(options["workers"])
+        os.environ.setdefault(
+            "PROMETHEUS_MULTIPROC_DIR", tempfile.mkdtemp(prefix="prometheus-")
+        )
+    uvicorn.run(settings.APP_MODULE, **options)
+
+
 if __name__ == "__main__":
-    uvicorn.run(app, host=settings.APP_HOST, port=settings.APP_PORT, reload=True)
+    run()
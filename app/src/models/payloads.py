@@ -0,0 +1,50 @@
+from typing import List, Optional
+
+from typing_extensions import TypedDict
+
+from pydantic import TypeAdapter
+
+
+class TeamDataPayload(TypedDict):
+    team_id: int
+    team_name: str
+
+
+class PlayerDataPayload(TypedDict):
+    player_id: int
+    player_name: str
+
+
+class TeamPlayersPayload(TypedDict):
+    team_id: int
+    team_name: str
+    players_data: List[PlayerDataPayload]
+
+
+class PlayerRatingPayload(TypedDict):
+    player_id: int
+    player_average_rating: Optional[float]
+
+
+class TeamRatingsPayload(TypedDict):
+    team_id: int
+    players_data: List[PlayerRatingPayload]
+
+
+class PlayerDetailsPayload(TypedDict):
+    player_name: str
+    player_average_rating: Optional[float]
+
+
+class TeamDetailsPayload(TypedDict):
+    team_id: int
+    team_name: str
+    players_data: List[PlayerDetailsPayload]
+
+
+# Validators are compiled once here; upstream data is validated into plain
+# dicts at the service boundary and passed through without model instances.
+TEAM_DATA: TypeAdapter[TeamDataPayload] = TypeAdapter(TeamDataPayload)
+PLAYER_DATA: TypeAdapter[PlayerDataPayload] = TypeAdapter(PlayerDataPayload)
+TEAM_PLAYERS: TypeAdapter[TeamPlayersPayload] = TypeAdapter(TeamPlayersPayload)
+TEAM_RATINGS: TypeAdapter[TeamRatingsPayload] = TypeAdapter(TeamRatingsPayload)
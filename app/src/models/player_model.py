@@ -1,9 +1,10 @@
 from pydantic import BaseModel
+from typing import Optional
 
 
 class PlayerDetails(BaseModel):
     player_name: str
-    player_average_rating: float
+    player_average_rating: Optional[float] = None
 
 
 class PlayerData(BaseModel):
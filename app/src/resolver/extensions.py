@@ -0,0 +1,242 @@
+import inspect
+import json
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Set, Tuple
+
+from graphql import (
+    DocumentNode,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLObjectType,
+    InlineFragmentNode,
+    ListValueNode,
+    OperationDefinitionNode,
+    OperationType,
+    SelectionSetNode,
+    ValidationRule,
+    VariableNode,
+    get_named_type,
+    is_composite_type,
+)
+from graphql.type.definition import GraphQLResolveInfo
+from strawberry.extensions import SchemaExtension
+
+from utils.cache import TTLCache
+from utils.config import get_settings
+from utils.logger import logger_config
+
+log = logger_config(__name__)
+settings = get_settings()
+
+# Field metadata keys, e.g. strawberry.field(metadata={COST: 5, MULTIPLIER: "ids"})
+COST = "cost"
+MULTIPLIER = "multiplier"
+CACHE_CONTROL = "cache_control"
+
+STRAWBERRY_DEFINITION = "strawberry-definition"
+
+
+def cache_control(max_age: float) -> Callable[[type], type]:
+    """
+    Class decorator marking a type as cacheable for max_age seconds wherever a
+    root field returns it, like @cacheControl(maxAge: ...) in Apollo.
+    """
+
+    def decorate(cls: type) -> type:
+        cls.__cache_control__ = max_age  # type: ignore[attr-defined]
+        return cls
+
+    return decorate
+
+
+def field_metadata(parent_type: Any, field_name: str) -> Dict[str, Any]:
+    if not isinstance(parent_type, GraphQLObjectType):
+        return {}
+    field = parent_type.fields.get(field_name)
+    definition = field.extensions.get(STRAWBERRY_DEFINITION) if field else None
+    return dict(getattr(definition, "metadata", None) or {})
+
+
+class QueryCostLimiter(SchemaExtension):
+    """
+    Reject operations whose static cost exceeds max_cost before they execute.
+    Every object field costs 1 and every scalar 0 unless the field declares a cost
+    hint; a multiplier hint names the list argument whose length scales the
+    field's selection, so teams(team_names: [...]) costs per requested team.
+    """
+
+    def __init__(self, max_cost: int):
+        self.max_cost = max_cost
+
+    def on_operation(self) -> Iterator[None]:
+        # A validation rule sees the graphql-core schema through the public
+        # ValidationContext; variables and operation name come from this operation.
+        context = self.execution_context
+        max_cost = self.max_cost
+
+        class QueryCostRule(ValidationRule):
+            def enter_document(self, node: DocumentNode, *_args: Any) -> None:
+                cost = OperationCost(
+                    self.context.schema, node, context.variables or {}
+                ).total(context.operation_name)
+                if cost > max_cost:
+                    log.warning("Rejected GraphQL operation with cost %s", cost)
+                    self.report_error(
+                        GraphQLError(
+                            f"Query cost {cost} exceeds the maximum allowed cost {max_cost}"
+                        )
+                    )
+
+        context.validation_rules = context.validation_rules + (QueryCostRule,)
+        yield
+
+
+class OperationCost:
+    def __init__(self, schema: Any, document: Any, variables: Dict[str, Any]):
+        self.schema = schema
+        self.variables = variables
+        self.operations = [
+            definition
+            for definition in document.definitions
+            if isinstance(definition, OperationDefinitionNode)
+        ]
+        self.fragments = {
+            definition.name.value: definition
+            for definition in document.definitions
+            if isinstance(definition, FragmentDefinitionNode)
+        }
+
+    def total(self, operation_name: Optional[str]) -> int:
+        for operation in self.operations:
+            if operation_name is None or (
+                operation.name and operation.name.value == operation_name
+            ):
+                root_type = self.schema.get_root_type(operation.operation)
+                return self.selection_cost(root_type, operation.selection_set, set())
+        return 0
+
+    def selection_cost(
+        self,
+        parent_type: Any,
+        selection_set: Optional[SelectionSetNode],
+        fragments_seen: Set[str],
+    ) -> int:
+        if selection_set is None or parent_type is None:
+            return 0
+        cost = 0
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                cost += self.field_cost(parent_type, selection, fragments_seen)
+            elif isinstance(selection, InlineFragmentNode):
+                fragment_type = (
+                    self.schema.get_type(selection.type_condition.name.value)
+                    if selection.type_condition
+                    else parent_type
+                )
+                cost += self.selection_cost(
+                    fragment_type, selection.selection_set, fragments_seen
+                )
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = self.fragments.get(name)
+                if fragment is None or name in fragments_seen:
+                    continue
+                cost += self.selection_cost(
+                    self.schema.get_type(fragment.type_condition.name.value),
+                    fragment.selection_set,
+                    fragments_seen | {name},
+                )
+        return cost
+
+    def field_cost(
+        self, parent_type: Any, node: FieldNode, fragments_seen: Set[str]
+    ) -> int:
+        fields = getattr(parent_type, "fields", None) or {}
+        field = fields.get(node.name.value)
+        if field is None:
+            return 0
+        return_type = get_named_type(field.type)
+        metadata = field_metadata(parent_type, node.name.value)
+        cost = metadata.get(COST, 1 if is_composite_type(return_type) else 0)
+        children = self.selection_cost(return_type, node.selection_set, fragments_seen)
+        return (cost + children) * self.multiplier(node, metadata.get(MULTIPLIER))
+
+    def multiplier(self, node: FieldNode, argument_name: Optional[str]) -> int:
+        if argument_name is None:
+            return 1
+        for argument in node.arguments or ():
+            if argument.name.value != argument_name:
+                continue
+            value = argument.value
+            if isinstance(value, ListValueNode):
+                return max(len(value.values), 1)
+            if isinstance(value, VariableNode):
+                variable = self.variables.get(value.name.value)
+                if isinstance(variable, list):
+                    return max(len(variable), 1)
+        return 1
+
+
+field_cache: TTLCache[Hashable, Any] = TTLCache(
+    max_entries=settings.GRAPHQL_FIELD_CACHE_MAX_ENTRIES, ttl=0
+)
+
+
+class FieldCacheExtension(SchemaExtension):
+    """
+    Serve root query fields from memory when the field or the type it returns
+    carries a cache_control hint. Entries are keyed by field and arguments and
+    live for the hinted max age; errors are never cached.
+    """
+
+    max_ages: Dict[Tuple[str, str], Optional[float]] = {}
+
+    def resolve(
+        self,
+        _next: Callable,
+        root: Any,
+        info: GraphQLResolveInfo,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        if root is not None or info.operation.operation != OperationType.QUERY:
+            return _next(root, info, *args, **kwargs)
+        max_age = self.max_age(info)
+        if not max_age:
+            return _next(root, info, *args, **kwargs)
+
+        key = (
+            info.parent_type.name,
+            info.field_name,
+            json.dumps(kwargs, sort_keys=True, default=str),
+        )
+        if key in field_cache:
+            return field_cache.get(key)
+        result = _next(root, info, *args, **kwargs)
+        if inspect.isawaitable(result):
+            return self.store_later(key, result, max_age)
+        field_cache.set(key, result, ttl=max_age)
+        return result
+
+    @staticmethod
+    async def store_later(key: Hashable, result: Any, max_age: float) -> Any:
+        value = await result
+        field_cache.set(key, value, ttl=max_age)
+        return value
+
+    @classmethod
+    def max_age(cls, info: GraphQLResolveInfo) -> Optional[float]:
+        field_key = (info.parent_type.name, info.field_name)
+        if field_key not in cls.max_ages:
+            max_age = field_metadata(info.parent_type, info.field_name).get(
+                CACHE_CONTROL
+            )
+            if max_age is None:
+                return_type = get_named_type(info.return_type)
+                definition = return_type.extensions.get(STRAWBERRY_DEFINITION)
+                max_age = getattr(
+                    getattr(definition, "origin", None), "__cache_control__", None
+                )
+            cls.max_ages[field_key] = max_age
+        return cls.max_ages[field_key]
@@ -0,0 +1,39 @@
+from typing import Any, Dict, List, Union
+
+from strawberry.dataloader import DataLoader
+
+from service.gateway_service import GatewayService
+from utils.config import get_settings
+
+settings = get_settings()
+
+
+async def load_players(
+    team_names: List[str],
+) -> List[Union[Dict[str, Any], BaseException]]:
+    return await GatewayService.get_players_name_many(team_names)
+
+
+async def load_ratings(
+    team_ids: List[int],
+) -> List[Union[Dict[str, Any], BaseException]]:
+    return await GatewayService.get_players_rating_many(team_ids)
+
+
+class Loaders:
+    """
+    DataLoaders scoped to a single GraphQL request, so every team or rating
+    requested while resolving it is fetched in one aliased upstream call.
+    """
+
+    def __init__(self) -> None:
+        self.players: DataLoader[str, Dict[str, Any]] = DataLoader(
+            load_fn=load_players, max_batch_size=settings.GRAPHQL_MAX_BATCH_SIZE
+        )
+        self.ratings: DataLoader[int, Dict[str, Any]] = DataLoader(
+            load_fn=load_ratings, max_batch_size=settings.GRAPHQL_MAX_BATCH_SIZE
+        )
+
+
+async def get_context() -> Dict[str, Any]:
+    return {"loaders": Loaders()}
@@ -1,8 +1,72 @@
+from typing import Optional
+
 import strawberry
 
+from models.player_model import PlayerDataInput as PlayerDataModel
+from models.rating_model import PlayerScore, TeamScoreInput
+from models.team_model import TeamDataInput as TeamDataModel
+from resolver.extensions import COST
+from resolver.player_schema import PlayerDataInput, PlayerDataType
+from resolver.rating_schema import TeamScoreInputType
+from resolver.team_schema import TeamDataInput, TeamDataType, TeamDetailsType
+from service.gateway_service import GatewayService
+
 
 @strawberry.type
 class Mutation:
-    @strawberry.mutation
-    async def placeholder(self) -> str:
-        return "placeholder"
+    @strawberry.mutation(name="create_team")
+    async def create_team(self, new_team: TeamDataInput) -> Optional[TeamDataType]:
+        created_team = await GatewayService.create_team(
+            TeamDataModel(
+                team_name=new_team.team_name, team_password=new_team.team_password
+            )
+        )
+        if created_team is None:
+            return None
+        return TeamDataType(**created_team)
+
+    @strawberry.mutation(name="join_team")
+    async def join_team(self, team_data: TeamDataInput) -> Optional[TeamDataType]:
+        joined_team = await GatewayService.join_team(
+            TeamDataModel(
+                team_name=team_data.team_name, team_password=team_data.team_password
+            )
+        )
+        if joined_team is None:
+            return None
+        return TeamDataType(**joined_team)
+
+    @strawberry.mutation(name="create_player")
+    async def create_player(
+        self, new_player: PlayerDataInput
+    ) -> Optional[PlayerDataType]:
+        created_player = await GatewayService.create_player(
+            PlayerDataModel(
+                team_name=new_player.team_name, player_name=new_player.player_name
+            )
+        )
+        if created_player is None:
+            return None
+        return PlayerDataType(**created_player)
+
+    @strawberry.mutation(name="rate_players", metadata={COST: 5})
+    async def rate_players(
+        self, info: strawberry.Info, team_rating: TeamScoreInputType
+    ) -> Optional[TeamDetailsType]:
+        team_score = TeamScoreInput(
+            team_name=team_rating.team_name,
+            players_data=[
+                PlayerScore(
+                    player_name=player.player_name, player_score=player.player_score
+                )
+                for player in team_rating.players_data
+            ],
+        )
+        with GatewayService.expect_event("rating_updated") as waiter:
+            rating_updated = await GatewayService.update_rating(
+                team_score, waiter.correlation_id
+            )
+            if not rating_updated or not await GatewayService.wait_for_event(waiter):
+                return None
+        players_data = await info.context["loaders"].players.load(team_rating.team_name)
+        return TeamDetailsType.from_players(players_data)
@@ -1,3 +1,4 @@
+from typing import Optional
 import strawberry
 
 
@@ -16,7 +17,16 @@ class PlayerDataInput:
 @strawberry.type
 class PlayerDetailsType:
     player_name: str = strawberry.field(name="player_name")
-    player_average_rating: float = strawberry.field(name="player_average_rating")
+    team_id: strawberry.Private[int]
+    player_id: strawberry.Private[int]
+
+    @strawberry.field(name="player_average_rating")
+    async def player_average_rating(self, info: strawberry.Info) -> Optional[float]:
+        ratings = await info.context["loaders"].ratings.load(self.team_id)
+        for player in ratings["players_data"]:
+            if player["player_id"] == self.player_id:
+                return player["player_average_rating"]
+        return None
 
 
 @strawberry.input
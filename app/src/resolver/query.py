@@ -1,8 +1,26 @@
+import asyncio
+from typing import List, Optional
+
 import strawberry
 
+from resolver.extensions import MULTIPLIER
+from resolver.team_schema import TeamDetailsType
+
 
 @strawberry.type
 class Query:
-    @strawberry.field
-    def placeholder(self) -> str:
-        return "placeholder"
+    @strawberry.field(name="team")
+    async def team(
+        self, info: strawberry.Info, team_name: str
+    ) -> Optional[TeamDetailsType]:
+        players_data = await info.context["loaders"].players.load(team_name)
+        return TeamDetailsType.from_players(players_data)
+
+    @strawberry.field(name="teams", metadata={MULTIPLIER: "team_names"})
+    async def teams(
+        self, info: strawberry.Info, team_names: List[str]
+    ) -> List[TeamDetailsType]:
+        players_data = await asyncio.gather(
+            *(info.context["loaders"].players.load(name) for name in team_names)
+        )
+        return [TeamDetailsType.from_players(players) for players in players_data]
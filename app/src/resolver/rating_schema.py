@@ -12,3 +12,15 @@ class PlayerRatingInputType:
 class PlayerRatingInput:
     team_id: int = strawberry.field(name="team_id")
     players: List[PlayerRatingInputType] = strawberry.field(name="players")
+
+
+@strawberry.input
+class PlayerScoreInput:
+    player_name: str = strawberry.field(name="player_name")
+    player_score: int = strawberry.field(name="player_score")
+
+
+@strawberry.input
+class TeamScoreInputType:
+    team_name: str = strawberry.field(name="team_name")
+    players_data: List[PlayerScoreInput] = strawberry.field(name="players_data")
@@ -1,6 +1,23 @@
+from functools import partial
+
 from strawberry import Schema
+from strawberry.extensions import QueryDepthLimiter
+from strawberry.schema.config import StrawberryConfig
 
+from resolver.extensions import FieldCacheExtension, QueryCostLimiter
 from resolver.mutation import Mutation
 from resolver.query import Query
+from utils.config import get_settings
+
+settings = get_settings()
 
-schema = Schema(query=Query, mutation=Mutation)
+schema = Schema(
+    query=Query,
+    mutation=Mutation,
+    config=StrawberryConfig(auto_camel_case=False),
+    extensions=[
+        partial(QueryDepthLimiter, max_depth=settings.GRAPHQL_MAX_DEPTH),
+        partial(QueryCostLimiter, max_cost=settings.GRAPHQL_MAX_COST),
+        FieldCacheExtension,
+    ],
+)
@@ -1,7 +1,11 @@
-from typing import List
+from typing import Any, Dict, List
 import strawberry
 
+from resolver.extensions import cache_control
 from resolver.player_schema import PlayerDetailsType
+from utils.config import get_settings
+
+settings = get_settings()
 
 
 @strawberry.type
@@ -16,8 +20,28 @@ class TeamDataInput:
     team_password: str = strawberry.field(name="team_password")
 
 
+@cache_control(max_age=settings.GRAPHQL_TEAM_DETAILS_MAX_AGE)
 @strawberry.type
 class TeamDetailsType:
     team_id: int = strawberry.field(name="team_id")
     team_name: str = strawberry.field(name="team_name")
-    players_data: List[PlayerDetailsType] = strawberry.field(name="players_data")
+    players: strawberry.Private[List[Dict[str, Any]]]
+
+    @strawberry.field(name="players_data")
+    def players_data(self) -> List[PlayerDetailsType]:
+        return [
+            PlayerDetailsType(
+                player_name=player["player_name"],
+                team_id=self.team_id,
+                player_id=player["player_id"],
+            )
+            for player in self.players
+        ]
+
+    @classmethod
+    def from_players(cls, players_data: Dict[str, Any]) -> "TeamDetailsType":
+        return cls(
+            team_id=players_data["team_id"],
+            team_name=players_data["team_name"],
+            players=players_data["players_data"],
+        )
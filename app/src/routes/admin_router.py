@@ -0,0 +1,86 @@
+import asyncio
+import os
+import secrets
+import threading
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+
+from utils import profiling
+from utils.config import get_settings
+from utils.json_codec import FastJSONResponse
+from utils.logger import logger_config
+from utils.tracing import tracing
+
+log = logger_config(__name__)
+settings = get_settings()
+
+# One profiling window at a time per worker
+profiling_lock = asyncio.Lock()
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_admin_token is None or not secrets.compare_digest(
+        x_admin_token, settings.ADMIN_TOKEN
+    ):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+admin_router = APIRouter(
+    prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)]
+)
+
+# Mounted on its own: traces only need in-memory tracing, not profiling
+traces_router = APIRouter(
+    prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)]
+)
+
+
+@admin_router.post("/profile")
+async def profile(
+    seconds: float = Query(default=5, gt=0),
+    interval_ms: float = Query(default=settings.PROFILING_INTERVAL_MS, gt=0),
+) -> Response:
+    """
+    Sample this worker's event loop thread for `seconds` and return collapsed stacks
+    (one `frame;frame;... count` line per stack), ready for flamegraph.pl or speedscope.
+    """
+    if profiling_lock.locked():
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    async with profiling_lock:
+        duration = min(seconds, settings.PROFILING_MAX_SECONDS)
+        log.warning("Profiling worker %s for %ss", os.getpid(), duration)
+        stacks = await profiling.profile(
+            threading.get_ident(), duration, interval_ms / 1000
+        )
+    return Response(
+        stacks, media_type="text/plain", headers={"X-Worker-Pid": str(os.getpid())}
+    )
+
+
+@admin_router.post("/spans")
+async def spans(seconds: float = Query(default=5, gt=0)) -> Response:
+    """
+    Record hot-path spans (send_request, wait_for_event, handle_message) for
+    `seconds` and return their timing percentiles.
+    """
+    if profiling_lock.locked():
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    async with profiling_lock:
+        stats = await profiling.record_spans(
+            min(seconds, settings.PROFILING_MAX_SECONDS)
+        )
+    return FastJSONResponse(stats, headers={"X-Worker-Pid": str(os.getpid())})
+
+
+@traces_router.get("/traces")
+async def traces(limit: int = Query(default=100, gt=0)) -> Response:
+    """
+    Latest finished spans of this worker, when tracing exports to memory.
+    """
+    finished = tracing.finished_spans(limit)
+    if finished is None:
+        raise HTTPException(status_code=404, detail="In-memory tracing is not enabled")
+    return FastJSONResponse(finished, headers={"X-Worker-Pid": str(os.getpid())})
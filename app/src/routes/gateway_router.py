@@ -1,5 +1,8 @@
-import asyncio
-from fastapi import APIRouter, HTTPException
+from contextlib import nullcontext
+from typing import Any, AsyncIterator, ContextManager, Dict, Optional, Union
+
+from fastapi import APIRouter, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
 
 from models.team_model import (
     TeamData,
@@ -16,106 +19,259 @@ from models.rating_model import (
 )
 
 from service.gateway_service import GatewayService
+from service.operations import COMPLETED, Operation
 
 from exceptions.gateway_exceptions import (
     TeamError,
     PlayerError,
 )
 
+from utils.config import get_settings
+from utils import json_codec
+from utils.json_codec import FastJSONResponse
+from utils.deadline import deadline_scope
 from utils.logger import logger_config
 
 log = logger_config(__name__)
+settings = get_settings()
 app_router = APIRouter()
 
+RESPOND_ASYNC = "respond-async"
+ACCEPTED_RESPONSE: Dict[Union[int, str], Dict[str, Any]] = {
+    202: {"description": "Accepted; poll the operation in the Location header"}
+}
+
+
+def respond_async(prefer: Optional[str]) -> bool:
+    """
+    Whether the client opted into 202 responses with `Prefer: respond-async`.
+    """
+    return prefer is not None and RESPOND_ASYNC in prefer.lower()
+
+
+def reserve_operation(prefer: Optional[str]) -> ContextManager:
+    """
+    Pending operation slot for a 202 write, claimed before the mutation is sent.
+    """
+    if respond_async(prefer):
+        return GatewayService.operations.reserve()
+    return nullcontext()
+
+
+def accepted(operation: Operation) -> Response:
+    return FastJSONResponse(
+        operation.payload(),
+        status_code=202,
+        headers={
+            "Location": f"{settings.API_PREFIX}/operations/{operation.operation_id}",
+            "Preference-Applied": RESPOND_ASYNC,
+        },
+    )
 
-@app_router.post("/team/create", response_model=TeamData, tags=["Team"])
-async def create_team(request: TeamDataInput) -> TeamData:
-    log.info(f"Creating team with data: {request}")
+
+@app_router.post(
+    "/team/create", response_model=TeamData, responses=ACCEPTED_RESPONSE, tags=["Team"]
+)
+async def create_team(
+    request: TeamDataInput, prefer: Optional[str] = Header(default=None)
+) -> Response:
+    log.info("Creating team with data: %s", request)
     try:
-        wait_event = asyncio.create_task(GatewayService.wait_for_event("team_created"))
-        team_created = await GatewayService.create_team(request)
-        if team_created:
-            log.info(
-                f"Team created: {team_created} - waiting for message from RabbitMQ"
+        with (
+            deadline_scope(settings.TEAM_CREATE_DEADLINE),
+            GatewayService.expect_event("team_created") as waiter,
+            reserve_operation(prefer),
+        ):
+            team_created = await GatewayService.create_team(
+                request, waiter.correlation_id
             )
-            message = await wait_event
-            if message:
-                return message
-            else:
-                raise HTTPException(
-                    status_code=504, detail="No message received from RabbitMQ"
+            if team_created and respond_async(prefer):
+                return accepted(GatewayService.operations.start(waiter))
+            if team_created:
+                log.info(
+                    "Team created: %s - waiting for message from RabbitMQ", team_created
                 )
+                message = await GatewayService.wait_for_event(waiter)
+                if message:
+                    # Validated when consumed; skip FastAPI's response_model pass
+                    return FastJSONResponse(message)
+                else:
+                    raise HTTPException(
+                        status_code=504, detail="No message received from RabbitMQ"
+                    )
     except TeamError as e:
         raise e
     raise HTTPException(status_code=500, detail="Failed to create team")
 
 
-@app_router.post("/team/player/create", response_model=TeamDetails, tags=["Team"])
-async def create_player(request: PlayerDataInput) -> TeamDetails:
-    log.info(f"Creating player with data: {request}")
+@app_router.post(
+    "/team/player/create",
+    response_model=TeamDetails,
+    responses=ACCEPTED_RESPONSE,
+    tags=["Team"],
+)
+async def create_player(
+    request: PlayerDataInput, prefer: Optional[str] = Header(default=None)
+) -> Response:
+    log.info("Creating player with data: %s", request)
     try:
-        wait_event = asyncio.create_task(
-            GatewayService.wait_for_event("rating_updated")
-        )
-        player_created = await GatewayService.create_player(request)
-        if player_created:
-            message = await wait_event
-            if message:
-                return await GatewayService.get_players_data(request)
-            else:
-                raise HTTPException(
-                    status_code=504, detail="No message received from RabbitMQ"
+        with (
+            deadline_scope(settings.PLAYER_CREATE_DEADLINE),
+            GatewayService.expect_event("rating_updated") as waiter,
+            reserve_operation(prefer),
+        ):
+            player_created = await GatewayService.create_player(
+                request, waiter.correlation_id
+            )
+            if player_created and respond_async(prefer):
+                return accepted(
+                    GatewayService.operations.start(waiter, team_name=request.team_name)
                 )
+            if player_created:
+                message = await GatewayService.wait_for_event(waiter)
+                if message:
+                    return FastJSONResponse(
+                        await GatewayService.get_team_view(
+                            request, team_id=message.get("team_id")
+                        )
+                    )
+                else:
+                    raise HTTPException(
+                        status_code=504, detail="No message received from RabbitMQ"
+                    )
     except PlayerError as e:
         raise e
     raise HTTPException(status_code=500, detail="Failed to create player")
 
 
 @app_router.post("/team/join", response_model=TeamData, tags=["Team"])
-async def join_team(request: TeamDataInput) -> TeamData:
-    log.info(f"Joining team with data: {request}")
+async def join_team(request: TeamDataInput) -> Response:
+    log.info("Joining team with data: %s", request)
     try:
-        team_joined = await GatewayService.join_team(request)
+        with deadline_scope(settings.TEAM_JOIN_DEADLINE):
+            team_joined = await GatewayService.join_team(request)
         if team_joined:
-            log.info(f"Team joined: {team_joined}")
-            return team_joined
+            log.info("Team joined: %s", team_joined)
+            return FastJSONResponse(team_joined)
     except TeamError as e:
         raise e
     raise HTTPException(status_code=500, detail="Failed to join team")
 
 
 @app_router.post("/player/join", response_model=TeamDetails, tags=["Team"])
-async def join_player(request: PlayerDataInput) -> TeamDetails:
-    log.info(f"Player joining team with data: {request}")
+async def join_player(request: PlayerDataInput) -> Response:
+    log.info("Player joining team with data: %s", request)
     try:
-        team_data = await GatewayService.get_players_data(request)
+        with deadline_scope(settings.PLAYER_JOIN_DEADLINE):
+            team_data = await GatewayService.get_team_view(request)
         if team_data:
-            log.info(f"Team joined: {team_data}")
-            return team_data
+            log.info("Team joined: %s", team_data)
+            return FastJSONResponse(team_data)
     except TeamError as e:
         raise e
     raise HTTPException(status_code=500, detail="Failed to join team")
 
 
-@app_router.post("/team/rate", response_model=TeamDetails, tags=["Rating"])
-async def rate_team(request: TeamScoreInput) -> TeamDetails:
-    log.info(f"Rating team with data: {request}")
+@app_router.post(
+    "/team/rate",
+    response_model=TeamDetails,
+    responses=ACCEPTED_RESPONSE,
+    tags=["Rating"],
+)
+async def rate_team(
+    request: TeamScoreInput, prefer: Optional[str] = Header(default=None)
+) -> Response:
+    log.info("Rating team with data: %s", request)
     try:
-        wait_event = asyncio.create_task(
-            GatewayService.wait_for_event("rating_updated")
-        )
-        rating_updated = await GatewayService.update_rating(request)
-        if rating_updated:
-            message = await wait_event
-            if message:
-                player_data_input = PlayerDataInput(
-                    team_name=request.team_name, player_name=""
-                )
-                return await GatewayService.get_players_data(player_data_input)
-            else:
-                raise HTTPException(
-                    status_code=504, detail="No message received from RabbitMQ"
+        with (
+            deadline_scope(settings.TEAM_RATE_DEADLINE),
+            GatewayService.expect_event("rating_updated") as waiter,
+            reserve_operation(prefer),
+        ):
+            rating_updated = await GatewayService.update_rating(
+                request, waiter.correlation_id
+            )
+            if rating_updated and respond_async(prefer):
+                return accepted(
+                    GatewayService.operations.start(
+                        waiter,
+                        team_name=request.team_name,
+                        team_id=rating_updated.get("team_id"),
+                    )
                 )
+            if rating_updated:
+                message = await GatewayService.wait_for_event(waiter)
+                if message:
+                    player_data_input = PlayerDataInput(
+                        team_name=request.team_name, player_name=""
+                    )
+                    return FastJSONResponse(
+                        await GatewayService.get_team_view(
+                            player_data_input, team_id=rating_updated.get("team_id")
+                        )
+                    )
+                else:
+                    raise HTTPException(
+                        status_code=504, detail="No message received from RabbitMQ"
+                    )
     except TeamError as e:
         raise e
     raise HTTPException(status_code=500, detail="Failed to rate team")
+
+
+@app_router.get("/operations/{operation_id}", tags=["Operations"])
+async def get_operation(operation_id: str, wait: float = 0) -> Response:
+    """
+    Status of a write accepted with 202. With `wait` the request long-polls for up
+    to that many seconds (capped) until the completion event is consumed.
+    """
+    operation = GatewayService.operations.get(operation_id)
+    if operation is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired operation")
+    if wait > 0:
+        await GatewayService.operations.wait(
+            operation, min(wait, settings.ASYNC_OPERATION_MAX_WAIT)
+        )
+    if operation.status == COMPLETED:
+        with deadline_scope(settings.PLAYER_JOIN_DEADLINE):
+            await GatewayService.operation_result(operation)
+    return FastJSONResponse(operation.payload())
+
+
+def server_sent_event(event: str, data: Dict[str, Any]) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + json_codec.dumps(data) + b"\n\n"
+
+
+@app_router.get("/team/{team_name}/updates", tags=["Team"])
+async def team_updates(team_name: str) -> StreamingResponse:
+    """
+    Server-sent events: a `snapshot` of the team details, then a `delta` with the
+    changed and removed players after every rating update. Slow clients are
+    disconnected and should reconnect to get a fresh snapshot.
+    """
+    subscription = GatewayService.team_updates.subscribe(team_name)
+    try:
+        with deadline_scope(settings.PLAYER_JOIN_DEADLINE):
+            snapshot = await GatewayService.get_team_view(
+                PlayerDataInput(team_name=team_name, player_name="")
+            )
+    except BaseException:
+        GatewayService.team_updates.unsubscribe(subscription)
+        raise
+    GatewayService.team_updates.remember(snapshot)
+
+    async def stream() -> AsyncIterator[bytes]:
+        with subscription:
+            yield server_sent_event("snapshot", dict(snapshot))
+            while not subscription.dropped:
+                update = await subscription.next(settings.TEAM_UPDATES_KEEPALIVE)
+                if update is None:
+                    yield b": keepalive\n\n"
+                elif not subscription.dropped:
+                    yield server_sent_event("delta", update)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
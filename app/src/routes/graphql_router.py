@@ -1,11 +1,12 @@
 from fastapi import APIRouter
 from strawberry.fastapi import GraphQLRouter
 
+from resolver.loaders import get_context
 from resolver.schema import schema
 
 
 def graphql_app():
-    return GraphQLRouter(schema, path="/graphql")
+    return GraphQLRouter(schema, path="/graphql", context_getter=get_context)
 
 
 graphql_router = APIRouter()
@@ -1,4 +1,8 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+from resolver.extensions import field_cache
+from service.gateway_service import GatewayService
 
 health_router = APIRouter()
 
@@ -6,5 +10,98 @@ health_router = APIRouter()
 @health_router.get(
     "/health", tags=["Sanity check"], responses={200: {"description": "Health check"}}
 )
-async def health_check():
-    return {"status": "ok"}
+async def health_check(request: Request):
+    load_shedder = getattr(request.app.state, "load_shedder", None)
+    if load_shedder is None:
+        return {"status": "ok"}
+    return {"status": "ok", "load": load_shedder.stats()}
+
+
+@health_router.get(
+    "/health/ready",
+    tags=["Sanity check"],
+    responses={
+        200: {"description": "Ready for traffic"},
+        503: {"description": "Overloaded, take out of rotation"},
+    },
+)
+async def readiness_check(request: Request):
+    load_shedder = getattr(request.app.state, "load_shedder", None)
+    if load_shedder is None or load_shedder.ready:
+        return {"status": "ready"}
+    return JSONResponse(
+        status_code=503,
+        content={"status": "overloaded", "load": load_shedder.stats()},
+    )
+
+
+@health_router.get(
+    "/health/upstreams",
+    tags=["Sanity check"],
+    responses={200: {"description": "Upstream connection pool stats"}},
+)
+async def upstreams_check():
+    pools = (
+        GatewayService.http_clients.stats()
+        if GatewayService.http_clients is not None
+        else {}
+    )
+    guards = (
+        GatewayService.http_clients.guard_stats()
+        if GatewayService.http_clients is not None
+        else {}
+    )
+    return {
+        "pools": pools,
+        "guards": guards,
+        "single_flight": GatewayService.single_flight.stats(),
+        "hedging": GatewayService.hedger.stats(),
+        "batching": {
+            url: batcher.stats()
+            for url, batcher in GatewayService.batchers.items()
+            if batcher is not None
+        },
+    }
+
+
+@health_router.get(
+    "/health/consumer",
+    tags=["Sanity check"],
+    responses={200: {"description": "Event consumer backpressure stats"}},
+)
+async def consumer_check(request: Request):
+    consumer = getattr(request.app.state, "consumer", None)
+    if consumer is None:
+        return {}
+    return consumer.stats()
+
+
+@health_router.get(
+    "/health/caches",
+    tags=["Sanity check"],
+    responses={200: {"description": "In-process cache stats"}},
+)
+async def caches_check():
+    return {
+        "directory": GatewayService.directory.stats(),
+        "team_views": GatewayService.team_views.stats(),
+        "graphql_fields": field_cache.stats(),
+    }
+
+
+@health_router.get(
+    "/health/subscriptions",
+    tags=["Sanity check"],
+    responses={200: {"description": "Team update subscription stats"}},
+)
+async def subscriptions_check():
+    return GatewayService.team_updates.stats()
+
+
+@health_router.get(
+    "/health/operations",
+    tags=["Sanity check"],
+    responses={200: {"description": "Asynchronous write operation stats"}},
+)
+async def operations_check():
+    return GatewayService.operations.stats()
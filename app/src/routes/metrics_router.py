@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Response
+
+from utils.metrics import render_metrics
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get(
+    "/metrics",
+    tags=["Sanity check"],
+    responses={200: {"description": "Prometheus metrics"}},
+)
+async def metrics():
+    content, media_type = render_metrics()
+    return Response(content, media_type=media_type)
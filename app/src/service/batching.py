@@ -0,0 +1,111 @@
+import asyncio
+import contextvars
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from utils.deadline import Deadline, current_deadline
+from utils.logger import logger_config
+
+log = logger_config(__name__)
+
+Payload = Dict[str, Any]
+Response = Optional[Dict[Any, Any]]
+
+
+class RequestBatcher:
+    """
+    Collects GraphQL operations sent to one upstream over a short window and sends
+    them as a single array payload, handing each caller its own result back.
+    The batch is sent under the latest deadline among the callers it carries.
+    """
+
+    def __init__(
+        self,
+        send_one: Callable[[Payload], Awaitable[Response]],
+        send_batch: Callable[[List[Payload]], Awaitable[Optional[List[Any]]]],
+        window: float,
+        max_size: int,
+    ):
+        self.send_one = send_one
+        self.send_batch = send_batch
+        self.window = window
+        self.max_size = max_size
+        self.operations = 0
+        self.batches = 0
+        self.fallbacks = 0
+        self._pending: List[Tuple[Payload, asyncio.Future]] = []
+        self._deadlines: List[Optional[Deadline]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+    async def submit(self, payload: Payload) -> Response:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((payload, future))
+        self._deadlines.append(current_deadline.get())
+        self.operations += 1
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.window, self._flush
+            )
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        deadlines, self._deadlines = self._deadlines, []
+        if batch:
+            context = contextvars.copy_context()
+            context.run(current_deadline.set, self._latest(deadlines))
+            task = asyncio.create_task(self._dispatch(batch), context=context)
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    def _latest(deadlines: List[Optional[Deadline]]) -> Optional[Deadline]:
+        latest: Optional[Deadline] = None
+        for deadline in deadlines:
+            if deadline is None:
+                # A caller without a deadline waits for the upstream's own timeout
+                return None
+            if latest is None or deadline.expires_at > latest.expires_at:
+                latest = deadline
+        return latest
+
+    async def _dispatch(self, batch: List[Tuple[Payload, asyncio.Future]]) -> None:
+        try:
+            if len(batch) == 1:
+                results: List[Any] = [await self.send_one(batch[0][0])]
+            else:
+                self.batches += 1
+                response = await self.send_batch([payload for payload, _ in batch])
+                if isinstance(response, list) and len(response) == len(batch):
+                    results = response
+                elif not response:
+                    # The request failed, every operation gets the failed response
+                    results = [{} for _ in batch]
+                else:
+                    # Upstream did not answer with one result per operation
+                    self.fallbacks += 1
+                    log.warning("Batch response not understood, sending one by one")
+                    results = await asyncio.gather(
+                        *[self.send_one(payload) for payload, _ in batch]
+                    )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "operations": self.operations,
+            "batches": self.batches,
+            "fallbacks": self.fallbacks,
+            "pending": len(self._pending),
+        }
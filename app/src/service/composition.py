@@ -0,0 +1,72 @@
+import asyncio
+from typing import Any, Awaitable, Dict, Iterable, Optional
+
+from exceptions.gateway_exceptions import BaseServiceError, DeadlineExceededError
+
+from utils.deadline import Deadline
+from utils.logger import logger_config
+
+log = logger_config(__name__)
+
+
+class PartialResult:
+    """
+    Outcome of a fan-out: the calls that succeeded and the errors of the ones that did not.
+    """
+
+    def __init__(self, results: Dict[str, Any], errors: Dict[str, BaseException]):
+        self.results = results
+        self.errors = errors
+
+    def __getitem__(self, name: str) -> Any:
+        return self.results[name]
+
+    def get(self, name: str, default: Optional[Any] = None) -> Any:
+        return self.results.get(name, default)
+
+    def ok(self, name: str) -> bool:
+        return name in self.results
+
+
+async def fan_out(
+    calls: Dict[str, Awaitable[Any]],
+    deadline: Deadline,
+    required: Iterable[str] = (),
+) -> PartialResult:
+    """
+    Run independent upstream calls concurrently within the remaining deadline budget.
+    Failures of optional calls are collected; a failed required call is raised.
+    """
+    tasks = {name: asyncio.ensure_future(call) for name, call in calls.items()}
+    try:
+        if tasks:
+            await asyncio.wait(tasks.values(), timeout=deadline.remaining())
+    finally:
+        # Also reached when the caller is cancelled (deadline, client disconnect)
+        pending = [task for task in tasks.values() if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending)
+
+    results: Dict[str, Any] = {}
+    errors: Dict[str, BaseException] = {}
+    for name, task in tasks.items():
+        if task.cancelled():
+            errors[name] = DeadlineExceededError(
+                f"{name} did not complete within {deadline.timeout}s"
+            )
+        elif task.exception() is not None:
+            errors[name] = task.exception()  # type: ignore[assignment]
+        else:
+            results[name] = task.result()
+
+    for name, error in errors.items():
+        log.error("Fan-out call %s failed: %s", name, error)
+    for name in required:
+        if name in errors:
+            error = errors[name]
+            if isinstance(error, BaseServiceError):
+                raise error
+            raise BaseServiceError(f"{name} failed: {error}") from error
+    return PartialResult(results, errors)
@@ -0,0 +1,92 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional
+
+from utils.cache import TTLCache
+from utils.logger import logger_config
+
+log = logger_config(__name__)
+
+
+@dataclass
+class TeamEntry:
+    team_id: int
+    team_name: str
+    players: Dict[str, int] = field(default_factory=dict)
+
+    def has_players(self, player_names: Iterable[str]) -> bool:
+        return all(player_name in self.players for player_name in player_names)
+
+
+class TeamDirectory:
+    """
+    Cache of team name to team ID and player name to player ID mappings.
+    Filled from team service lookups and kept current from consumed events.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self._teams: TTLCache[str, TeamEntry] = TTLCache(
+            max_entries, ttl, on_evict=self._forget
+        )
+        self._names_by_id: Dict[int, str] = {}
+
+    def lookup(self, team_name: str) -> Optional[TeamEntry]:
+        return self._teams.get(team_name)
+
+    def store(self, players_data: Dict[str, Any]) -> TeamEntry:
+        entry = TeamEntry(
+            team_id=players_data["team_id"],
+            team_name=players_data["team_name"],
+            players={
+                player["player_name"]: player["player_id"]
+                for player in players_data.get("players_data") or []
+            },
+        )
+        self._teams.set(entry.team_name, entry)
+        self._names_by_id[entry.team_id] = entry.team_name
+        return entry
+
+    def add_player(
+        self,
+        player_id: int,
+        player_name: str,
+        team_name: Optional[str] = None,
+        team_id: Optional[int] = None,
+    ) -> None:
+        if team_name is None and team_id is not None:
+            team_name = self._names_by_id.get(team_id)
+        if team_name is None:
+            return
+        entry = self._teams.get(team_name)
+        if entry is not None:
+            entry.players[player_name] = player_id
+
+    def invalidate(
+        self, team_name: Optional[str] = None, team_id: Optional[int] = None
+    ) -> None:
+        if team_name is None and team_id is not None:
+            team_name = self._names_by_id.get(team_id)
+        if team_name is not None:
+            self._teams.pop(team_name)
+
+    def apply_event(self, event_type: str, data: Dict[str, Any]) -> None:
+        if event_type == "team_created":
+            self.store({**data, "players_data": []})
+        elif event_type == "team_joined":
+            self.invalidate(data.get("team_name"), data.get("team_id"))
+        elif event_type == "player_created":
+            if "player_id" in data and "player_name" in data:
+                self.add_player(
+                    data["player_id"],
+                    data["player_name"],
+                    data.get("team_name"),
+                    data.get("team_id"),
+                )
+            else:
+                self.invalidate(data.get("team_name"), data.get("team_id"))
+
+    def _forget(self, team_name: str, entry: TeamEntry) -> None:
+        if self._names_by_id.get(entry.team_id) == team_name:
+            del self._names_by_id[entry.team_id]
+
+    def stats(self) -> Dict[str, Any]:
+        return self._teams.stats()
@@ -1,126 +1,431 @@
-import asyncio
 from fastapi import FastAPI
+import asyncio
 import httpx
-from typing import Any, Dict, Optional
+import json
+import re
+import time
+from typing import Any, Awaitable, Dict, List, Optional, Sequence, TypeVar, Union
+
+from pydantic import TypeAdapter, ValidationError
 
 from exceptions.gateway_exceptions import (
+    DeadlineExceededError,
     RatingError,
     TeamError,
     PlayerError,
+    UpstreamResponseError,
 )
 
-from utils.logger import logger_config
+from utils.logger import logger_config, payload_preview, should_log_payload
+from utils.metrics import (
+    DEGRADED_RESPONSES,
+    EVENT_WAIT,
+    EVENT_WAIT_TIMEOUTS,
+    UPSTREAM_IN_FLIGHT,
+    UPSTREAM_LATENCY,
+)
 from utils.config import get_settings
-
-from resolver.team_schema import (
-    TeamDataType,
+from utils.deadline import Deadline, remaining_budget
+from utils.singleflight import SingleFlight
+from utils import json_codec
+from utils.profiling import spans
+from utils.tracing import tracing
+
+from service.batching import RequestBatcher
+from service.composition import fan_out
+from service.hedging import Hedger
+from service.directory import TeamDirectory, TeamEntry
+from service.graphql_documents import (
+    GET_PLAYERS,
+    GET_PLAYERS_RATING,
+    PLAYERS_RATING_SELECTION,
+    PLAYERS_SELECTION,
+    GraphQLDocument,
+    aliased_document,
+    create_player_mutation,
+    create_team_mutation,
+    join_team_mutation,
+    persisted_query_error,
+    rate_players_mutation,
 )
-
-from resolver.player_schema import (
-    PlayerDataType,
+from service.http_client import UpstreamClients
+from service.team_view_cache import TeamViewCache
+from service.team_updates import TeamUpdateHub
+from service.operations import Operation, OperationStore
+from service.rendezvous import (
+    CORRELATION_ID_HEADER,
+    REPLY_TO_HEADER,
+    EventRendezvous,
+    EventWaiter,
 )
 
-from models.team_model import (
-    TeamData,
-    TeamDetails,
-    TeamDataInput,
-    TeamInfoData,
+from models.payloads import (
+    PLAYER_DATA,
+    TEAM_DATA,
+    TEAM_PLAYERS,
+    TEAM_RATINGS,
+    PlayerDataPayload,
+    TeamDataPayload,
+    TeamDetailsPayload,
+    TeamPlayersPayload,
+    TeamRatingsPayload,
 )
 
+from models.team_model import TeamDataInput
+
 from models.rating_model import PlayerRating, TeamRatingInput, TeamScoreInput
 
-from models.player_model import (
-    PlayerData,
-    PlayerDataInput,
-    PlayerDetails,
-)
+from models.player_model import PlayerDataInput
 
 
 log = logger_config(__name__)
 settings = get_settings()
 
+MUTATION_PATTERN = re.compile(r"^\s*mutation\b")
+DEADLINE_HEADER = "X-Request-Timeout-Ms"
+
+T = TypeVar("T")
+
 
 class GatewayService:
-    message_store: Dict[str, Any] = {}
-    message_condition: Dict[str, asyncio.Condition] = {}
+    rendezvous: EventRendezvous = EventRendezvous(
+        settings.EVENT_MAX_WAITERS, settings.EVENT_MATCH_UNCORRELATED
+    )
+    directory: TeamDirectory = TeamDirectory(
+        settings.DIRECTORY_CACHE_MAX_ENTRIES, settings.DIRECTORY_CACHE_TTL
+    )
+    team_views: TeamViewCache = TeamViewCache(
+        max_entries=settings.TEAM_VIEW_CACHE_MAX_ENTRIES,
+        max_bytes=settings.TEAM_VIEW_CACHE_MAX_BYTES,
+        ttl=settings.TEAM_VIEW_CACHE_TTL,
+        stale_ttl=settings.TEAM_VIEW_CACHE_STALE_TTL,
+    )
+    single_flight: SingleFlight = SingleFlight(
+        settings.SINGLE_FLIGHT_MAX_TRACKED_KEYS, settings.SINGLE_FLIGHT_DEADLINE_SLACK
+    )
+    http_clients: Optional[UpstreamClients] = None
+    batchers: Dict[str, Optional[RequestBatcher]] = {}
+    reply_to: Optional[str] = None
+    hedger: Hedger = Hedger(
+        settings.HEDGE_PERCENTILE,
+        settings.HEDGE_MIN_SAMPLES,
+        settings.HEDGE_WINDOW,
+        settings.HEDGE_BUDGET,
+        settings.HEDGE_BUDGET_BURST,
+    )
+    team_updates: TeamUpdateHub = TeamUpdateHub(
+        settings.TEAM_UPDATES_QUEUE_SIZE, settings.TEAM_UPDATES_MAX_SUBSCRIBERS
+    )
+    operations: OperationStore = OperationStore(
+        max_pending=settings.ASYNC_OPERATION_MAX_PENDING,
+        max_finished=settings.ASYNC_OPERATION_MAX_FINISHED,
+        timeout=settings.ASYNC_OPERATION_TIMEOUT,
+        retention=settings.ASYNC_OPERATION_RETENTION,
+        match_uncorrelated=settings.EVENT_MATCH_UNCORRELATED,
+    )
+
+    @staticmethod
+    def start_http_clients() -> UpstreamClients:
+        if GatewayService.http_clients is None:
+            GatewayService.http_clients = UpstreamClients.from_settings(settings)
+        return GatewayService.http_clients
+
+    @staticmethod
+    async def close_http_clients() -> None:
+        if GatewayService.http_clients is not None:
+            await GatewayService.http_clients.close()
+            GatewayService.http_clients = None
+            GatewayService.batchers = {}
 
     @staticmethod
     async def send_request(
-        url: str, payload: Dict[str, Any]
+        url: str,
+        payload: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None,
+        read_only: Optional[bool] = None,
+    ) -> Optional[Dict[Any, Any]]:
+        query = payload.get("query") or ""
+        if read_only is None:
+            read_only = not MUTATION_PATTERN.match(query)
+        operation = payload.get("operationName") or " ".join(query.split())
+        with (
+            spans.span("send_request", operation),
+            tracing.span(
+                f"send_request {payload.get('operationName') or 'anonymous'}",
+                {
+                    "graphql.operation.name": payload.get("operationName"),
+                    "graphql.operation.type": "query" if read_only else "mutation",
+                    "url.full": url,
+                },
+                kind="client",
+            ),
+        ):
+            if not read_only:
+                return await GatewayService.post_request(url, payload, headers)
+            if not settings.SINGLE_FLIGHT_ENABLED:
+                return await GatewayService.read_request(
+                    url, operation, payload, headers
+                )
+            # Identical concurrent reads share one upstream call
+            variables = json.dumps(payload.get("variables"), sort_keys=True)
+            extensions = json.dumps(payload.get("extensions"), sort_keys=True)
+            return await GatewayService.single_flight.do(
+                (url, operation, query, variables, extensions),
+                f"{url} {operation} {variables}",
+                lambda: GatewayService.read_request(url, operation, payload, headers),
+            )
+
+    @staticmethod
+    async def read_request(
+        url: str,
+        operation: str,
+        payload: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Optional[Dict[Any, Any]]:
+        if not settings.HEDGED_READS:
+            return await GatewayService.dispatch_request(url, payload, headers)
+        return await GatewayService.hedger.run(
+            f"{url} {operation}",
+            lambda: GatewayService.dispatch_request(url, payload, headers),
+        )
+
+    @staticmethod
+    async def dispatch_request(
+        url: str, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None
     ) -> Optional[Dict[Any, Any]]:
+        # Requests carrying their own headers cannot share a batch POST
+        batcher = None if headers else GatewayService.batcher_for(url)
+        if batcher is None:
+            return await GatewayService.post_request(url, payload, headers)
+        return await batcher.submit(payload)
+
+    @staticmethod
+    def batcher_for(url: str) -> Optional[RequestBatcher]:
+        if url in GatewayService.batchers:
+            return GatewayService.batchers[url]
+        upstream = GatewayService.start_http_clients().upstream(url)
+        batcher = None
+        if upstream is not None and upstream.batching:
+            batcher = RequestBatcher(
+                send_one=lambda payload: GatewayService.post_request(url, payload),
+                send_batch=lambda payloads: GatewayService.post_request(url, payloads),
+                window=upstream.batch_window,
+                max_size=upstream.batch_max_size,
+            )
+        GatewayService.batchers[url] = batcher
+        return batcher
+
+    @staticmethod
+    async def execute(
+        url: str,
+        document: GraphQLDocument,
+        variables: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Optional[Dict[Any, Any]]:
+        """
+        Send a registered document. Upstreams with persisted queries enabled get the
+        APQ hash only, and the full document when they do not know the hash yet.
+        """
+        clients = GatewayService.start_http_clients()
+        if not document.persistable or not clients.persisted_queries(url):
+            return await GatewayService.send_request(
+                url, document.payload(variables), headers, document.read_only
+            )
+
+        response = await GatewayService.send_request(
+            url,
+            document.payload(variables, persisted=True, include_query=False),
+            headers,
+            document.read_only,
+        )
+        # Only an APQ error proves the upstream did not run the operation; an empty
+        # (failed) response may still have committed a mutation, so it is not resent
+        error = persisted_query_error(response)
+        if error is None:
+            return response
+        if error == "PersistedQueryNotSupported":
+            clients.disable_persisted_queries(url)
+        log.info("Sending full document for %s to %s", document.operation_name, url)
+        return await GatewayService.send_request(
+            url,
+            document.payload(variables, persisted=error == "PersistedQueryNotFound"),
+            headers,
+            document.read_only,
+        )
+
+    @staticmethod
+    async def post_request(
+        url: str, payload: Any, headers: Optional[Dict[str, str]] = None
+    ) -> Any:
+        clients = GatewayService.start_http_clients()
+        upstream = clients.upstream(url)
+        default_timeout = upstream.timeout if upstream else settings.FAN_OUT_DEADLINE
+        timeout = remaining_budget(default_timeout)
+        if timeout <= 0:
+            raise DeadlineExceededError(f"No time budget left for the request to {url}")
+        headers = {
+            **(headers or {}),
+            "Content-Type": "application/json",
+            DEADLINE_HEADER: str(int(timeout * 1000)),
+        }
+        tracing.inject(headers)
+        # Fails fast with UpstreamUnavailableError while the upstream is unhealthy
+        guard = clients.guard(url)
+        started = guard.acquire() if guard is not None else time.perf_counter()
+        upstream_name = upstream.name if upstream else "unknown"
+        operation = (
+            payload.get("operationName") or "anonymous"
+            if isinstance(payload, dict)
+            else "batch"
+        )
+        in_flight = UPSTREAM_IN_FLIGHT.labels(upstream_name)
+        in_flight.inc()
+        success = False
+        cancelled = False
+        expired = False
         try:
-            log.info(f"Sending request to {url} with payload: {payload}")
-            async with httpx.AsyncClient(timeout=5) as client:
-                response = await client.post(url, json=payload)
-                response.raise_for_status()
-                log.info(f"Response received from {url}: {response.json()}")
-                return response.json()
+            if should_log_payload(log):
+                log.debug("Sending request to %s: %s", url, payload_preview(payload))
+            client = clients.get(url)
+            response = await client.post(
+                url, content=json_codec.dumps(payload), headers=headers, timeout=timeout
+            )
+            response.raise_for_status()
+            data = json_codec.loads(response.content)
+            if should_log_payload(log):
+                log.debug("Response received from %s: %s", url, payload_preview(data))
+            success = True
+            return data
         except httpx.HTTPStatusError as e:
             log.error(
-                f"Request to {url} failed with status {e.response.status_code}: {e.response.text}"
+                "Request to %s failed with status %s: %s",
+                url,
+                e.response.status_code,
+                payload_preview(e.response.text),
             )
+        except httpx.TimeoutException as e:
+            # A timeout cut short by the caller's deadline says nothing about the upstream
+            expired = timeout < default_timeout
+            log.error("Request to %s failed: %s", url, e)
         except httpx.RequestError as e:
-            log.error(f"Request to {url} failed: {e}")
+            log.error("Request to %s failed: %s", url, e)
+        except asyncio.CancelledError:
+            # A losing hedge or an abandoned caller says nothing about the upstream
+            cancelled = True
+            raise
         except Exception as e:
-            log.error(f"Unexpected error: {e}")
+            log.error("Unexpected error: %s", e)
+        finally:
+            in_flight.dec()
+            if cancelled:
+                outcome = "cancelled"
+            elif expired:
+                outcome = "deadline"
+            else:
+                outcome = "ok" if success else "error"
+            UPSTREAM_LATENCY.labels(upstream_name, operation, outcome).observe(
+                time.perf_counter() - started
+            )
+            if guard is not None and (cancelled or expired):
+                guard.abandon()
+            elif guard is not None:
+                guard.release(started, success)
         return {}
 
     @staticmethod
-    async def wait_for_event(event_type: str, timeout: int = 5) -> Optional[Any]:
-        if event_type not in GatewayService.message_condition:
-            GatewayService.message_condition[event_type] = asyncio.Condition()
-
-        condition = GatewayService.message_condition[event_type]
-        async with condition:
-            try:
-                await asyncio.wait_for(condition.wait(), timeout)
-                return GatewayService.message_store.pop(event_type, None)
-            except asyncio.TimeoutError:
-                log.error(f"Timeout waiting for response to event type {event_type}")
-                return None
-            finally:
-                if event_type in GatewayService.message_condition:
-                    del GatewayService.message_condition[event_type]
+    def event_headers(correlation_id: Optional[str]) -> Optional[Dict[str, str]]:
+        if correlation_id is None:
+            return None
+        headers = {CORRELATION_ID_HEADER: correlation_id}
+        if GatewayService.reply_to:
+            headers[REPLY_TO_HEADER] = GatewayService.reply_to
+        return headers
+
+    @staticmethod
+    def expect_event(
+        event_type: str, correlation_id: Optional[str] = None
+    ) -> EventWaiter:
+        return GatewayService.rendezvous.register(event_type, correlation_id)
+
+    @staticmethod
+    async def wait_for_event(
+        waiter: EventWaiter, timeout: Optional[float] = None
+    ) -> Optional[Any]:
+        started = time.perf_counter()
+        with (
+            spans.span("wait_for_event", waiter.event_type),
+            tracing.span(
+                f"wait_for_event {waiter.event_type}",
+                {
+                    "messaging.operation.name": waiter.event_type,
+                    "messaging.message.conversation_id": waiter.correlation_id,
+                },
+            ) as span,
+        ):
+            message = await GatewayService.rendezvous.wait(
+                waiter,
+                remaining_budget(
+                    settings.EVENT_WAIT_TIMEOUT if timeout is None else timeout
+                ),
+            )
+            if span is not None:
+                span.set_attribute("gateway.event.timed_out", message is None)
+        EVENT_WAIT.labels(waiter.event_type).observe(time.perf_counter() - started)
+        if message is None:
+            EVENT_WAIT_TIMEOUTS.labels(waiter.event_type).inc()
+        return message
+
+    @staticmethod
+    def apply_broadcast(event_type: str, data: Dict[str, Any]) -> None:
+        """
+        Bring the directory, cached team views and team update streams up to date
+        with an event, whichever replica's request caused it.
+        """
+        GatewayService.directory.apply_event(event_type, data)
+        if event_type == "rating_updated":
+            if data.get("team_name") is None and data.get("team_id") is None:
+                GatewayService.team_views.clear()
+            else:
+                GatewayService.team_views.invalidate(
+                    data.get("team_name"), data.get("team_id")
+                )
+            GatewayService.push_team_update(data.get("team_name"), data.get("team_id"))
 
     @staticmethod
     async def handle_message(
-        app: FastAPI, message: Dict[str, Any]
+        app: FastAPI, message: Dict[str, Any], correlation_id: Optional[str] = None
     ) -> Optional[Dict[str, Any]]:
         event_type = message["event_type"]
-        data = message["data"]
-        result_dict: Optional[Dict[str, Any]] = None
-        if event_type == "team_created" or event_type == "team_joined":
-            result = TeamData(**data)
-            result_dict = result.__dict__
-        else:
-            log.info(f"Event type {event_type} consumed but not handled.")
-            result_dict = data
-
-        if event_type in GatewayService.message_condition:
-            async with GatewayService.message_condition[event_type]:
-                GatewayService.message_store[event_type] = result_dict
-                GatewayService.message_condition[event_type].notify_all()
-        else:
-            log.error(f"Event type {event_type} not being waited for.")
-        return result_dict
+        with spans.span("handle_message", event_type):
+            data = message["data"]
+            result_dict: Optional[Dict[str, Any]] = None
+            if event_type == "team_created" or event_type == "team_joined":
+                result_dict = dict(TEAM_DATA.validate_python(data))
+            else:
+                log.info("Event type %s consumed but not handled.", event_type)
+                result_dict = data
+            GatewayService.apply_broadcast(event_type, data)
+
+            if not GatewayService.rendezvous.resolve(
+                event_type, correlation_id, result_dict
+            ) and not GatewayService.operations.complete(
+                event_type, correlation_id, result_dict
+            ):
+                log.error(
+                    "Event type %s (%s) not being waited for.",
+                    event_type,
+                    correlation_id,
+                )
+            return result_dict
 
     @staticmethod
     async def create_team(
-        new_team: TeamDataInput,
-    ) -> Optional[TeamDataType]:
-        mutation = f"""
-        mutation {{
-            create_team (new_team: {{
-                team_name: "{new_team.team_name}", 
-                team_password: "{new_team.team_password}"
-            }}) {{
-                team_id
-                team_name
-            }}
-        }}
-        """
-        response = await GatewayService.send_request(
-            settings.TEAM_SERVICE_URL, {"query": mutation}
+        new_team: TeamDataInput, correlation_id: Optional[str] = None
+    ) -> Optional[TeamDataPayload]:
+        response = await GatewayService.execute(
+            settings.TEAM_SERVICE_URL,
+            create_team_mutation(new_team.model_dump()),
+            headers=GatewayService.event_headers(correlation_id),
         )
 
         if not response:
@@ -128,31 +433,24 @@ class GatewayService:
 
         created_team_data = response["data"]["create_team"]
         if created_team_data:
-            created_team: Optional[TeamDataType] = TeamDataType(**created_team_data)
-            log.info(f"Created team: {created_team}")
+            created_team = GatewayService.validate_upstream(
+                TEAM_DATA, created_team_data, "team"
+            )
+            log.info("Created team: %s", created_team)
             return created_team
 
         error_messages = response["errors"][0]["message"]
-        log.error(f"Error creating team: {error_messages}")
+        log.error("Error creating team: %s", error_messages)
         raise TeamError(error_messages)
 
     @staticmethod
     async def create_player(
-        new_player: PlayerDataInput,
-    ) -> Optional[PlayerDataType]:
-        mutation = f"""
-        mutation {{
-            create_player (new_player: {{
-                player_name: "{new_player.player_name}", 
-                team_name: "{new_player.team_name}"
-            }}) {{
-                player_id
-                player_name
-            }}
-        }}
-        """
-        response = await GatewayService.send_request(
-            settings.TEAM_SERVICE_URL, {"query": mutation}
+        new_player: PlayerDataInput, correlation_id: Optional[str] = None
+    ) -> Optional[PlayerDataPayload]:
+        response = await GatewayService.execute(
+            settings.TEAM_SERVICE_URL,
+            create_player_mutation(new_player.model_dump()),
+            headers=GatewayService.event_headers(correlation_id),
         )
 
         if not response:
@@ -160,33 +458,28 @@ class GatewayService:
 
         created_player_data = response["data"]["create_player"]
         if created_player_data:
-            created_player: Optional[PlayerDataType] = PlayerDataType(
-                **created_player_data
+            created_player = GatewayService.validate_upstream(
+                PLAYER_DATA, created_player_data, "team"
+            )
+            GatewayService.directory.add_player(
+                created_player["player_id"],
+                created_player["player_name"],
+                team_name=new_player.team_name,
             )
-            log.info(f"Created player: {created_player}")
+            log.info("Created player: %s", created_player)
             return created_player
 
         error_messages = response["errors"][0]["message"]
-        log.error(f"Error creating player: {error_messages}")
+        log.error("Error creating player: %s", error_messages)
         raise PlayerError(error_messages)
 
     @staticmethod
     async def join_team(
         team_data: TeamDataInput,
-    ) -> Optional[TeamData]:
-        mutation = f"""
-        mutation {{
-            join_team (team_data: {{
-                team_name: "{team_data.team_name}", 
-                team_password: "{team_data.team_password}"
-            }}) {{
-                team_id
-                team_name
-            }}
-        }}
-        """
-        response = await GatewayService.send_request(
-            settings.TEAM_SERVICE_URL, {"query": mutation}
+    ) -> Optional[TeamDataPayload]:
+        response = await GatewayService.execute(
+            settings.TEAM_SERVICE_URL,
+            join_team_mutation(team_data.model_dump()),
         )
 
         if not response:
@@ -194,30 +487,37 @@ class GatewayService:
 
         joined_team_data = response["data"]["join_team"]
         if joined_team_data:
-            joined_team: Optional[TeamData] = TeamData(**joined_team_data)
-            log.info(f"Joined team: {joined_team}")
+            joined_team = GatewayService.validate_upstream(
+                TEAM_DATA, joined_team_data, "team"
+            )
+            log.info("Joined team: %s", joined_team)
             return joined_team
 
         error_messages = response["errors"][0]["message"]
-        log.error(f"Error joining team: {error_messages}")
+        log.error("Error joining team: %s", error_messages)
         raise TeamError(error_messages)
 
     @staticmethod
-    async def get_players_name(team_name: str) -> Optional[TeamInfoData]:
-        query = f"""
-        query {{
-            get_players (team_name: "{team_name}") {{
-                team_id
-                team_name
-                players_data {{
-                    player_id
-                    player_name
-                }}
-            }}
-        }}
-        """
-        response = await GatewayService.send_request(
-            settings.TEAM_SERVICE_URL, {"query": query}
+    def validate_upstream(adapter: TypeAdapter[T], data: Any, service_name: str) -> T:
+        try:
+            return adapter.validate_python(data)
+        except ValidationError as e:
+            log.error("Invalid response from the %s service: %s", service_name, e)
+            raise UpstreamResponseError(service_name) from e
+
+    @staticmethod
+    def validate_many(
+        adapter: TypeAdapter[Any], data: Any, service_name: str
+    ) -> Union[Dict[str, Any], BaseException]:
+        try:
+            return GatewayService.validate_upstream(adapter, data, service_name)
+        except UpstreamResponseError as e:
+            return e
+
+    @staticmethod
+    async def get_players_name(team_name: str) -> Optional[TeamPlayersPayload]:
+        response = await GatewayService.execute(
+            settings.TEAM_SERVICE_URL, GET_PLAYERS, {"team_name": team_name}
         )
 
         if not response:
@@ -225,28 +525,32 @@ class GatewayService:
 
         players_data = response["data"]["get_players"]
         if players_data:
-            log.info(f"Players data: {players_data}")
-            return players_data
+            team_players = GatewayService.validate_upstream(
+                TEAM_PLAYERS, players_data, "team"
+            )
+            if should_log_payload(log):
+                log.debug("Players data: %s", payload_preview(team_players))
+            GatewayService.directory.store(team_players)  # type: ignore[arg-type]
+            return team_players
 
         error_messages = response["errors"][0]["message"]
-        log.error(f"Error getting team info: {error_messages}")
+        log.error("Error getting team info: %s", error_messages)
         raise TeamError(error_messages)
 
     @staticmethod
-    async def get_players_rating(team_id: int) -> Optional[PlayerData]:
-        query = f"""
-        query {{
-            get_players_rating (team_id: {team_id}) {{
-                team_id
-                players_data {{
-                    player_id
-                    player_average_rating
-                }}
-            }}
-        }}
-        """
-        response = await GatewayService.send_request(
-            settings.RATING_SERVICE_URL, {"query": query}
+    async def resolve_team(team_name: str, player_names: List[str]) -> TeamEntry:
+        team = GatewayService.directory.lookup(team_name)
+        if team is not None and team.has_players(player_names):
+            return team
+        players_data = await GatewayService.get_players_name(team_name)
+        if not players_data:
+            raise TeamError("No response received from the team service")
+        return GatewayService.directory.store(players_data)  # type: ignore[arg-type]
+
+    @staticmethod
+    async def get_players_rating(team_id: int) -> Optional[TeamRatingsPayload]:
+        response = await GatewayService.execute(
+            settings.RATING_SERVICE_URL, GET_PLAYERS_RATING, {"team_id": team_id}
         )
 
         if not response:
@@ -254,81 +558,221 @@ class GatewayService:
 
         players_data = response["data"]["get_players_rating"]
         if players_data:
-            log.info(f"Players data: {players_data}")
-            return players_data
+            team_ratings = GatewayService.validate_upstream(
+                TEAM_RATINGS, players_data, "rating"
+            )
+            if should_log_payload(log):
+                log.debug("Players data: %s", payload_preview(team_ratings))
+            return team_ratings
 
         error_messages = response["errors"][0]["message"]
-        log.error(f"Error getting team info: {error_messages}")
+        log.error("Error getting team info: %s", error_messages)
         raise TeamError(error_messages)
 
     @staticmethod
-    async def get_players_data(player_data: PlayerDataInput) -> TeamDetails:
-        players_data = await GatewayService.get_players_name(player_data.team_name)
+    async def execute_aliased(
+        url: str, document: GraphQLDocument, keys: Sequence[Any], service_name: str
+    ) -> List[Union[Dict[str, Any], BaseException]]:
+        """
+        Execute an aliased batch document and split the result per key; keys the
+        upstream could not resolve get a TeamError instead of failing the batch.
+        """
+        response = await GatewayService.execute(
+            url, document, {f"t{index}": key for index, key in enumerate(keys)}
+        )
+        if not response:
+            error = TeamError(f"No response received from the {service_name} service")
+            return [error for _ in keys]
+
+        data = response.get("data") or {}
+        errors: Dict[str, str] = {}
+        for error in response.get("errors") or []:
+            path = error.get("path") or [None]
+            errors[str(path[0])] = error.get("message", "Unknown error")
+        return [
+            data[f"t{index}"]
+            if data.get(f"t{index}")
+            else TeamError(errors.get(f"t{index}", f"{key} not found"))
+            for index, key in enumerate(keys)
+        ]
+
+    @staticmethod
+    async def get_players_name_many(
+        team_names: Sequence[str],
+    ) -> List[Union[Dict[str, Any], BaseException]]:
+        document = aliased_document(
+            "GetPlayersBatch",
+            "get_players",
+            "team_name",
+            "String!",
+            PLAYERS_SELECTION,
+            len(team_names),
+        )
+        results = await GatewayService.execute_aliased(
+            settings.TEAM_SERVICE_URL, document, team_names, "team"
+        )
+        validated: List[Union[Dict[str, Any], BaseException]] = []
+        for result in results:
+            if isinstance(result, dict):
+                result = GatewayService.validate_many(TEAM_PLAYERS, result, "team")
+            if isinstance(result, dict):
+                GatewayService.directory.store(result)
+            validated.append(result)
+        return validated
+
+    @staticmethod
+    async def get_players_rating_many(
+        team_ids: Sequence[int],
+    ) -> List[Union[Dict[str, Any], BaseException]]:
+        document = aliased_document(
+            "GetPlayersRatingBatch",
+            "get_players_rating",
+            "team_id",
+            "Int!",
+            PLAYERS_RATING_SELECTION,
+            len(team_ids),
+        )
+        results = await GatewayService.execute_aliased(
+            settings.RATING_SERVICE_URL, document, team_ids, "rating"
+        )
+        return [
+            GatewayService.validate_many(TEAM_RATINGS, result, "rating")
+            if isinstance(result, dict)
+            else result
+            for result in results
+        ]
+
+    @staticmethod
+    async def get_players_data(
+        player_data: PlayerDataInput, team_id: Optional[int] = None
+    ) -> TeamDetailsPayload:
+        """
+        Compose the team details from the team and rating services.
+        When the team id is already known both services are queried concurrently,
+        and a failing rating service degrades to players without ratings.
+        """
+        deadline = Deadline(remaining_budget(settings.FAN_OUT_DEADLINE))
+        calls: Dict[str, Awaitable[Any]] = {
+            "players": GatewayService.get_players_name(player_data.team_name)
+        }
+        if team_id is not None:
+            calls["ratings"] = GatewayService.get_players_rating(team_id)
+        result = await fan_out(calls, deadline, required=("players",))
+        players_data = result["players"]
 
         if not players_data:
             raise TeamError("No response received from the team service")
 
-        players_rating = await GatewayService.get_players_rating(
-            players_data["team_id"]  # type: ignore[index]
+        players_rating = result.get("ratings")
+        stale = (
+            players_rating is not None
+            and players_rating["team_id"] != players_data["team_id"]
         )
-
-        if not players_rating:
-            raise TeamError("No response received from the rating service")
+        # Only an unknown or stale team id needs the ratings fetched after the
+        # players; a failed concurrent call is not retried inline
+        if "ratings" not in calls or stale:
+            result = await fan_out(
+                {"ratings": GatewayService.get_players_rating(players_data["team_id"])},
+                deadline,
+            )
+            players_rating = result.get("ratings")
+        if players_rating is None:
+            DEGRADED_RESPONSES.labels("ratings").inc()
+            log.warning(
+                "Team %s served without ratings: %s",
+                players_data["team_name"],
+                result.errors.get("ratings"),
+            )
 
         player_ratings_dict = {
             rating["player_id"]: rating["player_average_rating"]
-            for rating in players_rating["players_data"]  # type: ignore[index]
+            for rating in (players_rating or {}).get("players_data", [])
         }
-        players_details = TeamDetails(
-            team_id=players_data["team_id"],  # type: ignore[index]
-            team_name=players_data["team_name"],  # type: ignore[index]
-            players_data=[
-                PlayerDetails(
-                    player_name=player["player_name"],
-                    player_average_rating=player_ratings_dict.get(
-                        player["player_id"], None
+        # Both sides were validated on arrival, so the view is assembled as plain dicts
+        return {
+            "team_id": players_data["team_id"],
+            "team_name": players_data["team_name"],
+            "players_data": [
+                {
+                    "player_name": player["player_name"],
+                    "player_average_rating": player_ratings_dict.get(
+                        player["player_id"]
                     ),
-                )
-                for player in players_data["players_data"]  # type: ignore[index]
+                }
+                for player in players_data["players_data"]
             ],
+        }
+
+    @staticmethod
+    async def get_team_view(
+        player_data: PlayerDataInput, team_id: Optional[int] = None
+    ) -> TeamDetailsPayload:
+        return await GatewayService.team_views.get(
+            player_data.team_name,
+            lambda: GatewayService.get_players_data(player_data, team_id),
         )
-        return players_details
 
     @staticmethod
-    async def update_rating(team_data: TeamScoreInput) -> Optional[TeamDetails]:
-        players_info = await GatewayService.get_players_name(team_data.team_name)
+    async def operation_result(operation: Operation) -> Optional[Any]:
+        """
+        Result of a completed operation; writes that answer with the team details
+        resolve them once, on first read.
+        """
+        team_name = operation.context.get("team_name")
+        if team_name is not None and operation.result is not None:
+            operation.result = await GatewayService.get_team_view(
+                PlayerDataInput(team_name=team_name, player_name=""),
+                operation.context.get("team_id"),
+            )
+            operation.context.pop("team_name", None)
+        return operation.result
+
+    @staticmethod
+    def push_team_update(team_name: Optional[str], team_id: Optional[int]) -> None:
+        """
+        Refresh a team once for all of its update subscribers, off the consumer path.
+        """
+        team_name = team_name or GatewayService.team_updates.team_name(team_id)
+        if team_name is None or not GatewayService.team_updates.has_subscribers(
+            team_name
+        ):
+            return
+
+        async def refresh() -> None:
+            view = await GatewayService.get_team_view(
+                PlayerDataInput(team_name=team_name, player_name=""), team_id
+            )
+            GatewayService.team_updates.publish(view)
+
+        GatewayService.team_updates.schedule_refresh(team_name, refresh)
 
+    @staticmethod
+    async def update_rating(
+        team_data: TeamScoreInput, correlation_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
         # Need to consolidate player name and player rating with the player id to build the mutation
-        player_name_to_id = {
-            player["player_name"]: player["player_id"]
-            for player in players_info["players_data"]  # type: ignore[index]
-        }
+        team = await GatewayService.resolve_team(
+            team_data.team_name,
+            [player.player_name for player in team_data.players_data],
+        )
 
         player_ratings = []
         for player in team_data.players_data:
-            player_id = player_name_to_id.get(player.player_name, None)
+            player_id = team.players.get(player.player_name, None)
             if player_id is not None:
                 player_ratings.append(
                     PlayerRating(player_id=player_id, player_score=player.player_score)
                 )
 
         team_rating_input = TeamRatingInput(
-            team_id=players_info["team_id"],  # type: ignore[index]
+            team_id=team.team_id,
             players_data=player_ratings,
         )
 
-        mutation = f"""
-        mutation {{
-            rate_players (team_rating: {{
-                team_id: {team_rating_input.team_id},
-                players_data: [{', '.join([f'{{player_id: {rating.player_id}, player_score: {rating.player_score}}}' for rating in team_rating_input.players_data])}]
-            }}) {{
-                team_id
-            }}
-        }}
-        """
-        response = await GatewayService.send_request(
-            settings.RATING_SERVICE_URL, {"query": mutation}
+        response = await GatewayService.execute(
+            settings.RATING_SERVICE_URL,
+            rate_players_mutation(team_rating_input.model_dump()),
+            headers=GatewayService.event_headers(correlation_id),
         )
 
         if not response:
@@ -336,9 +780,12 @@ class GatewayService:
 
         updated_player_data = response["data"]["rate_players"]
         if updated_player_data:
-            log.info(f"Updated players data: {updated_player_data}")
+            if should_log_payload(log):
+                log.debug(
+                    "Updated players data: %s", payload_preview(updated_player_data)
+                )
             return updated_player_data
 
         error_messages = response["errors"][0]["message"]
-        log.error(f"Error updating players rating: {error_messages}")
+        log.error("Error updating players rating: %s", error_messages)
         raise RatingError(error_messages)
@@ -0,0 +1,189 @@
+import hashlib
+import json
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+
+@dataclass(frozen=True)
+class GraphQLDocument:
+    """
+    Static upstream GraphQL operation, normalized and hashed once at import.
+    Documents carrying literal values are not `persistable`: their hash would never
+    be seen twice, so they are always sent in full.
+    """
+
+    operation_name: str
+    query: str
+    read_only: bool
+    persistable: bool = True
+    sha256_hash: str = field(init=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "query", " ".join(self.query.split()))
+        object.__setattr__(
+            self, "sha256_hash", hashlib.sha256(self.query.encode("utf-8")).hexdigest()
+        )
+
+    def payload(
+        self,
+        variables: Optional[Dict[str, Any]] = None,
+        persisted: bool = False,
+        include_query: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Build the request body. Persisted payloads carry the APQ hash and, unless the
+        upstream asked to register it, no query text.
+        """
+        payload: Dict[str, Any] = {
+            "operationName": self.operation_name,
+            "variables": variables or {},
+        }
+        if include_query or not persisted:
+            payload["query"] = self.query
+        if persisted:
+            payload["extensions"] = {
+                "persistedQuery": {"version": 1, "sha256Hash": self.sha256_hash}
+            }
+        return payload
+
+
+def graphql_literal(value: Any) -> str:
+    """
+    GraphQL literal for a JSON-compatible value. Strings are escaped as JSON
+    strings, whose escapes GraphQL shares; object keys are trusted field names.
+    """
+    if isinstance(value, dict):
+        fields = ", ".join(
+            f"{key}: {graphql_literal(item)}" for key, item in value.items()
+        )
+        return f"{{{fields}}}"
+    if isinstance(value, (list, tuple)):
+        return f"[{', '.join(graphql_literal(item) for item in value)}]"
+    return json.dumps(value)
+
+
+def mutation_document(
+    operation_name: str,
+    field_name: str,
+    argument: str,
+    value: Dict[str, Any],
+    selection: str,
+) -> GraphQLDocument:
+    """
+    Mutation passing its input as an inline object literal, as the upstream
+    services' input type names are not part of their contract with the gateway.
+    """
+    return GraphQLDocument(
+        operation_name=operation_name,
+        read_only=False,
+        persistable=False,
+        query=(
+            f"mutation {operation_name} {{ {field_name}({argument}: "
+            f"{graphql_literal(value)}) {{ {selection} }} }}"
+        ),
+    )
+
+
+def create_team_mutation(new_team: Dict[str, Any]) -> GraphQLDocument:
+    return mutation_document(
+        "CreateTeam", "create_team", "new_team", new_team, "team_id team_name"
+    )
+
+
+def create_player_mutation(new_player: Dict[str, Any]) -> GraphQLDocument:
+    return mutation_document(
+        "CreatePlayer",
+        "create_player",
+        "new_player",
+        new_player,
+        "player_id player_name",
+    )
+
+
+def join_team_mutation(team_data: Dict[str, Any]) -> GraphQLDocument:
+    return mutation_document(
+        "JoinTeam", "join_team", "team_data", team_data, "team_id team_name"
+    )
+
+
+def rate_players_mutation(team_rating: Dict[str, Any]) -> GraphQLDocument:
+    return mutation_document(
+        "RatePlayers", "rate_players", "team_rating", team_rating, "team_id"
+    )
+
+
+GET_PLAYERS = GraphQLDocument(
+    operation_name="GetPlayers",
+    read_only=True,
+    query="""
+    query GetPlayers($team_name: String!) {
+        get_players(team_name: $team_name) {
+            team_id
+            team_name
+            players_data {
+                player_id
+                player_name
+            }
+        }
+    }
+    """,
+)
+
+GET_PLAYERS_RATING = GraphQLDocument(
+    operation_name="GetPlayersRating",
+    read_only=True,
+    query="""
+    query GetPlayersRating($team_id: Int!) {
+        get_players_rating(team_id: $team_id) {
+            team_id
+            players_data {
+                player_id
+                player_average_rating
+            }
+        }
+    }
+    """,
+)
+
+
+PLAYERS_SELECTION = "team_id team_name players_data { player_id player_name }"
+PLAYERS_RATING_SELECTION = "team_id players_data { player_id player_average_rating }"
+
+
+@lru_cache(maxsize=256)
+def aliased_document(
+    operation_name: str,
+    field_name: str,
+    argument: str,
+    argument_type: str,
+    selection: str,
+    size: int,
+) -> GraphQLDocument:
+    """
+    Read document querying the same field `size` times under aliases t0..tN,
+    so a batch of keys is resolved in a single upstream operation.
+    """
+    variables = ", ".join(f"$t{index}: {argument_type}" for index in range(size))
+    fields = " ".join(
+        f"t{index}: {field_name}({argument}: $t{index}) {{ {selection} }}"
+        for index in range(size)
+    )
+    return GraphQLDocument(
+        operation_name=operation_name,
+        read_only=True,
+        query=f"query {operation_name}({variables}) {{ {fields} }}",
+    )
+
+
+def persisted_query_error(response: Optional[Dict[str, Any]]) -> Optional[str]:
+    """
+    Return the APQ error code (PersistedQueryNotFound/NotSupported) of a response, if any.
+    """
+    for error in (response or {}).get("errors") or []:
+        message = error.get("message", "")
+        code = (error.get("extensions") or {}).get("code", "")
+        for marker in ("PersistedQueryNotFound", "PersistedQueryNotSupported"):
+            if marker in message or marker.upper() in code.replace("_", "").upper():
+                return marker
+    return None
@@ -0,0 +1,113 @@
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+import time
+
+from utils.logger import logger_config
+
+log = logger_config(__name__)
+
+
+class LatencyWindow:
+    """
+    Latencies of the most recent successful calls of one operation.
+    """
+
+    def __init__(self, size: int):
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, latency: float) -> None:
+        self._samples.append(latency)
+
+    def percentile(self, percentile: float) -> float:
+        samples = sorted(self._samples)
+        index = min(len(samples) - 1, int(len(samples) * percentile / 100))
+        return samples[index]
+
+
+class Hedger:
+    """
+    Hedged idempotent reads: when an attempt has not answered after the
+    operation's recent p-th percentile latency, a second one is fired and the
+    first successful response wins; the other attempt is cancelled.
+    Hedges are paid from a token bucket refilled by `budget` per call (up to
+    `budget_burst`), so an upstream that turns uniformly slow sees at most
+    `budget` extra load instead of double.
+    """
+
+    def __init__(
+        self,
+        percentile: float,
+        min_samples: int,
+        window: int,
+        budget: float = 0.1,
+        budget_burst: float = 10.0,
+    ):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self.budget = budget
+        self.budget_burst = budget_burst
+        self.hedged = 0
+        self.hedges_won = 0
+        self.budget_exhausted = 0
+        self._tokens = budget_burst
+        self._latencies: Dict[str, LatencyWindow] = {}
+
+    def delay(self, key: str) -> Optional[float]:
+        latencies = self._latencies.get(key)
+        if latencies is None or len(latencies) < self.min_samples:
+            return None
+        return latencies.percentile(self.percentile)
+
+    def _spend(self) -> bool:
+        if self._tokens < 1:
+            self.budget_exhausted += 1
+            return False
+        self._tokens -= 1
+        return True
+
+    async def run(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        self._tokens = min(self.budget_burst, self._tokens + self.budget)
+        delay = self.delay(key)
+        started = time.perf_counter()
+        attempts: List[asyncio.Future] = [asyncio.ensure_future(call())]
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(attempts, timeout=delay)
+                if not done and self._spend():
+                    log.info("Hedging %s after %.3fs", key, delay)
+                    self.hedged += 1
+                    attempts.append(asyncio.ensure_future(call()))
+
+            pending = set(attempts)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for attempt in done:
+                    if attempt.exception() is None and attempt.result():
+                        self._latencies.setdefault(
+                            key, LatencyWindow(self.window)
+                        ).record(time.perf_counter() - started)
+                        if attempt is not attempts[0]:
+                            self.hedges_won += 1
+                        return attempt.result()
+            # Every attempt failed; report the first one like an unhedged call
+            return attempts[0].result()
+        finally:
+            for attempt in attempts:
+                if not attempt.done():
+                    attempt.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hedged": self.hedged,
+            "hedges_won": self.hedges_won,
+            "budget_exhausted": self.budget_exhausted,
+            "budget_tokens": round(self._tokens, 2),
+            "delays": {key: self.delay(key) for key in self._latencies},
+        }
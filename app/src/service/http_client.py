@@ -0,0 +1,218 @@
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import httpx
+
+from service.resilience import UpstreamGuard
+
+from utils.logger import logger_config
+from utils.config import Settings
+
+log = logger_config(__name__)
+
+try:
+    import h2  # type: ignore # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# First httpcore trace event emitted once the pool has handed the request a
+# connection, either a new one being opened or an existing one being reused.
+CONNECTION_ACQUIRED_EVENTS = frozenset(
+    {
+        "connection.connect_tcp.started",
+        "http11.send_request_headers.started",
+        "http2.send_request_headers.started",
+    }
+)
+
+
+@dataclass
+class UpstreamConfig:
+    name: str
+    url: str
+    max_connections: int
+    max_keepalive_connections: int
+    keepalive_expiry: float
+    http2: bool
+    timeout: float
+    persisted_queries: bool = False
+    batching: bool = False
+    batch_window: float = 0.0
+    batch_max_size: int = 1
+
+
+@dataclass
+class PoolWaitStats:
+    requests: int = 0
+    wait_time_total: float = 0.0
+    wait_time_max: float = 0.0
+
+    def record(self, wait_time: float) -> None:
+        self.requests += 1
+        self.wait_time_total += wait_time
+        if wait_time > self.wait_time_max:
+            self.wait_time_max = wait_time
+
+
+class InstrumentedTransport(httpx.AsyncHTTPTransport):
+    """
+    HTTP transport that measures how long each request waits for a pooled connection.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        acquired = False
+        parent_trace = request.extensions.get("trace")
+
+        async def trace(event_name: str, info: Dict[str, Any]) -> None:
+            nonlocal acquired
+            if not acquired and event_name in CONNECTION_ACQUIRED_EVENTS:
+                acquired = True
+                self.wait_stats.record(time.perf_counter() - started)
+            if parent_trace is not None:
+                await parent_trace(event_name, info)
+
+        request.extensions = {**request.extensions, "trace": trace}
+        return await super().handle_async_request(request)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        pool = self._pool
+        connections = list(getattr(pool, "connections", []))
+        requests = list(getattr(pool, "_requests", []))
+        idle = sum(1 for connection in connections if connection.is_idle())
+        queued = sum(1 for request in requests if request.is_queued())
+        wait_stats = self.wait_stats
+        return {
+            "connections": len(connections),
+            "in_use": len(connections) - idle,
+            "idle": idle,
+            "queued": queued,
+            "requests": wait_stats.requests,
+            "wait_time_avg": (
+                wait_stats.wait_time_total / wait_stats.requests
+                if wait_stats.requests
+                else 0.0
+            ),
+            "wait_time_max": wait_stats.wait_time_max,
+        }
+
+
+class UpstreamClients:
+    """
+    Registry of long-lived HTTP clients, one connection pool per upstream service.
+    """
+
+    def __init__(
+        self,
+        upstreams: Dict[str, UpstreamConfig],
+        guards: Optional[Dict[str, UpstreamGuard]] = None,
+    ):
+        self.upstreams = upstreams
+        self.guards = guards or {}
+        self.clients: Dict[str, httpx.AsyncClient] = {}
+        self.transports: Dict[str, InstrumentedTransport] = {}
+        self._by_url: Dict[str, str] = {}
+        for name, upstream in upstreams.items():
+            http2 = upstream.http2 and HTTP2_AVAILABLE
+            if upstream.http2 and not HTTP2_AVAILABLE:
+                log.warning("HTTP/2 requested for %s but h2 is not installed", name)
+            transport = InstrumentedTransport(
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=upstream.max_connections,
+                    max_keepalive_connections=upstream.max_keepalive_connections,
+                    keepalive_expiry=upstream.keepalive_expiry,
+                ),
+            )
+            self.transports[name] = transport
+            self.clients[name] = httpx.AsyncClient(
+                transport=transport, timeout=upstream.timeout
+            )
+            self._by_url[upstream.url] = name
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "UpstreamClients":
+        upstreams = {
+            "team": UpstreamConfig(
+                name="team",
+                url=settings.TEAM_SERVICE_URL,
+                max_connections=settings.TEAM_SERVICE_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.TEAM_SERVICE_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.TEAM_SERVICE_KEEPALIVE_EXPIRY,
+                http2=settings.TEAM_SERVICE_HTTP2,
+                timeout=settings.TEAM_SERVICE_TIMEOUT,
+                persisted_queries=settings.TEAM_SERVICE_PERSISTED_QUERIES,
+                batching=settings.TEAM_SERVICE_BATCHING,
+                batch_window=settings.UPSTREAM_BATCH_WINDOW_MS / 1000,
+                batch_max_size=settings.UPSTREAM_BATCH_MAX_SIZE,
+            ),
+            "rating": UpstreamConfig(
+                name="rating",
+                url=settings.RATING_SERVICE_URL,
+                max_connections=settings.RATING_SERVICE_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.RATING_SERVICE_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.RATING_SERVICE_KEEPALIVE_EXPIRY,
+                http2=settings.RATING_SERVICE_HTTP2,
+                timeout=settings.RATING_SERVICE_TIMEOUT,
+                persisted_queries=settings.RATING_SERVICE_PERSISTED_QUERIES,
+                batching=settings.RATING_SERVICE_BATCHING,
+                batch_window=settings.UPSTREAM_BATCH_WINDOW_MS / 1000,
+                batch_max_size=settings.UPSTREAM_BATCH_MAX_SIZE,
+            ),
+        }
+        return cls(
+            upstreams,
+            {
+                name: UpstreamGuard.from_settings(
+                    name, settings, upstream.max_connections
+                )
+                for name, upstream in upstreams.items()
+            },
+        )
+
+    def upstream_name(self, url: str) -> Optional[str]:
+        return self._by_url.get(url)
+
+    def upstream(self, url: str) -> Optional[UpstreamConfig]:
+        name = self._by_url.get(url)
+        return self.upstreams[name] if name is not None else None
+
+    def get(self, url: str) -> httpx.AsyncClient:
+        name = self._by_url.get(url)
+        if name is None:
+            raise KeyError(f"No upstream client registered for {url}")
+        return self.clients[name]
+
+    def guard(self, url: str) -> Optional[UpstreamGuard]:
+        name = self._by_url.get(url)
+        return self.guards.get(name) if name is not None else None
+
+    def persisted_queries(self, url: str) -> bool:
+        name = self._by_url.get(url)
+        return name is not None and self.upstreams[name].persisted_queries
+
+    def disable_persisted_queries(self, url: str) -> None:
+        name = self._by_url.get(url)
+        if name is not None and self.upstreams[name].persisted_queries:
+            log.warning("Upstream %s does not support persisted queries", name)
+            self.upstreams[name].persisted_queries = False
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: transport.pool_stats() for name, transport in self.transports.items()
+        }
+
+    def guard_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: guard.stats() for name, guard in self.guards.items()}
+
+    async def close(self) -> None:
+        for name, client in self.clients.items():
+            await client.aclose()
+            log.info("HTTP client for %s closed", name)
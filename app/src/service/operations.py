@@ -0,0 +1,194 @@
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Set
+
+from exceptions.gateway_exceptions import EventError
+from service.rendezvous import EventWaiter, warn_uncorrelated
+
+from utils.logger import logger_config
+
+log = logger_config(__name__)
+
+PENDING = "pending"
+COMPLETED = "completed"
+TIMED_OUT = "timed_out"
+
+
+class Operation:
+    def __init__(
+        self,
+        operation_id: str,
+        event_type: Optional[str],
+        created_at: float,
+        context: Dict[str, Any],
+    ):
+        self.operation_id = operation_id
+        self.event_type = event_type
+        self.created_at = created_at
+        self.context = context
+        self.status = PENDING
+        self.result: Optional[Any] = None
+        self.finished_at: Optional[float] = None
+        self.done = asyncio.Event()
+
+    def finish(self, status: str, result: Any, now: float) -> None:
+        self.status = status
+        self.result = result
+        self.finished_at = now
+        self.done.set()
+
+    def payload(self) -> Dict[str, Any]:
+        return {
+            "operation_id": self.operation_id,
+            "event_type": self.event_type,
+            "status": self.status,
+            "result": self.result,
+        }
+
+
+class OperationStore:
+    """
+    Writes accepted with 202 whose completion event has not been consumed yet.
+    Operations are keyed by the correlation ID sent with the upstream mutation,
+    time out after `timeout` seconds, and finished ones are kept for `retention`
+    seconds, at most `max_finished` of them. Uncorrelated events complete the
+    oldest pending operation of their type unless `match_uncorrelated` is off.
+
+    Operations live in the worker that accepted them; events for operations
+    accepted elsewhere are ignored, so a poll that lands on another worker or
+    replica gets 404 rather than a result without the accepting request's context.
+    """
+
+    def __init__(
+        self,
+        max_pending: int,
+        max_finished: int,
+        timeout: float,
+        retention: float,
+        match_uncorrelated: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self.match_uncorrelated = match_uncorrelated
+        self._uncorrelated_types: Set[str] = set()
+        self.timeout = timeout
+        self.retention = retention
+        self.clock = clock
+        self.completed = 0
+        self.timed_out = 0
+        self._pending: OrderedDict[str, Operation] = OrderedDict()
+        self._finished: OrderedDict[str, Operation] = OrderedDict()
+        self._reserved = 0
+
+    @contextmanager
+    def reserve(self) -> Iterator[None]:
+        """
+        Hold a pending slot while the upstream mutation is sent, so a full store
+        rejects the write before it commits rather than after.
+        """
+        self.prune()
+        if len(self._pending) + self._reserved >= self.max_pending:
+            raise EventError(f"Too many pending operations ({self.max_pending})")
+        self._reserved += 1
+        try:
+            yield
+        finally:
+            self._reserved -= 1
+
+    def start(self, waiter: EventWaiter, **context: Any) -> Operation:
+        """
+        Take over the event a request was waiting for. An event already
+        delivered to the waiter completes the operation right away.
+        """
+        self.prune()
+        if len(self._pending) >= self.max_pending:
+            raise EventError(f"Too many pending operations ({self.max_pending})")
+        operation = Operation(
+            waiter.correlation_id, waiter.event_type, self.clock(), context
+        )
+        if waiter.future.done() and not waiter.future.cancelled():
+            self.completed += 1
+            self._finish(operation, COMPLETED, waiter.future.result())
+        else:
+            self._pending[operation.operation_id] = operation
+        return operation
+
+    def complete(
+        self, event_type: str, correlation_id: Optional[str], result: Any
+    ) -> bool:
+        """
+        Complete the pending operation for an event. Returns False when none was
+        pending here.
+        """
+        operation: Optional[Operation] = None
+        if correlation_id:
+            operation = self._pending.get(correlation_id)
+        elif self.match_uncorrelated:
+            operation = next(
+                (
+                    pending
+                    for pending in self._pending.values()
+                    if pending.event_type == event_type
+                ),
+                None,
+            )
+            if operation is not None:
+                warn_uncorrelated(self._uncorrelated_types, event_type)
+        if operation is None or operation.event_type != event_type:
+            return False
+        del self._pending[operation.operation_id]
+        self.completed += 1
+        self._finish(operation, COMPLETED, result)
+        return True
+
+    def get(self, operation_id: str) -> Optional[Operation]:
+        self.prune()
+        return self._pending.get(operation_id) or self._finished.get(operation_id)
+
+    async def wait(self, operation: Operation, timeout: float) -> Operation:
+        """
+        Long-poll: wait up to timeout seconds, but never past the operation's own timeout.
+        """
+        remaining = operation.created_at + self.timeout - self.clock()
+        try:
+            await asyncio.wait_for(operation.done.wait(), min(timeout, remaining))
+        except asyncio.TimeoutError:
+            self.prune()
+        return operation
+
+    def prune(self) -> None:
+        now = self.clock()
+        while self._pending:
+            operation = next(iter(self._pending.values()))
+            if now - operation.created_at < self.timeout:
+                break
+            del self._pending[operation.operation_id]
+            self.timed_out += 1
+            log.error(
+                "Timeout waiting for event type %s (%s)",
+                operation.event_type,
+                operation.operation_id,
+            )
+            self._finish(operation, TIMED_OUT, None)
+        while self._finished:
+            operation = next(iter(self._finished.values()))
+            if now - (operation.finished_at or now) < self.retention:
+                break
+            del self._finished[operation.operation_id]
+
+    def _finish(self, operation: Operation, status: str, result: Any) -> None:
+        operation.finish(status, result, self.clock())
+        self._finished[operation.operation_id] = operation
+        while len(self._finished) > self.max_finished:
+            self._finished.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "finished": len(self._finished),
+            "completed": self.completed,
+            "timed_out": self.timed_out,
+        }
@@ -0,0 +1,126 @@
+import asyncio
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from exceptions.gateway_exceptions import EventError
+
+from utils.logger import logger_config
+
+log = logger_config(__name__)
+
+CORRELATION_ID_HEADER = "X-Correlation-ID"
+REPLY_TO_HEADER = "X-Reply-To"
+
+
+def new_correlation_id() -> str:
+    return uuid.uuid4().hex
+
+
+def warn_uncorrelated(seen: Set[str], event_type: str) -> None:
+    """
+    Warn once per event type that events are matched without a correlation ID.
+    """
+    if event_type not in seen:
+        seen.add(event_type)
+        log.warning(
+            "Event type %s has no correlation ID, matching the oldest waiter",
+            event_type,
+        )
+
+
+class EventWaiter:
+    def __init__(
+        self, rendezvous: "EventRendezvous", event_type: str, correlation_id: str
+    ):
+        self.rendezvous = rendezvous
+        self.event_type = event_type
+        self.correlation_id = correlation_id
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return (self.event_type, self.correlation_id)
+
+    def __enter__(self) -> "EventWaiter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.rendezvous.discard(self)
+
+
+class EventRendezvous:
+    """
+    Matches consumed events to the request waiting for them by (event type, correlation ID).
+    Events published without a correlation ID resolve the oldest waiter for their
+    type, which may belong to another request; upstreams don't echo the ID yet.
+    Once they do, `match_uncorrelated=False` drops such events instead.
+    """
+
+    def __init__(self, max_waiters: int, match_uncorrelated: bool = True):
+        self.max_waiters = max_waiters
+        self.match_uncorrelated = match_uncorrelated
+        self._uncorrelated_types: Set[str] = set()
+        self._waiters: Dict[Tuple[str, str], EventWaiter] = {}
+        self._by_event_type: Dict[str, OrderedDict[str, EventWaiter]] = {}
+
+    def __len__(self) -> int:
+        return len(self._waiters)
+
+    def register(
+        self, event_type: str, correlation_id: Optional[str] = None
+    ) -> EventWaiter:
+        if len(self._waiters) >= self.max_waiters:
+            raise EventError(
+                f"Too many requests waiting for events ({self.max_waiters})"
+            )
+        waiter = EventWaiter(self, event_type, correlation_id or new_correlation_id())
+        if waiter.key in self._waiters:
+            raise EventError(
+                f"Already waiting for {event_type} with correlation ID {waiter.correlation_id}"
+            )
+        self._waiters[waiter.key] = waiter
+        self._by_event_type.setdefault(event_type, OrderedDict())[
+            waiter.correlation_id
+        ] = waiter
+        return waiter
+
+    def discard(self, waiter: EventWaiter) -> None:
+        if self._waiters.get(waiter.key) is waiter:
+            del self._waiters[waiter.key]
+        pending = self._by_event_type.get(waiter.event_type)
+        if pending is not None:
+            pending.pop(waiter.correlation_id, None)
+            if not pending:
+                del self._by_event_type[waiter.event_type]
+
+    def resolve(
+        self, event_type: str, correlation_id: Optional[str], payload: Any
+    ) -> bool:
+        waiter: Optional[EventWaiter] = None
+        if correlation_id:
+            waiter = self._waiters.get((event_type, correlation_id))
+        elif self.match_uncorrelated:
+            pending = self._by_event_type.get(event_type)
+            if pending:
+                waiter = next(iter(pending.values()))
+                warn_uncorrelated(self._uncorrelated_types, event_type)
+        if waiter is None:
+            return False
+        if not waiter.future.done():
+            waiter.future.set_result(payload)
+        self.discard(waiter)
+        return True
+
+    async def wait(self, waiter: EventWaiter, timeout: float) -> Optional[Any]:
+        try:
+            return await asyncio.wait_for(waiter.future, timeout)
+        except asyncio.TimeoutError:
+            log.error(
+                "Timeout waiting for event type %s (%s)",
+                waiter.event_type,
+                waiter.correlation_id,
+            )
+            return None
+        finally:
+            self.discard(waiter)
@@ -0,0 +1,221 @@
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict
+
+from exceptions.gateway_exceptions import UpstreamUnavailableError
+
+from utils.config import Settings
+from utils.logger import logger_config
+
+log = logger_config(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Opens when the share of failed or slow calls over the last `window` calls
+    reaches `failure_rate`, rejects calls for `open_duration`, then lets a few
+    trial calls through: they close the circuit if all succeed, or reopen it.
+    """
+
+    def __init__(
+        self,
+        failure_rate: float,
+        window: int,
+        min_calls: int,
+        slow_call_duration: float,
+        open_duration: float,
+        half_open_calls: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.slow_call_duration = slow_call_duration
+        self.open_duration = open_duration
+        self.half_open_calls = half_open_calls
+        self.clock = clock
+        self.state = CLOSED
+        self.opened = 0
+        self.rejected = 0
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._trials = 0
+        self._trial_successes = 0
+
+    def allow(self) -> bool:
+        if self.state == OPEN:
+            if self.clock() - self._opened_at < self.open_duration:
+                self.rejected += 1
+                return False
+            self.state = HALF_OPEN
+            self._trials = 0
+            self._trial_successes = 0
+        if self.state == HALF_OPEN:
+            if self._trials >= self.half_open_calls:
+                self.rejected += 1
+                return False
+            self._trials += 1
+        return True
+
+    def record(self, success: bool, duration: float) -> None:
+        failed = not success or duration >= self.slow_call_duration
+        if self.state == HALF_OPEN:
+            if failed:
+                self._open()
+            else:
+                self._trial_successes += 1
+                if self._trial_successes >= self.half_open_calls:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+            return
+        self._outcomes.append(failed)
+        if (
+            len(self._outcomes) >= self.min_calls
+            and sum(self._outcomes) / len(self._outcomes) >= self.failure_rate
+        ):
+            self._open()
+
+    def abandon(self) -> None:
+        """
+        Forget an admitted call that was cancelled before it had an outcome.
+        """
+        if self.state == HALF_OPEN and self._trials > 0:
+            self._trials -= 1
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened += 1
+        self._opened_at = self.clock()
+        self._outcomes.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failure_rate": (
+                sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
+            ),
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit: grows by one call per limit's worth of successful
+    calls and shrinks by `backoff` on a failure or a call slower than
+    `latency_threshold`, so the allowed concurrency tracks what the upstream sustains.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        backoff: float,
+        latency_threshold: float,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_threshold = latency_threshold
+        self.in_flight = 0
+        self.rejected = 0
+
+    def acquire(self) -> bool:
+        if self.in_flight >= int(self.limit):
+            self.rejected += 1
+            return False
+        self.in_flight += 1
+        return True
+
+    def abandon(self) -> None:
+        self.in_flight -= 1
+
+    def release(self, success: bool, duration: float) -> None:
+        self.in_flight -= 1
+        if not success or duration >= self.latency_threshold:
+            self.limit = max(float(self.min_limit), self.limit * self.backoff)
+        elif self.in_flight * 2 >= int(self.limit):
+            # Only grow while the current limit is actually being used
+            self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+        }
+
+
+class UpstreamGuard:
+    """
+    Circuit breaker and adaptive concurrency limit in front of one upstream.
+    Calls that are not admitted fail fast with UpstreamUnavailableError.
+    """
+
+    def __init__(self, name: str, breaker: CircuitBreaker, limiter: AdaptiveLimiter):
+        self.name = name
+        self.breaker = breaker
+        self.limiter = limiter
+
+    @classmethod
+    def from_settings(
+        cls, name: str, settings: Settings, max_concurrency: int
+    ) -> "UpstreamGuard":
+        return cls(
+            name,
+            CircuitBreaker(
+                failure_rate=settings.CIRCUIT_BREAKER_FAILURE_RATE,
+                window=settings.CIRCUIT_BREAKER_WINDOW,
+                min_calls=settings.CIRCUIT_BREAKER_MIN_CALLS,
+                slow_call_duration=settings.CIRCUIT_BREAKER_SLOW_CALL_SECONDS,
+                open_duration=settings.CIRCUIT_BREAKER_OPEN_SECONDS,
+                half_open_calls=settings.CIRCUIT_BREAKER_HALF_OPEN_CALLS,
+            ),
+            AdaptiveLimiter(
+                initial_limit=min(settings.CONCURRENCY_LIMIT_INITIAL, max_concurrency),
+                min_limit=settings.CONCURRENCY_LIMIT_MIN,
+                max_limit=max_concurrency,
+                backoff=settings.CONCURRENCY_LIMIT_BACKOFF,
+                latency_threshold=settings.CONCURRENCY_LIMIT_LATENCY_SECONDS,
+            ),
+        )
+
+    def acquire(self) -> float:
+        if not self.limiter.acquire():
+            raise UpstreamUnavailableError(
+                f"Concurrency limit reached for the {self.name} service"
+            )
+        if not self.breaker.allow():
+            self.limiter.abandon()
+            raise UpstreamUnavailableError(f"Circuit open for the {self.name} service")
+        return time.perf_counter()
+
+    def release(self, started: float, success: bool) -> None:
+        duration = time.perf_counter() - started
+        self.limiter.release(success, duration)
+        previous = self.breaker.state
+        self.breaker.record(success, duration)
+        if self.breaker.state != previous:
+            log.warning(
+                "Circuit for %s moved from %s to %s",
+                self.name,
+                previous,
+                self.breaker.state,
+            )
+
+    def abandon(self) -> None:
+        """
+        Release a call that says nothing about the upstream's health (a losing hedge,
+        a timeout cut short by the caller's deadline) without recording it as a
+        success or a failure.
+        """
+        self.limiter.abandon()
+        self.breaker.abandon()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"circuit": self.breaker.stats(), "concurrency": self.limiter.stats()}
@@ -0,0 +1,176 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from exceptions.gateway_exceptions import EventError
+from models.payloads import TeamDetailsPayload
+
+from utils.logger import logger_config
+
+log = logger_config(__name__)
+
+
+def team_delta(
+    previous: Optional[TeamDetailsPayload], current: TeamDetailsPayload
+) -> Optional[Dict[str, Any]]:
+    """
+    Players added or whose rating changed, and players removed, since `previous`.
+    Changed players carry their full current record, so deltas can be reapplied.
+    """
+    before = {
+        player["player_name"]: player
+        for player in (previous["players_data"] if previous else [])
+    }
+    after = {player["player_name"]: player for player in current["players_data"]}
+    changed = [player for name, player in after.items() if before.get(name) != player]
+    removed = [name for name in before if name not in after]
+    if previous is not None and not changed and not removed:
+        return None
+    return {
+        "team_id": current["team_id"],
+        "team_name": current["team_name"],
+        "players_data": changed,
+        "removed_players": removed,
+    }
+
+
+class TeamSubscription:
+    def __init__(self, hub: "TeamUpdateHub", team_name: str, queue_size: int):
+        self.hub = hub
+        self.team_name = team_name
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+
+    def offer(self, update: Dict[str, Any]) -> bool:
+        try:
+            self.queue.put_nowait(update)
+            return True
+        except asyncio.QueueFull:
+            self.dropped = True
+            return False
+
+    async def next(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Next update, or None when nothing arrived within timeout.
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def __enter__(self) -> "TeamSubscription":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.hub.unsubscribe(self)
+
+
+class TeamUpdateHub:
+    """
+    Fans team detail deltas out to the clients subscribed to each team.
+    Every client has a bounded buffer; a client that lets it fill up is
+    dropped so it cannot hold back the others, and resyncs on reconnect.
+    Refreshes triggered while one is running for the same team are merged
+    into a single follow-up refresh.
+    """
+
+    def __init__(self, queue_size: int, max_subscribers: int):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self._subscribers: Dict[str, Set[TeamSubscription]] = {}
+        self._snapshots: Dict[str, TeamDetailsPayload] = {}
+        self._names_by_id: Dict[int, str] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._pending: Set[str] = set()
+
+    @property
+    def subscribers(self) -> int:
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def has_subscribers(self, team_name: str) -> bool:
+        return team_name in self._subscribers
+
+    def team_name(self, team_id: Optional[int]) -> Optional[str]:
+        return self._names_by_id.get(team_id) if team_id is not None else None
+
+    def subscribe(self, team_name: str) -> TeamSubscription:
+        if self.subscribers >= self.max_subscribers:
+            raise EventError(f"Too many update subscribers ({self.max_subscribers})")
+        subscription = TeamSubscription(self, team_name, self.queue_size)
+        self._subscribers.setdefault(team_name, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: TeamSubscription) -> None:
+        subscribers = self._subscribers.get(subscription.team_name)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.team_name]
+            snapshot = self._snapshots.pop(subscription.team_name, None)
+            if snapshot is not None:
+                self._names_by_id.pop(snapshot["team_id"], None)
+
+    def remember(self, view: TeamDetailsPayload) -> None:
+        """
+        Record the view a new subscriber starts from, unless a newer one is known.
+        """
+        if view["team_name"] in self._subscribers:
+            self._snapshots.setdefault(view["team_name"], view)
+            self._names_by_id[view["team_id"]] = view["team_name"]
+
+    def publish(self, view: TeamDetailsPayload) -> None:
+        team_name = view["team_name"]
+        subscribers = self._subscribers.get(team_name)
+        if not subscribers:
+            return
+        delta = team_delta(self._snapshots.get(team_name), view)
+        self._snapshots[team_name] = view
+        self._names_by_id[view["team_id"]] = team_name
+        if delta is None:
+            return
+        self.published += 1
+        for subscription in list(subscribers):
+            if subscription.offer(delta):
+                self.delivered += 1
+            else:
+                self.dropped += 1
+                log.warning("Dropping slow subscriber to %s updates", team_name)
+                self.unsubscribe(subscription)
+
+    def schedule_refresh(
+        self, team_name: str, refresh: Callable[[], Awaitable[None]]
+    ) -> None:
+        if team_name in self._refreshing:
+            self._pending.add(team_name)
+            return
+        self._refreshing[team_name] = asyncio.create_task(
+            self._refresh(team_name, refresh)
+        )
+
+    async def _refresh(
+        self, team_name: str, refresh: Callable[[], Awaitable[None]]
+    ) -> None:
+        try:
+            while True:
+                try:
+                    await refresh()
+                except Exception as e:
+                    log.error("Failed to refresh %s for subscribers: %s", team_name, e)
+                if team_name not in self._pending:
+                    break
+                self._pending.discard(team_name)
+        finally:
+            del self._refreshing[team_name]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "teams": len(self._subscribers),
+            "subscribers": self.subscribers,
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "refreshing": len(self._refreshing),
+        }
@@ -0,0 +1,149 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from models.payloads import TeamDetailsPayload
+
+from utils import json_codec
+
+from utils.logger import logger_config
+
+log = logger_config(__name__)
+
+
+@dataclass
+class TeamView:
+    value: TeamDetailsPayload
+    size: int
+    fresh_until: float
+    stale_until: float
+
+
+class TeamViewCache:
+    """
+    Read-through cache of composed team details keyed by team name.
+    Fresh entries are served directly, stale ones are served while a background
+    refresh runs, and concurrent misses for the same team share one load.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        ttl: float,
+        stale_ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.clock = clock
+        self.size = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.load_errors = 0
+        self._views: OrderedDict[str, TeamView] = OrderedDict()
+        self._names_by_id: Dict[int, str] = {}
+        self._loads: Dict[str, asyncio.Task] = {}
+
+    async def get(
+        self, team_name: str, loader: Callable[[], Awaitable[TeamDetailsPayload]]
+    ) -> TeamDetailsPayload:
+        view = self._views.get(team_name)
+        now = self.clock()
+        if view is not None and now < view.fresh_until:
+            self._views.move_to_end(team_name)
+            self.hits += 1
+            return view.value
+        if view is not None and now < view.stale_until:
+            self._views.move_to_end(team_name)
+            self.stale_hits += 1
+            self._load(team_name, loader)
+            return view.value
+        self.misses += 1
+        return await asyncio.shield(self._load(team_name, loader))
+
+    def invalidate(
+        self, team_name: Optional[str] = None, team_id: Optional[int] = None
+    ) -> None:
+        if team_name is None and team_id is not None:
+            team_name = self._names_by_id.get(team_id)
+        if team_name is None:
+            return
+        self._loads.pop(team_name, None)
+        if team_name in self._views:
+            self._remove(team_name)
+
+    def clear(self) -> None:
+        self._loads.clear()
+        for team_name in list(self._views):
+            self._remove(team_name)
+
+    def _load(
+        self, team_name: str, loader: Callable[[], Awaitable[TeamDetailsPayload]]
+    ) -> asyncio.Task:
+        task = self._loads.get(team_name)
+        if task is not None:
+            self.coalesced += 1
+            return task
+
+        async def load() -> TeamDetailsPayload:
+            try:
+                value = await loader()
+            finally:
+                current = self._loads.get(team_name) is task
+                if current:
+                    del self._loads[team_name]
+            if current:
+                self._store(team_name, value)
+            return value
+
+        task = asyncio.create_task(load())
+        task.add_done_callback(self._log_load_error)
+        self._loads[team_name] = task
+        return task
+
+    def _store(self, team_name: str, value: TeamDetailsPayload) -> None:
+        size = len(json_codec.dumps(value))
+        if size > self.max_bytes:
+            return
+        if team_name in self._views:
+            self._remove(team_name)
+        now = self.clock()
+        self._views[team_name] = TeamView(
+            value=value,
+            size=size,
+            fresh_until=now + self.ttl,
+            stale_until=now + self.ttl + self.stale_ttl,
+        )
+        self._names_by_id[value["team_id"]] = team_name
+        self.size += size
+        while len(self._views) > self.max_entries or self.size > self.max_bytes:
+            self._remove(next(iter(self._views)))
+
+    def _remove(self, team_name: str) -> None:
+        view = self._views.pop(team_name)
+        self.size -= view.size
+        if self._names_by_id.get(view.value["team_id"]) == team_name:
+            del self._names_by_id[view.value["team_id"]]
+
+    def _log_load_error(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            self.load_errors += 1
+            log.error("Failed to load team view: %s", task.exception())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._views),
+            "bytes": self.size,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "load_errors": self.load_errors,
+        }
@@ -11,13 +11,21 @@ class Settings(BaseSettings):
     DEBUG: bool
     DEBUG_PORT: str
     LOG_LEVEL: str
+    LOG_FORMAT: str
+    LOG_PAYLOAD_MAX_CHARS: int
+    LOG_PAYLOAD_SAMPLE_RATE: float
     DOCKERHUB_USERNAME: str
     IMAGE_NAME: str
     IMAGE_VERSION: str
     APP_MODULE: str
-    APP_PORT: str
+    APP_PORT: int
     APP_HOST: str
     APP_DESCRIPTION: str
+    APP_WORKERS: int
+    APP_LOOP: str
+    APP_HTTP: str
+    APP_BACKLOG: int
+    APP_KEEP_ALIVE: int
     API_PREFIX: str
     DOC_URL: str
     DEPENDENCIES: str
@@ -35,6 +43,94 @@ class Settings(BaseSettings):
     BROKER_ATTEMPT_DELAY: int
     QUEUE_NAME: str
     EXCHANGE_NAME: str
+    TEAM_SERVICE_MAX_CONNECTIONS: int
+    TEAM_SERVICE_MAX_KEEPALIVE_CONNECTIONS: int
+    TEAM_SERVICE_KEEPALIVE_EXPIRY: float
+    TEAM_SERVICE_HTTP2: bool
+    TEAM_SERVICE_TIMEOUT: float
+    RATING_SERVICE_MAX_CONNECTIONS: int
+    RATING_SERVICE_MAX_KEEPALIVE_CONNECTIONS: int
+    RATING_SERVICE_KEEPALIVE_EXPIRY: float
+    RATING_SERVICE_HTTP2: bool
+    RATING_SERVICE_TIMEOUT: float
+    TEAM_SERVICE_PERSISTED_QUERIES: bool
+    RATING_SERVICE_PERSISTED_QUERIES: bool
+    TEAM_SERVICE_BATCHING: bool
+    RATING_SERVICE_BATCHING: bool
+    UPSTREAM_BATCH_WINDOW_MS: float
+    UPSTREAM_BATCH_MAX_SIZE: int
+    EVENT_WAIT_TIMEOUT: float
+    EVENT_MAX_WAITERS: int
+    EVENT_ROUTING_MODE: str
+    EVENT_MATCH_UNCORRELATED: bool
+    REPLY_EXCHANGE_NAME: str
+    EVENT_BROADCAST_SUBSCRIPTION: bool
+    REPLICA_ID: str
+    CONSUMER_PREFETCH_COUNT: int
+    CONSUMER_WORKERS: int
+    CONSUMER_ACK_BATCH_SIZE: int
+    CONSUMER_ACK_INTERVAL_MS: int
+    FAN_OUT_DEADLINE: float
+    DIRECTORY_CACHE_MAX_ENTRIES: int
+    DIRECTORY_CACHE_TTL: float
+    TEAM_VIEW_CACHE_TTL: float
+    TEAM_VIEW_CACHE_STALE_TTL: float
+    TEAM_VIEW_CACHE_MAX_ENTRIES: int
+    TEAM_VIEW_CACHE_MAX_BYTES: int
+    SINGLE_FLIGHT_ENABLED: bool
+    SINGLE_FLIGHT_MAX_TRACKED_KEYS: int
+    SINGLE_FLIGHT_DEADLINE_SLACK: float
+    GRAPHQL_MAX_BATCH_SIZE: int
+    GRAPHQL_MAX_DEPTH: int
+    GRAPHQL_MAX_COST: int
+    GRAPHQL_FIELD_CACHE_MAX_ENTRIES: int
+    GRAPHQL_TEAM_DETAILS_MAX_AGE: float
+    CIRCUIT_BREAKER_FAILURE_RATE: float
+    CIRCUIT_BREAKER_WINDOW: int
+    CIRCUIT_BREAKER_MIN_CALLS: int
+    CIRCUIT_BREAKER_SLOW_CALL_SECONDS: float
+    CIRCUIT_BREAKER_OPEN_SECONDS: float
+    CIRCUIT_BREAKER_HALF_OPEN_CALLS: int
+    CONCURRENCY_LIMIT_INITIAL: int
+    CONCURRENCY_LIMIT_MIN: int
+    CONCURRENCY_LIMIT_BACKOFF: float
+    CONCURRENCY_LIMIT_LATENCY_SECONDS: float
+    TEAM_CREATE_DEADLINE: float
+    PLAYER_CREATE_DEADLINE: float
+    TEAM_JOIN_DEADLINE: float
+    PLAYER_JOIN_DEADLINE: float
+    TEAM_RATE_DEADLINE: float
+    HEDGED_READS: bool
+    HEDGE_PERCENTILE: float
+    HEDGE_MIN_SAMPLES: int
+    HEDGE_WINDOW: int
+    HEDGE_BUDGET: float
+    HEDGE_BUDGET_BURST: float
+    TEAM_UPDATES_QUEUE_SIZE: int
+    TEAM_UPDATES_MAX_SUBSCRIBERS: int
+    TEAM_UPDATES_KEEPALIVE: float
+    ASYNC_OPERATION_TIMEOUT: float
+    ASYNC_OPERATION_RETENTION: float
+    ASYNC_OPERATION_MAX_PENDING: int
+    ASYNC_OPERATION_MAX_FINISHED: int
+    ASYNC_OPERATION_MAX_WAIT: float
+    LOOP_LAG_INTERVAL_MS: float
+    LOAD_SHED_ENABLED: bool
+    LOAD_SHED_WRITE_LAG_MS: float
+    LOAD_SHED_READ_LAG_MS: float
+    LOAD_SHED_WRITE_MAX_IN_FLIGHT: int
+    LOAD_SHED_READ_MAX_IN_FLIGHT: int
+    LOAD_SHED_MAX_EVENT_WAITERS: int
+    LOAD_SHED_RETRY_AFTER: int
+    PROFILING_ENABLED: bool
+    PROFILING_INTERVAL_MS: float
+    PROFILING_MAX_SECONDS: float
+    ADMIN_TOKEN: str
+    TRACING_ENABLED: bool
+    TRACING_SAMPLE_RATIO: float
+    TRACING_EXPORTER: str
+    TRACING_EXPORT_FILE: str
+    TRACING_MEMORY_MAX_SPANS: int
 
     @property
     def RATING_SERVICE_URL(self):
@@ -0,0 +1,53 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+
+class Deadline:
+    """
+    Time budget shared by every upstream call made on behalf of one request.
+    """
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+current_deadline: ContextVar[Optional[Deadline]] = ContextVar(
+    "current_deadline", default=None
+)
+
+
+@contextmanager
+def deadline_scope(timeout: float) -> Iterator[Deadline]:
+    """
+    Set the deadline of the current request. A nested scope can only shorten
+    the budget of the one it runs in.
+    """
+    deadline = Deadline(timeout)
+    outer = current_deadline.get()
+    if outer is not None and outer.expires_at < deadline.expires_at:
+        deadline = outer
+    token = current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        current_deadline.reset(token)
+
+
+def remaining_budget(default: float) -> float:
+    """
+    Time left for one call: its own default timeout capped by the request deadline.
+    """
+    deadline = current_deadline.get()
+    if deadline is None:
+        return default
+    return min(default, deadline.remaining())
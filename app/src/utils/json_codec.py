@@ -0,0 +1,42 @@
+import json
+from typing import Any, Union
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+
+    JSON_BACKEND = "orjson"
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+    JSON_BACKEND = "json"
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Serialize to compact UTF-8 JSON bytes, ready to be sent on the wire.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=str)
+    return json.dumps(
+        obj, separators=(",", ":"), ensure_ascii=False, default=str
+    ).encode("utf-8")
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """
+    Parse JSON straight from the received bytes, without decoding to str first.
+    Invalid input raises json.JSONDecodeError with either backend.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with the fast codec.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,221 @@
+import asyncio
+from typing import Any, Callable, Dict, MutableMapping, Optional, Tuple
+
+from utils.config import Settings
+from utils.json_codec import dumps
+from utils.metrics import EVENT_LOOP_LAG, REQUESTS_SHED
+
+Scope = MutableMapping[str, Any]
+
+READ = "read"
+WRITE = "write"
+
+# Probes, scrapes and profiling must keep working on a hot pod
+EXEMPT_PREFIXES = ("/health", "/metrics", "/admin")
+
+
+class LoopLagMonitor:
+    """
+    Samples event loop lag: how late a sleep of `interval` seconds wakes up.
+    `lag` is an exponentially weighted average, so one slow callback does not flip
+    the shedding state on its own.
+    """
+
+    def __init__(self, interval: float, smoothing: float = 0.3):
+        self.interval = interval
+        self.smoothing = smoothing
+        self.lag = 0.0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, lag: float) -> None:
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self.lag += self.smoothing * (lag - self.lag)
+        EVENT_LOOP_LAG.set(self.lag)
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, loop.time() - expected))
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "lag_ms": round(self.lag * 1000, 2),
+            "last_lag_ms": round(self.last_lag * 1000, 2),
+            "max_lag_ms": round(self.max_lag * 1000, 2),
+        }
+
+
+class LoadShedder:
+    """
+    Decides whether a new request may start. Writes are shed first: each one pins
+    an event waiter and makes several upstream calls, while reads are mostly served
+    from cache. Reads are only shed at the higher thresholds, which is also when
+    the pod reports itself not ready.
+    """
+
+    def __init__(
+        self,
+        monitor: LoopLagMonitor,
+        lag_thresholds: Dict[str, float],
+        in_flight_limits: Dict[str, int],
+        max_event_waiters: int,
+        retry_after: int,
+        event_waiters: Callable[[], int] = lambda: 0,
+        enabled: bool = True,
+    ):
+        self.monitor = monitor
+        self.lag_thresholds = lag_thresholds
+        self.in_flight_limits = in_flight_limits
+        self.max_event_waiters = max_event_waiters
+        self.retry_after = retry_after
+        self.event_waiters = event_waiters
+        self.enabled = enabled
+        self.in_flight = 0
+        self.shed: Dict[str, int] = {READ: 0, WRITE: 0}
+
+    @classmethod
+    def from_settings(
+        cls, settings: Settings, event_waiters: Callable[[], int]
+    ) -> "LoadShedder":
+        return cls(
+            LoopLagMonitor(settings.LOOP_LAG_INTERVAL_MS / 1000),
+            lag_thresholds={
+                READ: settings.LOAD_SHED_READ_LAG_MS / 1000,
+                WRITE: settings.LOAD_SHED_WRITE_LAG_MS / 1000,
+            },
+            in_flight_limits={
+                READ: settings.LOAD_SHED_READ_MAX_IN_FLIGHT,
+                WRITE: settings.LOAD_SHED_WRITE_MAX_IN_FLIGHT,
+            },
+            max_event_waiters=settings.LOAD_SHED_MAX_EVENT_WAITERS,
+            retry_after=settings.LOAD_SHED_RETRY_AFTER,
+            event_waiters=event_waiters,
+            enabled=settings.LOAD_SHED_ENABLED,
+        )
+
+    def overload(self, priority: str) -> Optional[str]:
+        """
+        Reason a request of this priority would be shed now, None when admitted.
+        """
+        if not self.enabled:
+            return None
+        if self.monitor.lag >= self.lag_thresholds[priority]:
+            return "loop_lag"
+        if self.in_flight >= self.in_flight_limits[priority]:
+            return "in_flight"
+        if priority == WRITE and self.event_waiters() >= self.max_event_waiters:
+            return "event_waiters"
+        return None
+
+    @property
+    def ready(self) -> bool:
+        return self.overload(READ) is None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": (
+                "ok"
+                if self.overload(WRITE) is None
+                else "shedding_writes"
+                if self.ready
+                else "shedding_all"
+            ),
+            "loop": self.monitor.stats(),
+            "in_flight": self.in_flight,
+            "event_waiters": self.event_waiters(),
+            "shed": dict(self.shed),
+        }
+
+
+def request_priority(scope: Scope) -> Optional[str]:
+    """
+    Priority class of a request, None for routes that are never shed.
+    A GraphQL POST may carry a mutation and the body is not read here, so it is
+    classed as a write; GraphQL queries sent with GET stay reads.
+    """
+    if scope.get("path", "").startswith(EXEMPT_PREFIXES):
+        return None
+    if scope["method"] in ("GET", "HEAD", "OPTIONS"):
+        return READ
+    return WRITE
+
+
+class LoadSheddingMiddleware:
+    """
+    ASGI middleware answering 503 with Retry-After when the shedder is overloaded.
+    A request counts as in flight until its response starts, so open event
+    streams do not hold a slot.
+    """
+
+    def __init__(self, app: Callable, shedder: LoadShedder):
+        self.app = app
+        self.shedder = shedder
+        self._series: Dict[Tuple[str, str], Any] = {}
+
+    async def __call__(self, scope: Scope, receive: Callable, send: Callable) -> None:
+        priority = request_priority(scope) if scope["type"] == "http" else None
+        if priority is None:
+            await self.app(scope, receive, send)
+            return
+
+        reason = self.shedder.overload(priority)
+        if reason is not None:
+            await self.reject(send, priority, reason)
+            return
+
+        shedder = self.shedder
+        shedder.in_flight += 1
+        counted = True
+
+        async def send_and_release(message: Dict[str, Any]) -> None:
+            nonlocal counted
+            if counted and message["type"] == "http.response.start":
+                counted = False
+                shedder.in_flight -= 1
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_release)
+        finally:
+            if counted:
+                shedder.in_flight -= 1
+
+    async def reject(self, send: Callable, priority: str, reason: str) -> None:
+        self.shedder.shed[priority] += 1
+        series = self._series.get((priority, reason))
+        if series is None:
+            series = self._series[(priority, reason)] = REQUESTS_SHED.labels(
+                priority, reason
+            )
+        series.inc()
+        body = dumps({"message": f"Service overloaded ({reason}), retry later"})
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(self.shedder.retry_after).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
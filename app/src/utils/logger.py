@@ -1,72 +1,178 @@
-import logging
-import os
-
-
-class CustomFormatter(logging.Formatter):
-    def format(self, record):
-        # Add the function name and class name to the log record
-        if record.funcName:
-            record.funcName = f"{record.funcName}()"
-        else:
-            record.funcName = ""
-
-        if "self" in record.__dict__:
-            record.className = record.__dict__["self"].__class__.__name__
-        else:
-            record.className = ""
-
-        return super().format(record)
-
-
-def logger_config(module: str) -> logging.Logger:
-    """
-    LOGGER function. Extends Python logging module and sets a custom config.
-    params: Module name to __name__ magic method.
-    return: Logger object
-    usage: logger_config(__name__)
-    """
-    formatter = CustomFormatter(
-        "%(asctime)s[%(levelname)s][%(module)s.%(funcName)s][%(message)s]"
-    )
-
-    handler = logging.StreamHandler()
-    handler.setFormatter(formatter)
-
-    logger = logging.getLogger(module)
-    logger.setLevel(os.getenv("LOG_LEVEL", "DEBUG"))
-
-    # Avoid adding multiple handlers
-    if not logger.hasHandlers():
-        logger.addHandler(handler)
-
-    # Suppress logging from other libraries
-    logging.getLogger("sqlalchemy").setLevel(logging.WARNING)
-    logging.getLogger("httpx").setLevel(logging.WARNING)
-    logging.getLogger("uvicorn").setLevel(logging.WARNING)
-    logging.getLogger("fastapi").setLevel(logging.WARNING)
-
-    # Optional: Adjust specific SQLAlchemy logger if needed
-    logging.getLogger("sqlalchemy.engine").setLevel(logging.ERROR)
-
-    return logger
-
-
-# Set up the root logger
-root_logger = logging.getLogger()
-root_logger.setLevel(
-    logging.WARNING
-)  # Set higher level to ignore other libraries' logs
-
-# Avoid adding multiple handlers to the root logger
-if not root_logger.hasHandlers():
-    root_logger.addHandler(
-        logging.StreamHandler()
-    )  # Add a handler if not already added
-
-# Apply custom formatting to root logger handlers
-for handler in root_logger.handlers:
-    handler.setFormatter(
-        CustomFormatter(
-            "%(asctime)s[%(levelname)s][%(module)s.%(funcName)s][%(message)s]"
-        )
-    )
+import atexit
+import json
+import logging
+import queue
+import random
+from collections.abc import Mapping
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, List, Optional
+
+from utils.config import Settings
+
+TEXT_FORMAT = "%(asctime)s[%(levelname)s][%(module)s.%(funcName)s][%(message)s]"
+
+# Defaults until configure_logging() applies the settings at startup
+LOG_LEVEL = "DEBUG"
+LOG_FORMAT = "text"
+LOG_PAYLOAD_MAX_CHARS = 512
+LOG_PAYLOAD_SAMPLE_RATE = 1.0
+
+# Arguments the listener thread can safely merge into the message later
+IMMUTABLE_ARGS = (str, bytes, int, float, complex, type(None))
+
+
+class CustomFormatter(logging.Formatter):
+    def format(self, record):
+        # Add the function name and class name to the log record
+        if record.funcName:
+            record.funcName = f"{record.funcName}()"
+        else:
+            record.funcName = ""
+
+        if "self" in record.__dict__:
+            record.className = record.__dict__["self"].__class__.__name__
+        else:
+            record.className = ""
+
+        return super().format(record)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "function": record.funcName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def build_formatter() -> logging.Formatter:
+    if LOG_FORMAT == "json":
+        return JsonFormatter()
+    return CustomFormatter(TEXT_FORMAT)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Enqueues the record as is. The stock QueueHandler formats it on the calling
+    thread; here the message is merged with its %-style args by the listener,
+    unless an argument is mutable and could change before then.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        # A lone dict argument is unwrapped into a mapping, itself mutable
+        if args and (
+            isinstance(args, Mapping)
+            or not all(isinstance(value, IMMUTABLE_ARGS) for value in args)
+        ):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+log_queue: queue.SimpleQueue = queue.SimpleQueue()
+log_listener: Optional[QueueListener] = None
+log_output: Optional[logging.Handler] = None
+gateway_loggers: List[logging.Logger] = []
+
+
+def queue_handler() -> QueueHandler:
+    """
+    Handler that only enqueues records on the calling thread (the event loop);
+    a listener thread formats them and does the blocking write to stderr.
+    """
+    global log_listener, log_output
+    if log_listener is None:
+        log_output = logging.StreamHandler()
+        log_output.setFormatter(build_formatter())
+        log_listener = QueueListener(log_queue, log_output)
+        log_listener.start()
+        atexit.register(log_listener.stop)
+    return DeferredQueueHandler(log_queue)
+
+
+def configure_logging(settings: Settings) -> None:
+    """
+    Apply the LOG_* settings once they are loaded, to the loggers already
+    created at import time and to those created later.
+    """
+    global LOG_LEVEL, LOG_FORMAT, LOG_PAYLOAD_MAX_CHARS, LOG_PAYLOAD_SAMPLE_RATE
+    LOG_LEVEL = settings.LOG_LEVEL
+    LOG_FORMAT = settings.LOG_FORMAT
+    LOG_PAYLOAD_MAX_CHARS = settings.LOG_PAYLOAD_MAX_CHARS
+    LOG_PAYLOAD_SAMPLE_RATE = settings.LOG_PAYLOAD_SAMPLE_RATE
+    for logger in gateway_loggers:
+        logger.setLevel(LOG_LEVEL)
+    if log_output is not None:
+        log_output.setFormatter(build_formatter())
+
+
+def should_log_payload(logger: logging.Logger, level: int = logging.DEBUG) -> bool:
+    """
+    Guard for logging request/response/message bodies: checks the level before
+    anything is serialized and keeps only a LOG_PAYLOAD_SAMPLE_RATE share.
+    """
+    if not logger.isEnabledFor(level):
+        return False
+    return LOG_PAYLOAD_SAMPLE_RATE >= 1 or random.random() < LOG_PAYLOAD_SAMPLE_RATE
+
+
+def payload_preview(payload: Any) -> str:
+    """
+    Serialize a body for logging, truncated to LOG_PAYLOAD_MAX_CHARS.
+    """
+    text = payload if isinstance(payload, str) else json.dumps(payload, default=str)
+    if len(text) > LOG_PAYLOAD_MAX_CHARS:
+        return f"{text[:LOG_PAYLOAD_MAX_CHARS]}... ({len(text)} chars)"
+    return text
+
+
+def logger_config(module: str) -> logging.Logger:
+    """
+    LOGGER function. Extends Python logging module and sets a custom config.
+    params: Module name to __name__ magic method.
+    return: Logger object
+    usage: logger_config(__name__)
+    """
+    logger = logging.getLogger(module)
+    logger.setLevel(LOG_LEVEL)
+    if logger not in gateway_loggers:
+        gateway_loggers.append(logger)
+
+    # Avoid adding multiple handlers
+    if not logger.hasHandlers():
+        logger.addHandler(queue_handler())
+
+    # Suppress logging from other libraries
+    logging.getLogger("sqlalchemy").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("uvicorn").setLevel(logging.WARNING)
+    logging.getLogger("fastapi").setLevel(logging.WARNING)
+
+    # Optional: Adjust specific SQLAlchemy logger if needed
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.ERROR)
+
+    return logger
+
+
+# Set up the root logger
+root_logger = logging.getLogger()
+root_logger.setLevel(
+    logging.WARNING
+)  # Set higher level to ignore other libraries' logs
+
+# Avoid adding multiple handlers to the root logger
+if not root_logger.hasHandlers():
+    root_logger.addHandler(queue_handler())  # Add a handler if not already added
+
+# Apply custom formatting to root logger handlers; queued records are
+# formatted by the listener's handler instead
+for handler in root_logger.handlers:
+    if not isinstance(handler, QueueHandler):
+        handler.setFormatter(build_formatter())
@@ -0,0 +1,133 @@
+import asyncio
+import os
+import sys
+import time
+from collections import Counter, deque
+from contextlib import nullcontext
+from types import FrameType
+from typing import Any, ContextManager, Deque, Dict, Optional
+
+# Shared no-op context returned while span recording is off
+NO_SPAN: ContextManager[None] = nullcontext()
+
+
+class Span:
+    __slots__ = ("recorder", "name", "started")
+
+    def __init__(self, recorder: "SpanRecorder", name: str):
+        self.recorder = recorder
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self) -> "Span":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.recorder.record(self.name, time.perf_counter() - self.started)
+
+
+class SpanRecorder:
+    """
+    Wall-clock timings of hot-path coroutines, recorded only while enabled.
+    Disabled, span() costs one attribute check and returns a shared no-op context.
+    """
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self.enabled = False
+        self._durations: Dict[str, Deque[float]] = {}
+        self._counts: Counter = Counter()
+        self._totals: Dict[str, float] = {}
+
+    def span(self, name: str, detail: Optional[str] = None) -> ContextManager:
+        if not self.enabled:
+            return NO_SPAN
+        return Span(self, name if detail is None else f"{name}:{detail}")
+
+    def record(self, name: str, duration: float) -> None:
+        durations = self._durations.get(name)
+        if durations is None:
+            durations = self._durations[name] = deque(maxlen=self.window)
+        durations.append(duration)
+        self._counts[name] += 1
+        self._totals[name] = self._totals.get(name, 0.0) + duration
+
+    def reset(self) -> None:
+        self._durations.clear()
+        self._counts.clear()
+        self._totals.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {}
+        for name, durations in sorted(self._durations.items()):
+            ordered = sorted(durations)
+            stats[name] = {
+                "count": self._counts[name],
+                "total_ms": round(self._totals[name] * 1000, 3),
+                **{
+                    key: round(ordered[int(percent * (len(ordered) - 1))] * 1000, 3)
+                    for key, percent in (
+                        ("p50_ms", 0.5),
+                        ("p95_ms", 0.95),
+                        ("p99_ms", 0.99),
+                    )
+                },
+                "max_ms": round(ordered[-1] * 1000, 3),
+            }
+        return stats
+
+
+spans = SpanRecorder()
+
+
+def collapse(frame: Optional[FrameType]) -> str:
+    """
+    One stack in collapsed (flamegraph.pl / speedscope) form, outermost frame first.
+    """
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def sample_stacks(thread_id: int, duration: float, interval: float) -> Counter:
+    """
+    Sample the stack of `thread_id` every `interval` seconds for `duration` seconds.
+    Runs on another thread: the event loop thread is the one being observed.
+    """
+    stacks: Counter = Counter()
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        frame = sys._current_frames().get(thread_id)
+        if frame is not None:
+            stacks[collapse(frame)] += 1
+        del frame
+        time.sleep(interval)
+    return stacks
+
+
+async def profile(thread_id: int, duration: float, interval: float) -> str:
+    """
+    Sampling profile of the loop thread in collapsed-stack text, with span
+    recording switched on for the same window.
+    """
+    spans.reset()
+    spans.enabled = True
+    try:
+        stacks = await asyncio.to_thread(sample_stacks, thread_id, duration, interval)
+    finally:
+        spans.enabled = False
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+async def record_spans(duration: float) -> Dict[str, Any]:
+    spans.reset()
+    spans.enabled = True
+    try:
+        await asyncio.sleep(duration)
+    finally:
+        spans.enabled = False
+    return spans.stats()
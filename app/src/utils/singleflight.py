@@ -0,0 +1,89 @@
+import asyncio
+import math
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+from utils.deadline import current_deadline
+
+T = TypeVar("T")
+
+
+def deadline_expiry() -> float:
+    deadline = current_deadline.get()
+    return deadline.expires_at if deadline is not None else math.inf
+
+
+@dataclass
+class FlightStats:
+    calls: int = 0
+    shared: int = 0
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one execution whose
+    result (or error) is handed to every caller. A caller only joins a flight
+    whose deadline ends no more than `deadline_slack` seconds before its own,
+    otherwise it starts a new one that later callers join instead.
+    """
+
+    def __init__(self, max_tracked_keys: int, deadline_slack: float = 0.0):
+        self.max_tracked_keys = max_tracked_keys
+        self.deadline_slack = deadline_slack
+        self.calls = 0
+        self.shared = 0
+        self._flights: Dict[Hashable, Tuple[asyncio.Future, float]] = {}
+        self._key_stats: OrderedDict[str, FlightStats] = OrderedDict()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def do(
+        self, key: Hashable, label: str, call: Callable[[], Awaitable[T]]
+    ) -> T:
+        stats = self._stats_for(label)
+        expires_at = deadline_expiry()
+        joined = self._flights.get(key)
+        if joined is not None and joined[1] + self.deadline_slack >= expires_at:
+            self.shared += 1
+            stats.shared += 1
+            return await asyncio.shield(joined[0])
+
+        self.calls += 1
+        stats.calls += 1
+        # The call runs in this caller's context and so under its deadline
+        flight = asyncio.ensure_future(call())
+        self._flights[key] = (flight, expires_at)
+        flight.add_done_callback(lambda _: self._land(key, flight))
+        return await asyncio.shield(flight)
+
+    def _land(self, key: Hashable, flight: asyncio.Future) -> None:
+        joined = self._flights.get(key)
+        if joined is not None and joined[0] is flight:
+            del self._flights[key]
+        if not flight.cancelled():
+            # Mark the error as retrieved when every caller has gone away.
+            flight.exception()
+
+    def _stats_for(self, label: str) -> FlightStats:
+        stats = self._key_stats.get(label)
+        if stats is None:
+            stats = self._key_stats[label] = FlightStats()
+            if len(self._key_stats) > self.max_tracked_keys:
+                self._key_stats.popitem(last=False)
+        else:
+            self._key_stats.move_to_end(label)
+        return stats
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "shared": self.shared,
+            "in_flight": self.in_flight,
+            "keys": {
+                label: {"calls": stats.calls, "shared": stats.shared}
+                for label, stats in self._key_stats.items()
+            },
+        }
@@ -0,0 +1,318 @@
+import base64
+import json
+import threading
+from collections import deque
+from typing import Any, Callable, ContextManager, Deque, Dict, List, Mapping, Optional
+
+from utils.config import Settings
+from utils.logger import logger_config
+from utils.profiling import NO_SPAN
+
+log = logger_config(__name__)
+
+try:
+    from opentelemetry import propagate, trace
+    from opentelemetry.context import Context
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+    from opentelemetry.sdk.trace.export import (
+        BatchSpanProcessor,
+        SimpleSpanProcessor,
+        SpanExportResult,
+    )
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    TRACING_AVAILABLE = True
+except ImportError:
+    TRACING_AVAILABLE = False
+
+try:
+    from google.protobuf.json_format import MessageToDict  # type: ignore
+    from opentelemetry.exporter.otlp.proto.common.trace_encoder import encode_spans
+
+    OTLP_ENCODER_AVAILABLE = True
+except ImportError:
+    OTLP_ENCODER_AVAILABLE = False
+
+MEMORY_EXPORTER = "memory"
+FILE_EXPORTER = "file"
+
+# Probes and scrapes would drown the interesting traces
+UNTRACED_PREFIXES = ("/health", "/metrics")
+
+EVENT_STREAM = b"text/event-stream"
+
+
+def is_event_stream(message: Dict[str, Any]) -> bool:
+    return any(
+        key.lower() == b"content-type" and value.startswith(EVENT_STREAM)
+        for key, value in message.get("headers", [])
+    )
+
+
+# OTLP/JSON carries ids as hex, protobuf's JSON mapping as base64
+OTLP_ID_FIELDS = frozenset({"traceId", "spanId", "parentSpanId"})
+
+
+def otlp_ids_to_hex(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: base64.b64decode(item).hex()
+            if key in OTLP_ID_FIELDS and isinstance(item, str)
+            else otlp_ids_to_hex(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [otlp_ids_to_hex(item) for item in value]
+    return value
+
+
+class MemorySpanExporter:
+    """
+    Keeps the last `max_spans` finished spans for /admin/traces and tests.
+    """
+
+    def __init__(self, max_spans: int):
+        self.finished: Deque["ReadableSpan"] = deque(maxlen=max_spans)
+
+    def export(self, spans: List["ReadableSpan"]) -> "SpanExportResult":
+        self.finished.extend(spans)
+        return SpanExportResult.SUCCESS
+
+    def spans(self, limit: Optional[int] = None) -> List["ReadableSpan"]:
+        finished = list(self.finished)
+        return finished if limit is None else finished[-limit:]
+
+    def clear(self) -> None:
+        self.finished.clear()
+
+    def shutdown(self) -> None:
+        pass
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+
+class OTLPFileExporter:
+    """
+    Appends each exported batch to `path` as one OTLP/JSON line, the format the
+    collector's file exporter writes and its otlpjsonfile receiver reads back.
+    Without the OTLP encoder installed, one SDK JSON document per span is written.
+    Called from the batch processor's thread, never from the event loop.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: List["ReadableSpan"]) -> "SpanExportResult":
+        if OTLP_ENCODER_AVAILABLE:
+            lines = [json.dumps(otlp_ids_to_hex(MessageToDict(encode_spans(spans))))]
+        else:
+            lines = [span.to_json(indent=None) for span in spans]
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as file:
+                file.writelines(f"{line}\n" for line in lines)
+        except OSError as e:
+            log.error("Failed to export %s spans to %s: %s", len(spans), self.path, e)
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+
+class Tracer:
+    """
+    W3C trace context across routes, upstream GraphQL calls and broker events.
+    Disabled, or without the OpenTelemetry SDK installed, span() returns the shared
+    no-op context and inject()/extract() do nothing.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.memory: Optional[MemorySpanExporter] = None
+        self._provider: Any = None
+        self._tracer: Any = None
+
+    def configure(
+        self,
+        enabled: bool,
+        service_name: str,
+        sample_ratio: float,
+        exporter: str,
+        export_file: str = "",
+        memory_max_spans: int = 1000,
+    ) -> None:
+        self.shutdown()
+        if not enabled:
+            return
+        if not TRACING_AVAILABLE:
+            log.warning("Tracing enabled but opentelemetry-sdk is not installed")
+            return
+        if exporter == FILE_EXPORTER:
+            processor: Any = BatchSpanProcessor(OTLPFileExporter(export_file))  # type: ignore[arg-type]
+        elif exporter == MEMORY_EXPORTER:
+            self.memory = MemorySpanExporter(memory_max_spans)
+            processor = SimpleSpanProcessor(self.memory)  # type: ignore[arg-type]
+        else:
+            raise ValueError(f"Unknown tracing exporter {exporter!r}")
+        # Parent-based: an upstream sampling decision in traceparent is honoured
+        self._provider = TracerProvider(
+            sampler=ParentBased(TraceIdRatioBased(sample_ratio)),
+            resource=Resource.create({"service.name": service_name}),
+        )
+        self._provider.add_span_processor(processor)
+        self._tracer = self._provider.get_tracer(__name__)
+        self.enabled = True
+
+    def configure_from_settings(self, settings: Settings) -> None:
+        self.configure(
+            enabled=settings.TRACING_ENABLED,
+            service_name=settings.IMAGE_NAME,
+            sample_ratio=settings.TRACING_SAMPLE_RATIO,
+            exporter=settings.TRACING_EXPORTER,
+            export_file=settings.TRACING_EXPORT_FILE,
+            memory_max_spans=settings.TRACING_MEMORY_MAX_SPANS,
+        )
+
+    def shutdown(self) -> None:
+        """
+        Flush pending spans and go back to no-op.
+        """
+        self.enabled = False
+        if self._provider is not None:
+            self._provider.shutdown()
+        self._provider = None
+        self._tracer = None
+        self.memory = None
+
+    def span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        kind: str = "internal",
+        context: Optional["Context"] = None,
+        end_on_exit: bool = True,
+    ) -> ContextManager:
+        """
+        Span made current for the block; yields the span, or None when disabled.
+        """
+        if not self.enabled:
+            return NO_SPAN
+        return self._tracer.start_as_current_span(
+            name,
+            context=context,
+            kind=trace.SpanKind[kind.upper()],
+            end_on_exit=end_on_exit,
+            attributes={
+                key: value
+                for key, value in (attributes or {}).items()
+                if value is not None
+            },
+        )
+
+    def inject(self, headers: Dict[str, str]) -> None:
+        """
+        Add traceparent (and tracestate) for the current span to outgoing headers.
+        """
+        if self.enabled:
+            propagate.inject(headers)
+
+    def extract(self, headers: Optional[Mapping[str, Any]]) -> Optional["Context"]:
+        """
+        Parent context from incoming HTTP or AMQP headers; AMQP values may be bytes.
+        """
+        if not self.enabled or not headers:
+            return None
+        return propagate.extract(
+            {
+                key.lower(): value.decode("latin-1")
+                if isinstance(value, bytes)
+                else str(value)
+                for key, value in headers.items()
+            }
+        )
+
+    def finished_spans(self, limit: int) -> Optional[List[Dict[str, Any]]]:
+        if self.memory is None:
+            return None
+        return [
+            json.loads(span.to_json(indent=None)) for span in self.memory.spans(limit)
+        ]
+
+
+tracing = Tracer()
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware opening a server span per request, continuing the caller's
+    trace from traceparent. The span is named after the route template once
+    routing has matched it. Event streams stay open for as long as the client
+    listens, so their span ends when the response starts.
+    """
+
+    def __init__(self, app: Callable, tracer: Tracer = tracing):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(
+        self, scope: Dict[str, Any], receive: Callable, send: Callable
+    ) -> None:
+        if (
+            scope["type"] != "http"
+            or not self.tracer.enabled
+            or scope.get("path", "").startswith(UNTRACED_PREFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        ended = False
+
+        def end_span() -> None:
+            nonlocal ended
+            if ended:
+                return
+            ended = True
+            route = getattr(scope.get("route"), "path", None)
+            if route is not None:
+                span.update_name(f"{method} {route}")
+                span.set_attribute("http.route", route)
+            span.set_attribute("http.response.status_code", status)
+            if status >= 500:
+                span.set_status(trace.StatusCode.ERROR)
+            span.end()
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if is_event_stream(message):
+                    end_span()
+            await send(message)
+
+        headers = {
+            key.decode("latin-1"): value.decode("latin-1")
+            for key, value in scope.get("headers", [])
+        }
+        with self.tracer.span(
+            method,
+            {"http.request.method": method, "url.path": scope.get("path")},
+            kind="server",
+            context=self.tracer.extract(headers),
+            end_on_exit=False,
+        ) as span:
+            try:
+                await self.app(scope, receive, send_with_status)
+            except BaseException as e:
+                if not ended:
+                    span.record_exception(e)
+                raise
+            finally:
+                end_span()
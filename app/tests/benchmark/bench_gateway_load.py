@@ -0,0 +1,277 @@
+"""
+Load test of the gateway REST routes against local stand-ins: fake team and rating
+GraphQL services served by uvicorn on localhost, and the in-memory broker feeding
+the real consumer with the events those services publish.
+
+Every scenario is driven open-loop at a fixed rate, with at most `--concurrency`
+requests in flight; latency is measured from each request's scheduled start, so
+queueing behind the concurrency limit is counted. Prints one JSON document.
+
+usage: python tests/benchmark/bench_gateway_load.py [--rps N] [--duration S]
+    [--concurrency N] [--scenario NAME ...] [--respond-async]
+    [--team-latency-ms MS] [--rating-latency-ms MS] [--latency-sigma S]
+    [--error-rate P] [--event-delay-ms MS] [--event-loss-rate P] [--output PATH]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+
+from fakes.broker import InMemoryBroker
+from fakes.upstreams import (
+    EventPublisher,
+    FakeUpstreams,
+    LatencyModel,
+    local_socket,
+    serve,
+)
+
+SEEDED_TEAMS = 20
+PLAYERS_PER_TEAM = 10
+
+Request = Tuple[str, Dict[str, Any]]
+
+
+def scenarios(rng: random.Random) -> Dict[str, Callable]:
+    """
+    One request factory per gateway_router write/read route.
+    """
+    counter = iter(range(10**9))
+
+    def seeded_team() -> str:
+        return f"team-{rng.randrange(SEEDED_TEAMS)}"
+
+    def rate_team() -> Request:
+        team_name = seeded_team()
+        return "/team/rate", {
+            "team_name": team_name,
+            "players_data": [
+                {
+                    "player_name": f"{team_name}-player-{index}",
+                    "player_score": rng.randint(1, 10),
+                }
+                for index in range(PLAYERS_PER_TEAM)
+            ],
+        }
+
+    return {
+        "create_team": lambda: (
+            "/team/create",
+            {"team_name": f"load-team-{next(counter)}", "team_password": "secret"},
+        ),
+        "create_player": lambda: (
+            "/team/player/create",
+            {"team_name": seeded_team(), "player_name": f"load-player-{next(counter)}"},
+        ),
+        "join_team": lambda: (
+            "/team/join",
+            {"team_name": seeded_team(), "team_password": "secret"},
+        ),
+        "join_player": lambda: (
+            "/player/join",
+            {"team_name": seeded_team(), "player_name": "load-player"},
+        ),
+        "rate_team": rate_team,
+    }
+
+
+def percentile(ordered: List[float], percent: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def event_wait_timeouts() -> float:
+    from prometheus_client import REGISTRY
+
+    return sum(
+        sample.value
+        for metric in REGISTRY.collect()
+        if metric.name == "gateway_event_wait_timeouts"
+        for sample in metric.samples
+        if sample.name == "gateway_event_wait_timeouts_total"
+    )
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    make_request: Callable[[], Request],
+    args: argparse.Namespace,
+) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies: List[float] = []
+    outcomes: Counter = Counter()
+    headers = {"Prefer": "respond-async"} if args.respond_async else {}
+    timeouts_before = event_wait_timeouts()
+
+    async def send(scheduled: float) -> None:
+        path, body = make_request()
+        async with semaphore:
+            try:
+                response = await client.post(
+                    f"{args.api_prefix}{path}", json=body, headers=headers
+                )
+                outcomes[str(response.status_code)] += 1
+            except httpx.HTTPError as e:
+                outcomes[type(e).__name__] += 1
+        latencies.append(time.perf_counter() - scheduled)
+
+    total = int(args.rps * args.duration)
+    started = time.perf_counter()
+    tasks = []
+    for index in range(total):
+        scheduled = started + index / args.rps
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send(scheduled)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    succeeded = sum(count for status, count in outcomes.items() if status[0] == "2")
+    return {
+        "requests": total,
+        "succeeded": succeeded,
+        "outcomes": dict(sorted(outcomes.items())),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(succeeded / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            name: round(percentile(latencies, percent) * 1000, 2)
+            for name, percent in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100))
+        },
+        "event_wait_timeouts": int(event_wait_timeouts() - timeouts_before),
+    }
+
+
+async def main(args: argparse.Namespace) -> Dict[str, Any]:
+    team_socket, rating_socket = local_socket(), local_socket()
+    # Settings are read at import: point the gateway at the stand-ins first
+    os.environ.update(
+        {
+            "LOG_LEVEL": args.log_level,
+            "TEAM_SERVICE_HOST": "127.0.0.1",
+            "TEAM_SERVICE_PORT": str(team_socket.getsockname()[1]),
+            "RATING_SERVICE_HOST": "127.0.0.1",
+            "RATING_SERVICE_PORT": str(rating_socket.getsockname()[1]),
+        }
+    )
+    from events.consumer import Consumer
+    from main import app
+    from service.gateway_service import GatewayService
+    from utils.config import get_settings
+
+    settings = get_settings()
+    args.api_prefix = settings.API_PREFIX
+    rng = random.Random(args.seed)
+    broker = InMemoryBroker()
+    upstreams = FakeUpstreams(
+        EventPublisher(
+            broker,
+            settings.EXCHANGE_NAME,
+            settings.REPLY_EXCHANGE_NAME,
+            LatencyModel(
+                args.event_delay_ms, args.latency_sigma, args.event_loss_rate, rng
+            ),
+        ),
+        LatencyModel(args.team_latency_ms, args.latency_sigma, args.error_rate, rng),
+        LatencyModel(args.rating_latency_ms, args.latency_sigma, args.error_rate, rng),
+    )
+    for index in range(SEEDED_TEAMS):
+        upstreams.add_team(f"team-{index}", players=PLAYERS_PER_TEAM)
+
+    servers = [
+        await serve(upstreams.team_service, team_socket),
+        await serve(upstreams.rating_service, rating_socket),
+    ]
+    consumer = Consumer(broker.connection())
+    await consumer.connect()
+    await consumer.consume(app)
+    GatewayService.reply_to = consumer.reply_to
+    app.state.consumer = consumer
+    GatewayService.start_http_clients()
+
+    factories = scenarios(rng)
+    results: Dict[str, Any] = {}
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://gateway",
+            timeout=args.client_timeout,
+        ) as client:
+            for name in args.scenario or list(factories):
+                results[name] = await run_scenario(client, factories[name], args)
+    finally:
+        await consumer.close()
+        await GatewayService.close_http_clients()
+        for server, task in servers:
+            server.should_exit = True
+            await task
+
+    return {
+        "config": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("output", "api_prefix")
+        },
+        "upstreams": {
+            "team_requests": upstreams.team_service.requests,
+            "team_failures": upstreams.team_service.failures,
+            "rating_requests": upstreams.rating_service.requests,
+            "rating_failures": upstreams.rating_service.failures,
+            "events_published": upstreams.publisher.published,
+            "events_lost": upstreams.publisher.dropped,
+        },
+        "scenarios": results,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rps", type=float, default=200)
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=[
+            "create_team",
+            "create_player",
+            "join_team",
+            "join_player",
+            "rate_team",
+        ],
+    )
+    parser.add_argument("--respond-async", action="store_true")
+    parser.add_argument("--team-latency-ms", type=float, default=5)
+    parser.add_argument("--rating-latency-ms", type=float, default=5)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--event-delay-ms", type=float, default=10)
+    parser.add_argument("--event-loss-rate", type=float, default=0.0)
+    parser.add_argument("--client-timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = json.dumps(asyncio.run(main(args)), indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(report + "\n")
+    print(report)
@@ -0,0 +1,60 @@
+"""
+Microbenchmark of the JSON codec on typical TeamDetails payloads.
+
+usage: python tests/benchmark/bench_json_codec.py [--players N] [--number N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from models.team_model import TeamDetails
+from utils import json_codec
+
+
+def team_details(players: int) -> dict:
+    return TeamDetails(
+        team_id=1,
+        team_name="benchmark-team",
+        players_data=[
+            {"player_name": f"player-{index}", "player_average_rating": index / 3}
+            for index in range(players)
+        ],
+    ).model_dump()
+
+
+def measure(statement, number: int) -> float:
+    return min(timeit.repeat(statement, number=number, repeat=5)) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, default=20)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    payload = team_details(args.players)
+    encoded = json.dumps(payload).encode("utf-8")
+    results = {
+        "backend": json_codec.JSON_BACKEND,
+        "payload_bytes": len(encoded),
+        "dumps_stdlib_us": measure(
+            lambda: json.dumps(payload).encode("utf-8"), args.number
+        ),
+        "dumps_codec_us": measure(lambda: json_codec.dumps(payload), args.number),
+        "loads_stdlib_us": measure(
+            lambda: json.loads(encoded.decode("utf-8")), args.number
+        ),
+        "loads_codec_us": measure(lambda: json_codec.loads(encoded), args.number),
+    }
+    results["dumps_speedup"] = results["dumps_stdlib_us"] / results["dumps_codec_us"]
+    results["loads_speedup"] = results["loads_stdlib_us"] / results["loads_codec_us"]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
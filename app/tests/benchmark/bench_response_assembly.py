@@ -0,0 +1,128 @@
+"""
+Benchmark of team details assembly for a large team: the previous path
+(TeamDetails/PlayerDetails models, then FastAPI's response_model validation
+and encoding) against validating upstream data once with TypeAdapters and
+rendering the assembled dicts directly.
+
+usage: python tests/benchmark/bench_response_assembly.py [--players N] [--number N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+from typing import Any, Callable, Dict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from models.payloads import TEAM_PLAYERS, TEAM_RATINGS
+from models.player_model import PlayerDetails
+from models.team_model import TeamDetails
+from utils.json_codec import FastJSONResponse
+
+RESPONSE_MODEL: TypeAdapter[TeamDetails] = TypeAdapter(TeamDetails)
+
+
+def upstream_payloads(players: int):
+    team = {
+        "team_id": 1,
+        "team_name": "benchmark-team",
+        "players_data": [
+            {"player_id": index, "player_name": f"player-{index}"}
+            for index in range(players)
+        ],
+    }
+    ratings = {
+        "team_id": 1,
+        "players_data": [
+            {"player_id": index, "player_average_rating": index / 3}
+            for index in range(players)
+        ],
+    }
+    return team, ratings
+
+
+def model_path(team: Dict[str, Any], ratings: Dict[str, Any]) -> bytes:
+    player_ratings = {
+        rating["player_id"]: rating["player_average_rating"]
+        for rating in ratings["players_data"]
+    }
+    details = TeamDetails(
+        team_id=team["team_id"],
+        team_name=team["team_name"],
+        players_data=[
+            PlayerDetails(
+                player_name=player["player_name"],
+                player_average_rating=player_ratings.get(player["player_id"]),
+            )
+            for player in team["players_data"]
+        ],
+    )
+    # What FastAPI does with a returned model and response_model=TeamDetails
+    validated = RESPONSE_MODEL.validate_python(details, from_attributes=True)
+    return JSONResponse(RESPONSE_MODEL.dump_python(validated, mode="json")).body
+
+
+def lean_path(team: Dict[str, Any], ratings: Dict[str, Any]) -> bytes:
+    team = TEAM_PLAYERS.validate_python(team)  # type: ignore[assignment]
+    ratings = TEAM_RATINGS.validate_python(ratings)  # type: ignore[assignment]
+    player_ratings = {
+        rating["player_id"]: rating["player_average_rating"]
+        for rating in ratings["players_data"]
+    }
+    details = {
+        "team_id": team["team_id"],
+        "team_name": team["team_name"],
+        "players_data": [
+            {
+                "player_name": player["player_name"],
+                "player_average_rating": player_ratings.get(player["player_id"]),
+            }
+            for player in team["players_data"]
+        ],
+    }
+    return FastJSONResponse(details).body
+
+
+def profile(path: Callable[[Dict, Dict], bytes], players: int, number: int):
+    team, ratings = upstream_payloads(players)
+    seconds = min(timeit.repeat(lambda: path(team, ratings), number=number, repeat=5))
+    tracemalloc.start()
+    path(team, ratings)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"cpu_us": seconds / number * 1e6, "peak_alloc_bytes": peak}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, default=500)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    team, ratings = upstream_payloads(args.players)
+    assert json.loads(model_path(team, ratings)) == json.loads(lean_path(team, ratings))
+
+    before = profile(model_path, args.players, args.number)
+    after = profile(lean_path, args.players, args.number)
+    print(
+        json.dumps(
+            {
+                "players": args.players,
+                "before": before,
+                "after": after,
+                "cpu_speedup": before["cpu_us"] / after["cpu_us"],
+                "alloc_ratio": before["peak_alloc_bytes"] / after["peak_alloc_bytes"],
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
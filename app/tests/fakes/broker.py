@@ -0,0 +1,179 @@
+"""
+In-memory stand-in for the subset of the aio-pika API used by events.consumer.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import aio_pika  # type: ignore
+
+
+class FakeIncomingMessage:
+    def __init__(
+        self,
+        body: bytes,
+        delivery_tag: int,
+        correlation_id: Optional[str] = None,
+        headers: Optional[Dict[str, Any]] = None,
+        reply_to: Optional[str] = None,
+        channel: Optional["FakeChannel"] = None,
+    ):
+        self.body = body
+        self.delivery_tag = delivery_tag
+        self.correlation_id = correlation_id
+        self.headers = headers or {}
+        self.reply_to = reply_to
+        self.channel = channel
+        self.acked = False
+        self.rejected = False
+
+    async def ack(self, multiple: bool = False) -> None:
+        if self.channel is not None:
+            self.channel.settle(self.delivery_tag, multiple)
+        self.acked = True
+
+    async def reject(self, requeue: bool = False) -> None:
+        if self.channel is not None:
+            self.channel.settle(self.delivery_tag, False)
+        self.rejected = True
+
+    @asynccontextmanager
+    async def process(self, requeue: bool = False, **kwargs: Any):
+        try:
+            yield self
+        except Exception:
+            await self.reject(requeue=requeue)
+            raise
+        else:
+            await self.ack()
+
+
+class FakeQueue:
+    def __init__(self, broker: "InMemoryBroker", channel: "FakeChannel", name: str):
+        self.broker = broker
+        self.channel = channel
+        self.name = name
+        self.callback: Optional[Callable] = None
+        self.delivered: List[FakeIncomingMessage] = []
+
+    async def bind(self, exchange: "FakeExchange", routing_key: Optional[str] = None):
+        self.broker.bindings.append((exchange.name, routing_key or "", self))
+
+    async def consume(self, callback: Callable, no_ack: bool = False) -> str:
+        self.callback = callback
+        return f"ctag-{self.name}"
+
+    def deliver(self, message: aio_pika.Message) -> None:
+        incoming = FakeIncomingMessage(
+            body=message.body,
+            delivery_tag=self.channel.next_delivery_tag(),
+            correlation_id=message.correlation_id,
+            headers=dict(message.headers or {}),
+            reply_to=message.reply_to,
+            channel=self.channel,
+        )
+        self.delivered.append(incoming)
+        if self.callback is not None:
+            self.broker.tasks.append(asyncio.create_task(self.callback(incoming)))
+
+
+class FakeExchange:
+    def __init__(self, broker: "InMemoryBroker", name: str, type: Any):
+        self.broker = broker
+        self.name = name
+        self.type = aio_pika.ExchangeType(type)
+
+    async def publish(self, message: aio_pika.Message, routing_key: str = "") -> None:
+        for exchange_name, bound_key, queue in self.broker.bindings:
+            if exchange_name != self.name:
+                continue
+            if self.type == aio_pika.ExchangeType.FANOUT or bound_key == routing_key:
+                queue.deliver(message)
+
+
+class FakeChannel:
+    def __init__(self, broker: "InMemoryBroker"):
+        self.broker = broker
+        self.prefetch_count = 0
+        self._delivery_tag = 0
+        self.unacked: Dict[int, bool] = {}
+        self.ack_calls: List[Tuple[int, bool]] = []
+
+    def next_delivery_tag(self) -> int:
+        self._delivery_tag += 1
+        self.unacked[self._delivery_tag] = True
+        return self._delivery_tag
+
+    def settle(self, delivery_tag: int, multiple: bool) -> None:
+        self.ack_calls.append((delivery_tag, multiple))
+        if multiple:
+            for tag in [tag for tag in self.unacked if tag <= delivery_tag]:
+                del self.unacked[tag]
+        elif self.unacked.pop(delivery_tag, None) is None:
+            raise RuntimeError(f"Unknown delivery tag {delivery_tag}")
+
+    async def set_qos(self, prefetch_count: int = 0, **kwargs: Any) -> None:
+        self.prefetch_count = prefetch_count
+
+    async def declare_exchange(
+        self, name: str, type: Any = aio_pika.ExchangeType.DIRECT, **kwargs: Any
+    ) -> FakeExchange:
+        if name not in self.broker.exchanges:
+            self.broker.exchanges[name] = FakeExchange(self.broker, name, type)
+        return self.broker.exchanges[name]
+
+    async def declare_queue(
+        self, name: Optional[str] = None, **kwargs: Any
+    ) -> FakeQueue:
+        if not name:
+            self.broker.anonymous_queues += 1
+            name = f"amq.gen-{self.broker.anonymous_queues}"
+        queue = FakeQueue(self.broker, self, name)
+        self.broker.queues[name] = queue
+        return queue
+
+
+class FakeConnection:
+    def __init__(self, broker: "InMemoryBroker"):
+        self.broker = broker
+        self.closed = False
+
+    async def channel(self) -> FakeChannel:
+        return FakeChannel(self.broker)
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class InMemoryBroker:
+    def __init__(self):
+        self.exchanges: Dict[str, FakeExchange] = {}
+        self.queues: Dict[str, FakeQueue] = {}
+        self.bindings: List[Tuple[str, str, FakeQueue]] = []
+        self.tasks: List[asyncio.Task] = []
+        self.anonymous_queues = 0
+
+    def connection(self) -> FakeConnection:
+        return FakeConnection(self)
+
+    async def publish(
+        self,
+        exchange_name: str,
+        body: bytes,
+        routing_key: str = "",
+        correlation_id: Optional[str] = None,
+        headers: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        exchange = self.exchanges.get(exchange_name)
+        if exchange is None:
+            return
+        await exchange.publish(
+            aio_pika.Message(body, correlation_id=correlation_id, headers=headers),
+            routing_key=routing_key,
+        )
+
+    async def drain(self) -> None:
+        while self.tasks:
+            tasks, self.tasks = self.tasks, []
+            await asyncio.gather(*tasks)
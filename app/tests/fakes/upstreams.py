@@ -0,0 +1,325 @@
+"""
+Stand-ins for the team and rating GraphQL services, as plain ASGI apps.
+
+Operations are dispatched by operationName, answer after a latency drawn from a
+LatencyModel and, like the real services, publish the matching events to the
+broker stand-in with the caller's correlation ID.
+"""
+
+import asyncio
+import json
+import math
+import random
+import socket
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import graphql
+import uvicorn
+
+from fakes.broker import InMemoryBroker
+
+CORRELATION_ID_HEADER = b"x-correlation-id"
+REPLY_TO_HEADER = b"x-reply-to"
+
+Handler = Callable[[Dict[str, Any], Dict[str, str]], Dict[str, Any]]
+
+
+class LatencyModel:
+    """
+    Log-normal latency around `median_ms`, failing with probability `error_rate`.
+    """
+
+    def __init__(
+        self,
+        median_ms: float = 5.0,
+        sigma: float = 0.5,
+        error_rate: float = 0.0,
+        rng: Optional[random.Random] = None,
+    ):
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.rng = rng or random.Random(0)
+
+    def sample(self) -> float:
+        if self.median_ms <= 0:
+            return 0.0
+        return self.median_ms * math.exp(self.sigma * self.rng.gauss(0, 1)) / 1000
+
+    def fails(self) -> bool:
+        return self.error_rate > 0 and self.rng.random() < self.error_rate
+
+
+class EventPublisher:
+    """
+    Publishes events the way the upstream services do: to the reply exchange when
+    the request carried a reply-to routing key, to the fanout exchange otherwise.
+    """
+
+    def __init__(
+        self,
+        broker: InMemoryBroker,
+        exchange_name: str,
+        reply_exchange_name: str,
+        delay: LatencyModel,
+    ):
+        self.broker = broker
+        self.exchange_name = exchange_name
+        self.reply_exchange_name = reply_exchange_name
+        self.delay = delay
+        self.published = 0
+        self.dropped = 0
+        self._tasks: set = set()
+
+    def emit(self, event_type: str, data: Dict[str, Any], headers: Dict[str, str]):
+        if self.delay.fails():
+            self.dropped += 1
+            return
+        task = asyncio.create_task(self._publish(event_type, data, headers))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _publish(
+        self, event_type: str, data: Dict[str, Any], headers: Dict[str, str]
+    ) -> None:
+        await asyncio.sleep(self.delay.sample())
+        reply_to = headers.get(REPLY_TO_HEADER.decode())
+        await self.broker.publish(
+            self.reply_exchange_name if reply_to else self.exchange_name,
+            json.dumps({"event_type": event_type, "data": data}).encode(),
+            routing_key=reply_to or "",
+            correlation_id=headers.get(CORRELATION_ID_HEADER.decode()),
+        )
+        self.published += 1
+
+
+class FakeGraphQLService:
+    """
+    ASGI app answering GraphQL POSTs, single or batched (JSON array), by operationName.
+    """
+
+    def __init__(self, name: str, handlers: Dict[str, Handler], latency: LatencyModel):
+        self.name = name
+        self.handlers = handlers
+        self.latency = latency
+        self.requests = 0
+        self.failures = 0
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable):
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        headers = {
+            key.decode().lower(): value.decode() for key, value in scope["headers"]
+        }
+        self.requests += 1
+
+        await asyncio.sleep(self.latency.sample())
+        if self.latency.fails():
+            self.failures += 1
+            await self.respond(send, 500, {"message": f"{self.name} unavailable"})
+            return
+
+        payload = json.loads(body)
+        if isinstance(payload, list):
+            result: Any = [self.execute(item, headers) for item in payload]
+        else:
+            result = self.execute(payload, headers)
+        await self.respond(send, 200, result)
+
+    def execute(
+        self, payload: Dict[str, Any], headers: Dict[str, str]
+    ) -> Dict[str, Any]:
+        handler = self.handlers.get(payload.get("operationName") or "")
+        if handler is None:
+            return {"data": None, "errors": [{"message": "Unknown operation"}]}
+        return handler(self.arguments(payload), headers)
+
+    @staticmethod
+    def arguments(payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Variables, plus the inline literal arguments of the root field, which is
+        how the gateway passes mutation inputs.
+        """
+        variables = dict(payload.get("variables") or {})
+        query = payload.get("query")
+        if query and query.startswith("mutation"):
+            operation = graphql.parse(query).definitions[0]
+            root = operation.selection_set.selections[0]  # type: ignore[attr-defined]
+            for argument in root.arguments:
+                variables[argument.name.value] = graphql.value_from_ast_untyped(
+                    argument.value, variables
+                )
+        return variables
+
+    @staticmethod
+    async def respond(send: Callable, status: int, content: Any) -> None:
+        body = json.dumps(content).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+def errors(field: str, message: str) -> Dict[str, Any]:
+    return {"data": {field: None}, "errors": [{"message": message}]}
+
+
+class FakeUpstreams:
+    """
+    Shared state of the team and rating service stand-ins.
+    `team_service` and `rating_service` are the ASGI apps to serve.
+    """
+
+    def __init__(
+        self,
+        publisher: EventPublisher,
+        team_latency: LatencyModel,
+        rating_latency: LatencyModel,
+    ):
+        self.publisher = publisher
+        self.teams: Dict[str, Dict[str, Any]] = {}
+        self.players: Dict[int, List[Tuple[int, str]]] = {}
+        self.ratings: Dict[int, List[int]] = {}
+        self._next_id = 0
+        self.team_service = FakeGraphQLService(
+            "team",
+            {
+                "CreateTeam": self.create_team,
+                "JoinTeam": self.join_team,
+                "CreatePlayer": self.create_player,
+                "GetPlayers": self.get_players,
+            },
+            team_latency,
+        )
+        self.rating_service = FakeGraphQLService(
+            "rating",
+            {
+                "GetPlayersRating": self.get_players_rating,
+                "RatePlayers": self.rate_players,
+            },
+            rating_latency,
+        )
+
+    def next_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    def add_team(self, team_name: str, players: int = 0) -> Dict[str, Any]:
+        team = {"team_id": self.next_id(), "team_name": team_name}
+        self.teams[team_name] = team
+        self.players[team["team_id"]] = []
+        for index in range(players):
+            self.add_player(team, f"{team_name}-player-{index}")
+        return team
+
+    def add_player(self, team: Dict[str, Any], player_name: str) -> int:
+        player_id = self.next_id()
+        self.players[team["team_id"]].append((player_id, player_name))
+        self.ratings[player_id] = []
+        return player_id
+
+    def create_team(self, variables: Dict[str, Any], headers: Dict[str, str]):
+        team_name = variables["new_team"]["team_name"]
+        if team_name in self.teams:
+            return errors("create_team", f"Team {team_name} already exists")
+        team = self.add_team(team_name)
+        self.publisher.emit("team_created", dict(team), headers)
+        return {"data": {"create_team": team}}
+
+    def join_team(self, variables: Dict[str, Any], headers: Dict[str, str]):
+        team = self.teams.get(variables["team_data"]["team_name"])
+        if team is None:
+            return errors("join_team", "Team not found")
+        return {"data": {"join_team": team}}
+
+    def create_player(self, variables: Dict[str, Any], headers: Dict[str, str]):
+        new_player = variables["new_player"]
+        team = self.teams.get(new_player["team_name"])
+        if team is None:
+            return errors("create_player", "Team not found")
+        player_id = self.add_player(team, new_player["player_name"])
+        # The rating service answers player_created with rating_updated
+        self.publisher.emit("rating_updated", dict(team), headers)
+        return {
+            "data": {
+                "create_player": {
+                    "player_id": player_id,
+                    "player_name": new_player["player_name"],
+                }
+            }
+        }
+
+    def get_players(self, variables: Dict[str, Any], headers: Dict[str, str]):
+        team = self.teams.get(variables["team_name"])
+        if team is None:
+            return errors("get_players", "Team not found")
+        players = [
+            {"player_id": player_id, "player_name": player_name}
+            for player_id, player_name in self.players[team["team_id"]]
+        ]
+        return {"data": {"get_players": {**team, "players_data": players}}}
+
+    def get_players_rating(self, variables: Dict[str, Any], headers: Dict[str, str]):
+        team_id = variables["team_id"]
+        players = [
+            {
+                "player_id": player_id,
+                "player_average_rating": (
+                    sum(self.ratings[player_id]) / len(self.ratings[player_id])
+                    if self.ratings[player_id]
+                    else 0.0
+                ),
+            }
+            for player_id, _ in self.players.get(team_id, [])
+        ]
+        return {
+            "data": {
+                "get_players_rating": {"team_id": team_id, "players_data": players}
+            }
+        }
+
+    def rate_players(self, variables: Dict[str, Any], headers: Dict[str, str]):
+        team_rating = variables["team_rating"]
+        for player in team_rating["players_data"]:
+            self.ratings.setdefault(player["player_id"], []).append(
+                player["player_score"]
+            )
+        self.publisher.emit(
+            "rating_updated", {"team_id": team_rating["team_id"]}, headers
+        )
+        return {"data": {"rate_players": {"team_id": team_rating["team_id"]}}}
+
+
+def local_socket() -> socket.socket:
+    """
+    Socket bound to a free localhost port, so the port is known before serving.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", 0))
+    return sock
+
+
+async def serve(app: Any, sock: socket.socket) -> Tuple[uvicorn.Server, asyncio.Task]:
+    """
+    Serve an ASGI app with uvicorn on `sock`. Set `should_exit` on the returned
+    server and await the task to stop it.
+    """
+    server = uvicorn.Server(
+        uvicorn.Config(app, log_level="warning", lifespan="off", access_log=False)
+    )
+    task = asyncio.create_task(server.serve(sockets=[sock]))
+    while not server.started:
+        await asyncio.sleep(0.01)
+    return server, task
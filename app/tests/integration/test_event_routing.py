@@ -0,0 +1,187 @@
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from events.consumer import Consumer
+from routes import gateway_router
+from service.gateway_service import GatewayService
+from fakes.broker import InMemoryBroker
+
+
+def event(event_type: str, data: dict) -> bytes:
+    return json.dumps({"event_type": event_type, "data": data}).encode()
+
+
+async def start_replica(broker: InMemoryBroker, replica_id: str, mode: str) -> Consumer:
+    consumer = Consumer(
+        broker.connection(),
+        exchange_name="events-exchange",
+        routing_mode=mode,
+        reply_exchange_name="events-replies",
+        replica_id=replica_id,
+    )
+    await consumer.connect()
+    await consumer.consume(None)  # type: ignore[arg-type]
+    return consumer
+
+
+@pytest.mark.asyncio
+async def test_direct_mode_delivers_only_to_originating_replica():
+    broker = InMemoryBroker()
+    replica_a = await start_replica(broker, "a", "direct")
+    replica_b = await start_replica(broker, "b", "direct")
+
+    with GatewayService.expect_event("team_created") as waiter:
+        await broker.publish(
+            "events-replies",
+            event("team_created", {"team_id": 1, "team_name": "team"}),
+            routing_key=replica_a.reply_to,  # type: ignore[arg-type]
+            correlation_id=waiter.correlation_id,
+        )
+        await broker.drain()
+        assert await GatewayService.wait_for_event(waiter, timeout=1) == {
+            "team_id": 1,
+            "team_name": "team",
+        }
+
+    assert len(replica_a.queue.delivered) == 1  # type: ignore[attr-defined]
+    assert len(replica_b.queue.delivered) == 0  # type: ignore[attr-defined]
+    await replica_a.close()
+    await replica_b.close()
+
+
+def bindings(broker: InMemoryBroker, consumer: Consumer) -> list:
+    return [
+        (exchange, key, queue.name)
+        for exchange, key, queue in broker.bindings
+        if queue in (consumer.queue, consumer.broadcast_queue)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_bindings_made_in_each_routing_mode():
+    broker = InMemoryBroker()
+    fanout = await start_replica(broker, "a", "fanout")
+    direct = await start_replica(broker, "b", "direct")
+    reply_only = Consumer(
+        broker.connection(),
+        exchange_name="events-exchange",
+        routing_mode="direct",
+        reply_exchange_name="events-replies",
+        replica_id="c",
+        subscribe_broadcasts=False,
+    )
+    await reply_only.connect()
+
+    assert fanout.broadcast_queue is None
+    assert bindings(broker, fanout) == [("events-exchange", "", fanout.queue.name)]  # type: ignore[attr-defined]
+    assert bindings(broker, direct) == [
+        ("events-replies", direct.reply_to, direct.queue.name),  # type: ignore[attr-defined]
+        ("events-exchange", "", direct.broadcast_queue.name),  # type: ignore[attr-defined]
+    ]
+    assert direct.broadcast_channel is not direct.channel
+    assert bindings(broker, reply_only) == [
+        ("events-replies", reply_only.reply_to, reply_only.queue.name)  # type: ignore[attr-defined]
+    ]
+    await fanout.close()
+    await direct.close()
+
+
+@pytest.mark.asyncio
+async def test_direct_mode_applies_broadcasts_without_resolving_waiters(monkeypatch):
+    applied = []
+    monkeypatch.setattr(
+        GatewayService,
+        "apply_broadcast",
+        lambda event_type, data: applied.append((event_type, data)),
+    )
+    broker = InMemoryBroker()
+    replica_a = await start_replica(broker, "a", "direct")
+    replica_b = await start_replica(broker, "b", "direct")
+
+    # Published by an upstream that ignores X-Reply-To
+    with GatewayService.expect_event("rating_updated") as waiter:
+        await broker.publish(
+            "events-exchange",
+            event("rating_updated", {"team_id": 2}),
+            correlation_id=waiter.correlation_id,
+        )
+        await broker.drain()
+        assert not waiter.future.done()
+
+    assert applied == [("rating_updated", {"team_id": 2})] * 2
+    for replica in (replica_a, replica_b):
+        assert len(replica.queue.delivered) == 0  # type: ignore[attr-defined]
+        assert len(replica.broadcast_queue.delivered) == 1  # type: ignore[attr-defined]
+    await replica_a.close()
+    await replica_b.close()
+    assert replica_a.broadcast_channel.unacked == {}  # type: ignore[attr-defined]
+
+
+@pytest.mark.asyncio
+async def test_fanout_mode_delivers_to_every_replica():
+    broker = InMemoryBroker()
+    replica_a = await start_replica(broker, "a", "fanout")
+    replica_b = await start_replica(broker, "b", "fanout")
+
+    assert replica_a.reply_to is None
+    await broker.publish("events-exchange", event("rating_updated", {"team_id": 1}))
+    await broker.drain()
+
+    assert len(replica_a.queue.delivered) == 1  # type: ignore[attr-defined]
+    assert len(replica_b.queue.delivered) == 1  # type: ignore[attr-defined]
+    await replica_a.close()
+    await replica_b.close()
+    assert replica_a.channel.unacked == {}  # type: ignore[attr-defined]
+
+
+@pytest.mark.asyncio
+async def test_messages_that_are_not_json_objects_are_discarded(caplog):
+    broker = InMemoryBroker()
+    replica = await start_replica(broker, "a", "fanout")
+
+    for body in (b"[1, 2]", b'"team_created"', b"null"):
+        await broker.publish("events-exchange", body)
+    await broker.drain()
+
+    assert caplog.text.count("not a JSON object") == 3
+    await replica.close()
+    assert replica.channel.unacked == {}  # type: ignore[attr-defined]
+
+
+@pytest.mark.asyncio
+async def test_create_team_route_resolves_an_uncorrelated_event(monkeypatch):
+    broker = InMemoryBroker()
+    replica = await start_replica(broker, "a", "fanout")
+
+    # Like the upstream team service, which doesn't echo X-Correlation-ID
+    async def create_team(new_team, correlation_id=None):
+        created = {"team_id": 3, "team_name": new_team.team_name}
+        await broker.publish("events-exchange", event("team_created", created))
+        return created
+
+    monkeypatch.setattr(GatewayService, "create_team", create_team)
+    app = FastAPI()
+    app.include_router(gateway_router.app_router)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            "/team/create", json={"team_name": "blue", "team_password": "secret"}
+        )
+    await broker.drain()
+
+    assert response.status_code == 200
+    assert response.json() == {"team_id": 3, "team_name": "blue"}
+    assert len(GatewayService.rendezvous) == 0
+    await replica.close()
+
+
+def test_reply_to_header_sent_with_mutations():
+    GatewayService.reply_to = "events-queue.a"
+    try:
+        headers = GatewayService.event_headers("abc")
+    finally:
+        GatewayService.reply_to = None
+    assert headers == {"X-Correlation-ID": "abc", "X-Reply-To": "events-queue.a"}
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from service.batching import RequestBatcher
+from utils.deadline import deadline_scope, remaining_budget
+
+
+class Upstream:
+    def __init__(self, batch_response=None):
+        self.singles = []
+        self.batches = []
+        self.batch_response = batch_response
+
+    async def send_one(self, payload):
+        self.singles.append(payload)
+        return {"data": payload["variables"]}
+
+    async def send_batch(self, payloads):
+        self.batches.append(payloads)
+        if self.batch_response is not None:
+            return self.batch_response
+        return [{"data": payload["variables"]} for payload in payloads]
+
+
+def operation(index: int) -> dict:
+    return {"query": "query", "variables": {"index": index}}
+
+
+@pytest.mark.asyncio
+async def test_operations_in_window_share_one_post():
+    upstream = Upstream()
+    batcher = RequestBatcher(upstream.send_one, upstream.send_batch, 0.01, 10)
+    results = await asyncio.gather(*[batcher.submit(operation(i)) for i in range(3)])
+    assert results == [{"data": {"index": i}} for i in range(3)]
+    assert len(upstream.batches) == 1
+    assert upstream.singles == []
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_sent_without_waiting_for_window():
+    upstream = Upstream()
+    batcher = RequestBatcher(upstream.send_one, upstream.send_batch, 10, 2)
+    results = await asyncio.wait_for(
+        asyncio.gather(*[batcher.submit(operation(i)) for i in range(2)]), 1
+    )
+    assert len(results) == 2
+    assert len(upstream.batches) == 1
+
+
+@pytest.mark.asyncio
+async def test_single_operation_is_sent_as_is():
+    upstream = Upstream()
+    batcher = RequestBatcher(upstream.send_one, upstream.send_batch, 0.001, 10)
+    assert await batcher.submit(operation(1)) == {"data": {"index": 1}}
+    assert upstream.batches == []
+
+
+@pytest.mark.asyncio
+async def test_unbatched_upstream_falls_back_to_single_requests():
+    upstream = Upstream(batch_response={"errors": [{"message": "no batching"}]})
+    batcher = RequestBatcher(upstream.send_one, upstream.send_batch, 0.01, 10)
+    results = await asyncio.gather(*[batcher.submit(operation(i)) for i in range(2)])
+    assert results == [{"data": {"index": 0}}, {"data": {"index": 1}}]
+    assert batcher.stats()["fallbacks"] == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_is_sent_under_the_latest_caller_deadline():
+    budgets = []
+
+    async def send_batch(payloads):
+        budgets.append(remaining_budget(10.0))
+        return [{"data": payload["variables"]} for payload in payloads]
+
+    upstream = Upstream()
+    batcher = RequestBatcher(upstream.send_one, send_batch, window=0.01, max_size=3)
+
+    async def caller(index: int, budget: float):
+        with deadline_scope(budget):
+            return await batcher.submit(operation(index))
+
+    await asyncio.gather(caller(0, 0.5), caller(1, 5.0), caller(2, 1.0))
+    assert len(budgets) == 1
+    assert budgets[0] > 4.0
@@ -0,0 +1,75 @@
+import asyncio
+import time
+
+import pytest
+
+from exceptions.gateway_exceptions import DeadlineExceededError, TeamError
+from service.composition import fan_out
+from utils.deadline import Deadline
+
+
+async def after(delay: float, value=None, error=None):
+    await asyncio.sleep(delay)
+    if error is not None:
+        raise error
+    return value
+
+
+@pytest.mark.asyncio
+async def test_calls_run_concurrently():
+    started = time.monotonic()
+    result = await fan_out(
+        {"players": after(0.05, "players"), "ratings": after(0.05, "ratings")},
+        Deadline(1),
+    )
+    assert time.monotonic() - started < 0.09
+    assert result["players"] == "players"
+    assert result["ratings"] == "ratings"
+
+
+@pytest.mark.asyncio
+async def test_optional_failure_is_collected():
+    result = await fan_out(
+        {"players": after(0, "players"), "ratings": after(0, error=TeamError("down"))},
+        Deadline(1),
+        required=("players",),
+    )
+    assert result["players"] == "players"
+    assert not result.ok("ratings")
+    assert isinstance(result.errors["ratings"], TeamError)
+
+
+@pytest.mark.asyncio
+async def test_required_failure_is_raised():
+    with pytest.raises(TeamError):
+        await fan_out(
+            {"players": after(0, error=TeamError("down"))},
+            Deadline(1),
+            required=("players",),
+        )
+
+
+@pytest.mark.asyncio
+async def test_deadline_is_shared_across_calls():
+    deadline = Deadline(0.05)
+    result = await fan_out({"ratings": after(1, "ratings")}, deadline)
+    assert isinstance(result.errors["ratings"], DeadlineExceededError)
+    with pytest.raises(DeadlineExceededError):
+        await fan_out({"players": after(1, "players")}, deadline, required=("players",))
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_cancels_the_calls():
+    started = asyncio.Event()
+
+    async def slow() -> None:
+        started.set()
+        await asyncio.sleep(10)
+
+    call = asyncio.ensure_future(slow())
+    caller = asyncio.create_task(fan_out({"ratings": call}, Deadline(10)))
+    await started.wait()
+    caller.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await caller
+    assert call.cancelled()
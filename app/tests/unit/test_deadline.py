@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+
+from utils.deadline import current_deadline, deadline_scope, remaining_budget
+
+
+def test_budget_defaults_to_call_timeout_outside_a_request():
+    assert current_deadline.get() is None
+    assert remaining_budget(5) == 5
+
+
+def test_request_deadline_caps_call_timeouts():
+    with deadline_scope(1):
+        assert remaining_budget(5) <= 1
+        assert remaining_budget(0.5) == 0.5
+    assert current_deadline.get() is None
+
+
+def test_nested_scope_cannot_extend_outer_deadline():
+    with deadline_scope(1) as outer:
+        with deadline_scope(10) as inner:
+            assert inner is outer
+        with deadline_scope(0.1) as shorter:
+            assert shorter.expires_at < outer.expires_at
+
+
+@pytest.mark.asyncio
+async def test_deadline_follows_the_request_into_spawned_tasks():
+    async def budget():
+        return remaining_budget(5)
+
+    with deadline_scope(1):
+        assert await asyncio.create_task(budget()) <= 1
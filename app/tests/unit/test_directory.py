@@ -0,0 +1,66 @@
+from service.directory import TeamDirectory
+from utils.cache import TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def players(team_id: int, team_name: str, *names: str) -> dict:
+    return {
+        "team_id": team_id,
+        "team_name": team_name,
+        "players_data": [
+            {"player_id": index, "player_name": name}
+            for index, name in enumerate(names, start=1)
+        ],
+    }
+
+
+def test_cache_evicts_least_recently_used():
+    cache: TTLCache[str, int] = TTLCache(max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_entries_expire():
+    clock = Clock()
+    cache: TTLCache[str, int] = TTLCache(max_entries=2, ttl=10, clock=clock)
+    cache.set("a", 1)
+    clock.now = 11
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert cache.stats()["misses"] == 1
+
+
+def test_directory_resolves_players_from_lookup():
+    directory = TeamDirectory(max_entries=10, ttl=60)
+    directory.store(players(7, "team", "alice", "bob"))
+    team = directory.lookup("team")
+    assert team is not None
+    assert team.team_id == 7
+    assert team.has_players(["alice", "bob"])
+    assert not team.has_players(["carol"])
+    assert directory.stats()["hits"] == 1
+
+
+def test_directory_follows_events():
+    directory = TeamDirectory(max_entries=10, ttl=60)
+    directory.apply_event("team_created", {"team_id": 7, "team_name": "team"})
+    directory.apply_event(
+        "player_created", {"player_id": 3, "player_name": "carol", "team_id": 7}
+    )
+    team = directory.lookup("team")
+    assert team is not None and team.players == {"carol": 3}
+
+    directory.apply_event("team_joined", {"team_id": 7, "team_name": "team"})
+    assert directory.lookup("team") is None
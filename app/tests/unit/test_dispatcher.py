@@ -0,0 +1,143 @@
+import asyncio
+
+import pytest
+
+from events.dispatcher import AckBatcher, MessageDispatcher
+from fakes.broker import FakeChannel, FakeIncomingMessage, InMemoryBroker
+
+
+def messages(channel: FakeChannel, count: int):
+    return [
+        FakeIncomingMessage(b"{}", channel.next_delivery_tag(), channel=channel)
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batches_contiguous_completed_deliveries():
+    channel = FakeChannel(InMemoryBroker())
+    batcher = AckBatcher(batch_size=3, interval=10)
+    first, second, third = messages(channel, 3)
+    for message in (first, second, third):
+        batcher.track(message)
+
+    await batcher.complete(third)
+    await batcher.complete(second)
+    assert channel.ack_calls == []
+
+    await batcher.complete(first)
+    assert channel.ack_calls == [(3, True)]
+    assert channel.unacked == {}
+    assert batcher.messages_acked == 3
+
+
+@pytest.mark.asyncio
+async def test_does_not_ack_past_unfinished_delivery():
+    channel = FakeChannel(InMemoryBroker())
+    batcher = AckBatcher(batch_size=2, interval=10)
+    first, second, third = messages(channel, 3)
+    for message in (first, second, third):
+        batcher.track(message)
+
+    await batcher.complete(first)
+    await batcher.complete(third)
+    assert channel.ack_calls == [(1, True)]
+    assert list(channel.unacked) == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_flushes_after_interval():
+    channel = FakeChannel(InMemoryBroker())
+    batcher = AckBatcher(batch_size=100, interval=0.01)
+    (message,) = messages(channel, 1)
+    batcher.track(message)
+
+    await batcher.complete(message)
+    await asyncio.sleep(0.05)
+    assert channel.ack_calls == [(1, True)]
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_handles_concurrently_and_acks():
+    channel = FakeChannel(InMemoryBroker())
+    release = asyncio.Event()
+    started = 0
+
+    async def handler(context, message):
+        nonlocal started
+        started += 1
+        await release.wait()
+
+    dispatcher = MessageDispatcher(
+        handler, workers=4, queue_size=10, ack_batcher=AckBatcher(4, 10)
+    )
+    dispatcher.start()
+    for message in messages(channel, 4):
+        await dispatcher.submit(None, message)
+    await asyncio.sleep(0.01)
+    assert started == 4
+    assert dispatcher.stats()["in_flight"] == 4
+
+    release.set()
+    await asyncio.sleep(0.01)
+    await dispatcher.stop()
+    stats = dispatcher.stats()
+    assert stats["handled"] == 4
+    assert stats["messages_acked"] == 4
+    assert stats["acks_sent"] == 1
+    assert channel.unacked == {}
+
+
+class ClosedChannel(FakeChannel):
+    def settle(self, delivery_tag, multiple):
+        raise ConnectionError("channel closed")
+
+
+@pytest.mark.asyncio
+async def test_worker_survives_failed_ack():
+    channel = ClosedChannel(InMemoryBroker())
+    handled = []
+
+    async def handler(context, message):
+        handled.append(message.delivery_tag)
+
+    dispatcher = MessageDispatcher(
+        handler, workers=1, queue_size=10, ack_batcher=AckBatcher(1, 10)
+    )
+    dispatcher.start()
+    for message in messages(channel, 2):
+        await dispatcher.submit(None, message)
+    await asyncio.sleep(0.01)
+    assert handled == [1, 2]
+    assert not dispatcher._tasks[0].done()
+    await dispatcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_timed_flush_logs_ack_errors(caplog):
+    channel = ClosedChannel(InMemoryBroker())
+    batcher = AckBatcher(batch_size=100, interval=0.01)
+    (message,) = messages(channel, 1)
+    batcher.track(message)
+
+    await batcher.complete(message)
+    await asyncio.sleep(0.05)
+    assert "Failed to ack handled messages" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_replaced_channel_drops_stale_deliveries():
+    old, new = FakeChannel(InMemoryBroker()), FakeChannel(InMemoryBroker())
+    batcher = AckBatcher(batch_size=1, interval=10)
+    (stale,) = messages(old, 1)
+    batcher.track(stale)
+    old.next_delivery_tag()
+    (fresh,) = messages(new, 1)
+    batcher.track(fresh)
+    assert batcher.outstanding == 1
+
+    await batcher.complete(stale)
+    assert new.ack_calls == []
+    await batcher.complete(fresh)
+    assert new.ack_calls == [(1, True)]
+    assert old.ack_calls == []
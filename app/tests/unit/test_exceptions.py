@@ -0,0 +1,41 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import main
+from exceptions.gateway_exceptions import (
+    BaseServiceError,
+    DeadlineExceededError,
+    EventError,
+    TeamError,
+    UpstreamResponseError,
+    UpstreamUnavailableError,
+    service_error_handler,
+)
+
+
+def test_service_errors_are_handled_by_the_application():
+    assert main.app.exception_handlers[BaseServiceError] is service_error_handler
+
+
+@pytest.mark.parametrize(
+    "error, status_code",
+    [
+        (TeamError("bad team"), 400),
+        (EventError("no event"), 503),
+        (DeadlineExceededError("too slow"), 504),
+        (UpstreamUnavailableError("circuit open"), 503),
+        (UpstreamResponseError("rating"), 502),
+    ],
+)
+def test_service_errors_map_to_their_status_code(error, status_code):
+    app = FastAPI()
+    app.add_exception_handler(BaseServiceError, service_error_handler)  # type: ignore[arg-type]
+
+    @app.get("/fail")
+    async def fail():
+        raise error
+
+    response = TestClient(app).get("/fail")
+    assert response.status_code == status_code
+    assert response.json() == {"message": error.message}
@@ -0,0 +1,146 @@
+import graphql
+import pytest
+
+from service.gateway_service import GatewayService
+from service.graphql_documents import (
+    GET_PLAYERS,
+    create_team_mutation,
+    persisted_query_error,
+    rate_players_mutation,
+)
+from service.http_client import UpstreamClients, UpstreamConfig
+
+
+def test_documents_are_normalized_and_hashed_once():
+    assert "\n" not in GET_PLAYERS.query
+    assert GET_PLAYERS.query.startswith("query GetPlayers($team_name: String!)")
+    assert len(GET_PLAYERS.sha256_hash) == 64
+    assert GET_PLAYERS.read_only
+    assert not create_team_mutation({"team_name": "team"}).read_only
+
+
+@pytest.mark.parametrize(
+    "team_name", ['evil") { team_id } }', "back\\slash\n", "caf\u00e9 \U0001f3c6"]
+)
+def test_mutation_literals_are_escaped(team_name):
+    document = create_team_mutation({"team_name": team_name, "team_password": "pw"})
+    (operation,) = graphql.parse(document.query).definitions
+    (root,) = operation.selection_set.selections  # type: ignore[attr-defined]
+    (argument,) = root.arguments
+
+    assert operation.operation == graphql.OperationType.MUTATION  # type: ignore[attr-defined]
+    assert (root.name.value, argument.name.value) == ("create_team", "new_team")
+    assert graphql.value_from_ast_untyped(argument.value) == {
+        "team_name": team_name,
+        "team_password": "pw",
+    }
+
+
+def test_mutation_inputs_need_no_upstream_type_names():
+    document = rate_players_mutation(
+        {"team_id": 1, "players_data": [{"player_id": 2, "player_score": 5}]}
+    )
+    assert "$" not in document.query
+    assert document.query == (
+        "mutation RatePlayers { rate_players(team_rating: "
+        "{team_id: 1, players_data: [{player_id: 2, player_score: 5}]}) { team_id } }"
+    )
+
+
+def test_values_travel_as_variables():
+    payload = GET_PLAYERS.payload({"team_name": 'evil") { team_id } }'})
+    assert payload["variables"] == {"team_name": 'evil") { team_id } }'}
+    assert "evil" not in payload["query"]
+
+
+def test_persisted_payload_carries_hash_only():
+    payload = GET_PLAYERS.payload(
+        {"team_name": "team"}, persisted=True, include_query=False
+    )
+    assert "query" not in payload
+    assert (
+        payload["extensions"]["persistedQuery"]["sha256Hash"] == GET_PLAYERS.sha256_hash
+    )
+
+
+def test_persisted_query_errors_are_recognized():
+    assert (
+        persisted_query_error({"errors": [{"message": "PersistedQueryNotFound"}]})
+        == "PersistedQueryNotFound"
+    )
+    assert (
+        persisted_query_error(
+            {
+                "errors": [
+                    {
+                        "message": "x",
+                        "extensions": {"code": "PERSISTED_QUERY_NOT_SUPPORTED"},
+                    }
+                ]
+            }
+        )
+        == "PersistedQueryNotSupported"
+    )
+    assert persisted_query_error({"data": {}}) is None
+
+
+def apq_clients() -> UpstreamClients:
+    return UpstreamClients(
+        {
+            "team": UpstreamConfig(
+                name="team",
+                url="http://team/graphql",
+                max_connections=1,
+                max_keepalive_connections=1,
+                keepalive_expiry=1,
+                http2=False,
+                timeout=1,
+                persisted_queries=True,
+            )
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_execute_registers_unknown_persisted_query(monkeypatch):
+    sent = []
+
+    async def post_request(url, payload, headers=None):
+        sent.append(payload)
+        if "query" not in payload:
+            return {"errors": [{"message": "PersistedQueryNotFound"}]}
+        return {"data": {"get_players": {"team_id": 1}}}
+
+    clients = apq_clients()
+    monkeypatch.setattr(GatewayService, "http_clients", clients)
+    monkeypatch.setattr(GatewayService, "post_request", post_request)
+
+    response = await GatewayService.execute(
+        "http://team/graphql", GET_PLAYERS, {"team_name": "team"}
+    )
+    assert response == {"data": {"get_players": {"team_id": 1}}}
+    assert "query" not in sent[0]
+    assert sent[1]["query"] == GET_PLAYERS.query
+    assert "extensions" in sent[1]
+    await clients.close()
+
+
+@pytest.mark.asyncio
+async def test_mutations_are_sent_in_full_and_not_resent(monkeypatch):
+    sent = []
+
+    async def post_request(url, payload, headers=None):
+        sent.append(payload)
+        return {}
+
+    clients = apq_clients()
+    monkeypatch.setattr(GatewayService, "http_clients", clients)
+    monkeypatch.setattr(GatewayService, "post_request", post_request)
+
+    document = create_team_mutation({"team_name": "team", "team_password": "pw"})
+    response = await GatewayService.execute("http://team/graphql", document)
+    assert response == {}
+    assert sent == [
+        {"operationName": "CreateTeam", "variables": {}, "query": document.query}
+    ]
+    await clients.close()
@@ -0,0 +1,64 @@
+import pytest
+
+from resolver.extensions import field_cache
+from resolver.loaders import Loaders
+from resolver.schema import schema
+from service.gateway_service import GatewayService
+from utils.config import get_settings
+
+settings = get_settings()
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    async def get_players_name_many(team_names):
+        calls.append(list(team_names))
+        return [
+            {"team_id": index, "team_name": name, "players_data": []}
+            for index, name in enumerate(team_names)
+        ]
+
+    monkeypatch.setattr(
+        GatewayService, "get_players_name_many", staticmethod(get_players_name_many)
+    )
+    field_cache.clear()
+    return calls
+
+
+async def run(query: str, variables=None):
+    return await schema.execute(
+        query, variable_values=variables, context_value={"loaders": Loaders()}
+    )
+
+
+@pytest.mark.asyncio
+async def test_cost_scales_with_list_argument(calls):
+    team_names = [f"team-{index}" for index in range(settings.GRAPHQL_MAX_COST + 1)]
+    result = await run(
+        "query Teams($names: [String!]!) { teams(team_names: $names) { team_id } }",
+        {"names": team_names},
+    )
+    assert result.errors is not None
+    assert "exceeds the maximum allowed cost" in result.errors[0].message
+    assert calls == []
+
+
+@pytest.mark.asyncio
+async def test_cheap_query_executes(calls):
+    result = await run('query { teams(team_names: ["a", "b"]) { team_name } }')
+    assert result.errors is None
+    assert calls == [["a", "b"]]
+
+
+@pytest.mark.asyncio
+async def test_cache_control_hint_serves_root_field_from_memory(calls):
+    query = 'query { team(team_name: "a") { team_id team_name } }'
+    first = await run(query)
+    second = await run(query)
+    assert first.data == second.data == {"team": {"team_id": 0, "team_name": "a"}}
+    assert calls == [["a"]]
+
+    await run('query { team(team_name: "b") { team_id } }')
+    assert calls == [["a"], ["b"]]
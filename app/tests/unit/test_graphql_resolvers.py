@@ -0,0 +1,100 @@
+import pytest
+
+from resolver.extensions import field_cache
+from resolver.loaders import Loaders
+from resolver.schema import schema
+from service.gateway_service import GatewayService
+from utils.config import get_settings
+
+settings = get_settings()
+
+TEAMS = {
+    "alpha": {"team_id": 1, "players": {10: ("ana", 4.5), 11: ("bob", 3.0)}},
+    "beta": {"team_id": 2, "players": {20: ("cid", 2.5)}},
+}
+
+
+class FakeUpstreams:
+    def __init__(self):
+        self.calls = []
+
+    async def execute(self, url, document, variables, headers=None):
+        self.calls.append((url, document.operation_name))
+        data = {}
+        for alias, key in variables.items():
+            if url == settings.TEAM_SERVICE_URL:
+                team = TEAMS.get(key)
+                data[alias] = team and {
+                    "team_id": team["team_id"],
+                    "team_name": key,
+                    "players_data": [
+                        {"player_id": player_id, "player_name": name}
+                        for player_id, (name, _) in team["players"].items()
+                    ],
+                }
+            else:
+                team = next(t for t in TEAMS.values() if t["team_id"] == key)
+                data[alias] = {
+                    "team_id": key,
+                    "players_data": [
+                        {"player_id": player_id, "player_average_rating": rating}
+                        for player_id, (_, rating) in team["players"].items()
+                    ],
+                }
+        return {"data": data}
+
+
+@pytest.fixture
+def upstreams(monkeypatch):
+    fake = FakeUpstreams()
+    field_cache.clear()
+    monkeypatch.setattr(GatewayService, "execute", staticmethod(fake.execute))
+    return fake
+
+
+async def run(query: str):
+    return await schema.execute(query, context_value={"loaders": Loaders()})
+
+
+@pytest.mark.asyncio
+async def test_teams_with_ratings_make_one_call_per_upstream(upstreams):
+    result = await run(
+        """
+        query { teams(team_names: ["alpha", "beta"]) {
+            team_name players_data { player_name player_average_rating }
+        } }
+        """
+    )
+    assert result.errors is None
+    assert result.data["teams"][0]["players_data"] == [
+        {"player_name": "ana", "player_average_rating": 4.5},
+        {"player_name": "bob", "player_average_rating": 3.0},
+    ]
+    assert sorted(upstreams.calls) == [
+        (settings.RATING_SERVICE_URL, "GetPlayersRatingBatch"),
+        (settings.TEAM_SERVICE_URL, "GetPlayersBatch"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_ratings_are_not_fetched_unless_selected(upstreams):
+    result = await run(
+        'query { team(team_name: "alpha") { players_data { player_name } } }'
+    )
+    assert result.errors is None
+    assert upstreams.calls == [(settings.TEAM_SERVICE_URL, "GetPlayersBatch")]
+
+
+@pytest.mark.asyncio
+async def test_unknown_team_fails_only_its_own_field(upstreams):
+    result = await run(
+        """
+        query {
+            known: team(team_name: "beta") { team_id }
+            unknown: team(team_name: "gamma") { team_id }
+        }
+        """
+    )
+    assert result.data == {"known": {"team_id": 2}, "unknown": None}
+    assert len(result.errors) == 1
+    assert len(upstreams.calls) == 1
@@ -0,0 +1,148 @@
+import asyncio
+
+import httpx
+import pytest
+
+from service.gateway_service import GatewayService
+from service.hedging import Hedger, LatencyWindow
+from service.http_client import UpstreamClients, UpstreamConfig
+from service.resilience import AdaptiveLimiter, CircuitBreaker, UpstreamGuard
+
+
+def primed_hedger(latency: float, **kwargs) -> Hedger:
+    hedger = Hedger(percentile=95, min_samples=5, window=10, **kwargs)
+    for _ in range(5):
+        hedger._latencies.setdefault("op", LatencyWindow(10)).record(latency)
+    return hedger
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_until_enough_samples():
+    hedger = Hedger(percentile=95, min_samples=5, window=10)
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"data": 1}
+
+    assert await hedger.run("op", call) == {"data": 1}
+    assert len(calls) == 1
+    assert hedger.delay("op") is None
+
+
+@pytest.mark.asyncio
+async def test_slow_attempt_is_hedged_and_fastest_response_wins():
+    hedger = primed_hedger(0.01)
+    delays = [1.0, 0.0]
+    cancelled = []
+
+    async def call():
+        delay = delays.pop(0)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(delay)
+            raise
+        return {"data": delay}
+
+    assert await hedger.run("op", call) == {"data": 0.0}
+    await asyncio.sleep(0)
+    assert cancelled == [1.0]
+    assert hedger.stats()["hedged"] == 1
+    assert hedger.stats()["hedges_won"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_hedge_does_not_hide_primary_response():
+    hedger = primed_hedger(0.01)
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        if len(attempts) == 2:
+            return {}
+        await asyncio.sleep(0.05)
+        return {"data": "primary"}
+
+    assert await hedger.run("op", call) == {"data": "primary"}
+    assert hedger.stats()["hedges_won"] == 0
+
+
+@pytest.mark.asyncio
+async def test_hedges_stop_when_the_budget_is_spent():
+    hedger = Hedger(
+        percentile=95, min_samples=5, window=100, budget=0.1, budget_burst=1
+    )
+    for _ in range(50):
+        hedger._latencies.setdefault("op", LatencyWindow(100)).record(0.001)
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return {"data": 1}
+
+    for _ in range(3):
+        await hedger.run("op", call)
+    assert hedger.stats()["hedged"] == 1
+    assert hedger.stats()["budget_exhausted"] == 2
+    assert len(calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_cancelled_hedge_is_not_a_failure_for_the_guard(monkeypatch):
+    url = "http://rating/graphql"
+    guard = UpstreamGuard(
+        "rating",
+        CircuitBreaker(
+            failure_rate=0.5,
+            window=4,
+            min_calls=1,
+            slow_call_duration=10,
+            open_duration=5,
+            half_open_calls=1,
+        ),
+        AdaptiveLimiter(
+            initial_limit=20,
+            min_limit=1,
+            max_limit=20,
+            backoff=0.5,
+            latency_threshold=10,
+        ),
+    )
+    clients = UpstreamClients(
+        {
+            "rating": UpstreamConfig(
+                name="rating",
+                url=url,
+                max_connections=2,
+                max_keepalive_connections=2,
+                keepalive_expiry=1,
+                http2=False,
+                timeout=1,
+            )
+        },
+        {"rating": guard},
+    )
+    delays = [0.2, 0.0]
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(delays.pop(0))
+        return httpx.Response(200, json={"data": {"ok": True}})
+
+    await clients.clients["rating"].aclose()
+    clients.clients["rating"] = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler)
+    )
+    monkeypatch.setattr(GatewayService, "http_clients", clients)
+
+    response = await primed_hedger(0.01).run(
+        url, lambda: GatewayService.post_request(url, {"query": "{ ok }"})
+    )
+    await asyncio.sleep(0)
+    assert response == {"data": {"ok": True}}
+    assert guard.limiter.in_flight == 0
+    assert guard.limiter.limit == 20
+    assert guard.breaker.stats()["failure_rate"] == 0.0
+    await clients.close()
@@ -0,0 +1,47 @@
+import pytest
+
+from service.http_client import UpstreamClients, UpstreamConfig
+
+
+def upstream(name: str, url: str) -> UpstreamConfig:
+    return UpstreamConfig(
+        name=name,
+        url=url,
+        max_connections=10,
+        max_keepalive_connections=5,
+        keepalive_expiry=30,
+        http2=False,
+        timeout=2,
+    )
+
+
+@pytest.mark.asyncio
+async def test_one_client_per_upstream():
+    clients = UpstreamClients(
+        {
+            "team": upstream("team", "http://team/graphql"),
+            "rating": upstream("rating", "http://rating/graphql"),
+        }
+    )
+    try:
+        assert clients.get("http://team/graphql") is clients.clients["team"]
+        assert clients.get("http://rating/graphql") is clients.clients["rating"]
+        assert clients.upstream_name("http://rating/graphql") == "rating"
+        with pytest.raises(KeyError):
+            clients.get("http://unknown/graphql")
+    finally:
+        await clients.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_start_empty():
+    clients = UpstreamClients({"team": upstream("team", "http://team/graphql")})
+    try:
+        stats = clients.stats()["team"]
+        assert stats["connections"] == 0
+        assert stats["in_use"] == 0
+        assert stats["idle"] == 0
+        assert stats["queued"] == 0
+        assert stats["wait_time_avg"] == 0.0
+    finally:
+        await clients.close()
@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+from utils import json_codec
+from utils.json_codec import FastJSONResponse
+
+TEAM = {
+    "team_id": 1,
+    "team_name": "Équipe",
+    "players_data": [{"player_name": "ana", "player_average_rating": 4.5}],
+}
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    if request.param == "json":
+        monkeypatch.setattr(json_codec, "orjson", None)
+    elif json_codec.orjson is None:
+        pytest.skip("orjson is not installed")
+    return request.param
+
+
+def test_round_trip_from_bytes(backend):
+    encoded = json_codec.dumps(TEAM)
+    assert isinstance(encoded, bytes)
+    assert json.loads(encoded) == TEAM
+    assert json_codec.loads(encoded) == TEAM
+    assert json_codec.loads(memoryview(encoded)) == TEAM
+
+
+def test_invalid_payload_raises_stdlib_decode_error(backend):
+    with pytest.raises(json.JSONDecodeError):
+        json_codec.loads(b"{not json")
+
+
+def test_response_renders_with_codec(backend):
+    response = FastJSONResponse(TEAM)
+    assert json.loads(response.body) == TEAM
+    assert response.media_type == "application/json"
@@ -0,0 +1,44 @@
+import os
+
+import uvicorn
+
+import main
+from events import consumer
+
+
+def test_server_options_build_a_bindable_uvicorn_config(monkeypatch):
+    assert isinstance(main.settings.APP_PORT, int)
+    monkeypatch.setattr(main.settings, "APP_PORT", 0)
+    monkeypatch.setattr(main.settings, "APP_WORKERS", 2)
+
+    config = uvicorn.Config(main.settings.APP_MODULE, **main.server_options())
+    sock = config.bind_socket()
+    try:
+        assert config.workers == 2
+        assert sock.getsockname()[1] > 0
+    finally:
+        sock.close()
+
+
+def test_available_cpus_is_capped_by_the_cgroup_quota(monkeypatch, tmp_path):
+    cpu_max = tmp_path / "cpu.max"
+    monkeypatch.setattr(main, "CGROUP_CPU_MAX", str(cpu_max))
+    cpus = len(os.sched_getaffinity(0))
+
+    cpu_max.write_text("max 100000\n")
+    assert main.available_cpus() == cpus
+
+    cpu_max.write_text("50000 100000\n")
+    assert main.available_cpus() == 1
+
+    cpu_max.unlink()
+    assert main.available_cpus() == cpus
+
+
+def test_workers_of_one_replica_get_their_own_reply_queue(monkeypatch):
+    monkeypatch.setattr(consumer.settings, "REPLICA_ID", "pod-1")
+    monkeypatch.setattr(consumer.settings, "APP_WORKERS", 1)
+    assert consumer.default_replica_id() == "pod-1"
+
+    monkeypatch.setattr(consumer.settings, "APP_WORKERS", 4)
+    assert consumer.default_replica_id() == f"pod-1-{os.getpid()}"
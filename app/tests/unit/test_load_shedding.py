@@ -0,0 +1,125 @@
+import asyncio
+import time
+from typing import Any, Dict, List
+
+import pytest
+
+from utils.load_shedding import (
+    READ,
+    WRITE,
+    LoadShedder,
+    LoadSheddingMiddleware,
+    LoopLagMonitor,
+)
+
+
+def shedder(**kwargs) -> LoadShedder:
+    options: Dict[str, Any] = {
+        "monitor": LoopLagMonitor(interval=0.01, smoothing=1.0),
+        "lag_thresholds": {READ: 0.2, WRITE: 0.1},
+        "in_flight_limits": {READ: 4, WRITE: 2},
+        "max_event_waiters": 10,
+        "retry_after": 3,
+    }
+    options.update(kwargs)
+    return LoadShedder(**options)
+
+
+async def call(middleware: LoadSheddingMiddleware, method: str, path: str) -> List:
+    sent: List[Dict[str, Any]] = []
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": b""}
+
+    async def send(message: Dict[str, Any]) -> None:
+        sent.append(message)
+
+    await middleware({"type": "http", "method": method, "path": path}, receive, send)
+    return sent
+
+
+async def ok_app(scope, receive, send) -> None:
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+@pytest.mark.asyncio
+async def test_monitor_measures_blocked_loop():
+    monitor = LoopLagMonitor(interval=0.01, smoothing=1.0)
+    monitor.start()
+    await asyncio.sleep(0.02)
+    # A slow callback holding the loop, as a blocking call in a handler would
+    asyncio.get_running_loop().call_soon(time.sleep, 0.1)
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+    assert monitor.max_lag >= 0.05
+
+
+def test_writes_are_shed_before_reads():
+    load = shedder()
+    load.monitor.record(0.15)
+    assert load.overload(WRITE) == "loop_lag"
+    assert load.overload(READ) is None
+    assert load.ready
+    assert load.stats()["state"] == "shedding_writes"
+
+    load.monitor.record(0.3)
+    assert load.overload(READ) == "loop_lag"
+    assert not load.ready
+
+
+def test_in_flight_and_event_waiter_thresholds():
+    waiters = 0
+    load = shedder(event_waiters=lambda: waiters)
+    load.in_flight = 2
+    assert load.overload(WRITE) == "in_flight"
+    assert load.overload(READ) is None
+
+    load.in_flight = 0
+    waiters = 10
+    assert load.overload(WRITE) == "event_waiters"
+    assert load.overload(READ) is None
+
+
+@pytest.mark.asyncio
+async def test_middleware_rejects_with_retry_after_and_spares_health():
+    load = shedder()
+    load.monitor.record(0.5)
+    middleware = LoadSheddingMiddleware(ok_app, load)
+
+    rejected = await call(middleware, "POST", "/v1/team/create")
+    assert rejected[0]["status"] == 503
+    assert (b"retry-after", b"3") in rejected[0]["headers"]
+    assert load.shed == {READ: 0, WRITE: 1}
+
+    health = await call(middleware, "GET", "/health/ready")
+    assert health[0]["status"] == 200
+
+
+@pytest.mark.asyncio
+async def test_request_is_in_flight_until_response_starts():
+    load = shedder()
+    seen: List[int] = []
+
+    async def app(scope, receive, send) -> None:
+        seen.append(load.in_flight)
+        await ok_app(scope, receive, send)
+        seen.append(load.in_flight)
+
+    await call(LoadSheddingMiddleware(app, load), "GET", "/v1/team/x/updates")
+    assert seen == [1, 0]
+    assert load.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_graphql_posts_are_shed_as_writes():
+    load = shedder()
+    load.monitor.record(0.15)
+    middleware = LoadSheddingMiddleware(ok_app, load)
+
+    posted = await call(middleware, "POST", "/api/v1/graphql")
+    assert posted[0]["status"] == 503
+    assert load.shed == {READ: 0, WRITE: 1}
+
+    fetched = await call(middleware, "GET", "/api/v1/graphql")
+    assert fetched[0]["status"] == 200
@@ -0,0 +1,106 @@
+import json
+import logging
+import queue
+
+from utils import logger as logger_module
+from utils.config import get_settings
+from utils.logger import (
+    DeferredQueueHandler,
+    JsonFormatter,
+    configure_logging,
+    logger_config,
+    payload_preview,
+    should_log_payload,
+)
+
+
+def test_payloads_are_not_logged_when_level_is_disabled():
+    log = logging.getLogger("test_logger.disabled")
+    log.setLevel(logging.INFO)
+    assert not should_log_payload(log)
+    log.setLevel(logging.DEBUG)
+    assert should_log_payload(log)
+
+
+def test_payload_sampling(monkeypatch):
+    log = logging.getLogger("test_logger.sampled")
+    log.setLevel(logging.DEBUG)
+    monkeypatch.setattr(logger_module, "LOG_PAYLOAD_SAMPLE_RATE", 0.0)
+    assert not any(should_log_payload(log) for _ in range(100))
+
+
+def test_payload_preview_truncates_long_bodies(monkeypatch):
+    monkeypatch.setattr(logger_module, "LOG_PAYLOAD_MAX_CHARS", 10)
+    assert payload_preview({"a": 1}) == '{"a": 1}'
+    assert payload_preview("x" * 25) == "xxxxxxxxxx... (25 chars)"
+
+
+def test_json_formatter_emits_one_object_per_record():
+    record = logging.LogRecord(
+        "gateway", logging.INFO, __file__, 1, "team %s", ("alpha",), None, "handler"
+    )
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "team alpha"
+    assert entry["level"] == "INFO"
+    assert entry["function"] == "handler"
+
+
+def test_queued_records_are_formatted_by_the_listener():
+    class Lazy:
+        formatted = 0
+
+        def __str__(self) -> str:
+            Lazy.formatted += 1
+            return "lazy"
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    log = logging.getLogger("test_logger.deferred")
+    log.propagate = False
+    log.addHandler(DeferredQueueHandler(log_queue))
+    log.setLevel(logging.INFO)
+
+    log.debug("skipped %s", Lazy())
+    log.info("queued %s %d", "team", 7)
+    assert Lazy.formatted == 0
+    record = log_queue.get_nowait()
+    assert record.args == ("team", 7)
+    assert record.getMessage() == "queued team 7"
+
+
+def test_mutable_arguments_are_snapshotted_before_enqueueing():
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    log = logging.getLogger("test_logger.snapshot")
+    log.propagate = False
+    log.addHandler(DeferredQueueHandler(log_queue))
+    log.setLevel(logging.INFO)
+
+    players = {"ana": 1}
+    log.info("players %s", players)
+    log.info("team %(team)s", {"team": ["alpha"]})
+    players["bob"] = 2
+
+    assert log_queue.get_nowait().getMessage() == "players {'ana': 1}"
+    assert log_queue.get_nowait().getMessage() == "team ['alpha']"
+
+
+def test_settings_are_applied_at_startup():
+    settings = get_settings()
+    log = logger_config("test_logger.configured")
+    try:
+        configure_logging(
+            settings.model_copy(
+                update={
+                    "LOG_LEVEL": "WARNING",
+                    "LOG_FORMAT": "json",
+                    "LOG_PAYLOAD_MAX_CHARS": 4,
+                    "LOG_PAYLOAD_SAMPLE_RATE": 0.0,
+                }
+            )
+        )
+        assert log.level == logging.WARNING
+        assert isinstance(logger_module.build_formatter(), JsonFormatter)
+        assert payload_preview("x" * 6) == "xxxx... (6 chars)"
+        assert logger_config("test_logger.later").level == logging.WARNING
+    finally:
+        configure_logging(settings)
+    assert log.level == logging.getLevelName(settings.LOG_LEVEL)
@@ -0,0 +1,46 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from prometheus_client import REGISTRY
+
+from routes.metrics_router import metrics_router
+from service.gateway_service import GatewayService
+from utils.metrics import MetricsMiddleware
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.asyncio
+async def test_route_latency_is_labelled_by_route_template():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
+
+    @app.get("/teams/{team_name}")
+    async def team(team_name: str):
+        return {"team_name": team_name}
+
+    labels = {"method": "GET", "route": "/teams/{team_name}", "status": "200"}
+    before = sample("gateway_request_duration_seconds_count", **labels)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.get("/teams/alpha")
+        await client.get("/teams/beta")
+        response = await client.get("/metrics")
+
+    assert sample("gateway_request_duration_seconds_count", **labels) == before + 2
+    assert "gateway_request_duration_seconds_bucket" in response.text
+
+
+@pytest.mark.asyncio
+async def test_event_wait_timeouts_are_counted_per_event_type():
+    before = sample("gateway_event_wait_timeouts_total", event_type="metrics_test")
+    with GatewayService.expect_event("metrics_test") as waiter:
+        assert await GatewayService.wait_for_event(waiter, timeout=0.01) is None
+    assert (
+        sample("gateway_event_wait_timeouts_total", event_type="metrics_test")
+        == before + 1
+    )
+    assert sample("gateway_event_wait_seconds_count", event_type="metrics_test") >= 1
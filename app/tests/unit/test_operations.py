@@ -0,0 +1,179 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from exceptions.gateway_exceptions import EventError
+from routes import gateway_router
+from service.gateway_service import GatewayService
+from service.operations import COMPLETED, PENDING, TIMED_OUT, OperationStore
+from service.rendezvous import EventRendezvous
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def store(clock: Clock, **kwargs) -> OperationStore:
+    options = {"max_pending": 10, "max_finished": 10, "timeout": 5, "retention": 60}
+    options.update(kwargs)
+    return OperationStore(clock=clock, **options)  # type: ignore[arg-type]
+
+
+@pytest.mark.asyncio
+async def test_operation_completes_when_its_event_is_consumed():
+    operations = store(Clock())
+    rendezvous = EventRendezvous(max_waiters=10)
+    with rendezvous.register("team_created") as waiter:
+        operation = operations.start(waiter)
+    assert operation.status == PENDING
+    assert not rendezvous.resolve("team_created", waiter.correlation_id, {})
+
+    assert operations.complete("team_created", waiter.correlation_id, {"team_id": 1})
+    found = operations.get(waiter.correlation_id)
+    assert found is operation
+    assert operation.status == COMPLETED
+    assert operation.result == {"team_id": 1}
+
+
+@pytest.mark.asyncio
+async def test_event_delivered_before_handover_completes_immediately():
+    operations = store(Clock())
+    rendezvous = EventRendezvous(max_waiters=10)
+    with rendezvous.register("team_created") as waiter:
+        rendezvous.resolve("team_created", waiter.correlation_id, {"team_id": 1})
+        operation = operations.start(waiter)
+    assert operation.status == COMPLETED
+    assert operations.stats()["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_long_poll_returns_when_the_event_arrives():
+    operations = store(Clock())
+    rendezvous = EventRendezvous(max_waiters=10)
+    with rendezvous.register("rating_updated") as waiter:
+        operation = operations.start(waiter, team_name="team")
+
+    async def consume() -> None:
+        await asyncio.sleep(0.01)
+        operations.complete("rating_updated", operation.operation_id, {"team_id": 1})
+
+    consumer = asyncio.create_task(consume())
+    await operations.wait(operation, timeout=1)
+    await consumer
+    assert operation.status == COMPLETED
+    assert operation.context == {"team_name": "team"}
+
+
+@pytest.mark.asyncio
+async def test_uncorrelated_events_complete_operations_unless_strict(caplog):
+    rendezvous = EventRendezvous(max_waiters=10)
+    strict, lenient = store(Clock(), match_uncorrelated=False), store(Clock())
+    with rendezvous.register("rating_updated") as waiter:
+        pending = strict.start(waiter)
+        adopted = lenient.start(waiter)
+
+    assert not strict.complete("rating_updated", None, {"team_id": 1})
+    assert pending.status == PENDING
+    assert lenient.complete("rating_updated", None, {"team_id": 1})
+    assert adopted.status == COMPLETED
+    assert "has no correlation ID" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_pending_operations_time_out_and_finished_ones_expire():
+    clock = Clock()
+    operations = store(clock, timeout=5, retention=60)
+    rendezvous = EventRendezvous(max_waiters=10)
+    with rendezvous.register("team_created") as waiter:
+        operation = operations.start(waiter)
+
+    clock.now = 6
+    assert operations.get(operation.operation_id) is operation
+    assert operation.status == TIMED_OUT
+    assert not operations.complete("team_created", waiter.correlation_id, {})
+
+    clock.now = 100
+    assert operations.get(operation.operation_id) is None
+
+
+@pytest.mark.asyncio
+async def test_retention_and_pending_limits_are_bounded():
+    operations = store(Clock(), max_pending=1, max_finished=2)
+    rendezvous = EventRendezvous(max_waiters=10)
+    ids = []
+    for _ in range(3):
+        with rendezvous.register("team_created") as waiter:
+            operations.start(waiter)
+        operations.complete("team_created", waiter.correlation_id, {})
+        ids.append(waiter.correlation_id)
+    assert operations.get(ids[0]) is None
+    assert operations.get(ids[2]) is not None
+
+    with rendezvous.register("team_created") as waiter:
+        operations.start(waiter)
+    with rendezvous.register("team_created") as waiter:
+        with pytest.raises(EventError):
+            operations.start(waiter)
+
+
+@pytest.mark.asyncio
+async def test_operations_accepted_by_another_worker_are_not_adopted():
+    owner, other = store(Clock()), store(Clock())
+    rendezvous = EventRendezvous(max_waiters=10)
+    with rendezvous.register("team_created") as waiter:
+        operation = owner.start(waiter, team_name="team")
+
+    # Every worker consumes the event; only the accepting one has the operation
+    for operations in (other, owner):
+        operations.complete("team_created", waiter.correlation_id, {"team_id": 1})
+    assert operation.status == COMPLETED
+    assert operation.context == {"team_name": "team"}
+    assert other.get(waiter.correlation_id) is None
+    assert other.stats()["finished"] == 0
+
+
+@pytest.mark.asyncio
+async def test_full_store_rejects_before_the_write_is_sent():
+    operations = store(Clock(), max_pending=1)
+    with operations.reserve():
+        with pytest.raises(EventError):
+            with operations.reserve():
+                pass
+    with operations.reserve():
+        pass
+
+
+@pytest.mark.asyncio
+async def test_long_poll_on_another_worker_is_not_held(monkeypatch):
+    owner, other = store(Clock()), store(Clock())
+    rendezvous = EventRendezvous(max_waiters=10)
+    with rendezvous.register("team_created") as waiter:
+        owner.start(waiter)
+    url = f"/operations/{waiter.correlation_id}?wait=5"
+
+    app = FastAPI()
+    app.include_router(gateway_router.app_router)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        monkeypatch.setattr(GatewayService, "operations", other)
+        started = time.perf_counter()
+        assert (await client.get(url)).status_code == 404
+        assert time.perf_counter() - started < 1
+
+        monkeypatch.setattr(GatewayService, "operations", owner)
+        poll = asyncio.create_task(client.get(url))
+        await asyncio.sleep(0.01)
+        for operations in (other, owner):
+            operations.complete("team_created", waiter.correlation_id, {"team_id": 1})
+        response = await poll
+
+    assert response.json()["status"] == COMPLETED
+    assert response.json()["result"] == {"team_id": 1}
+    assert other.get(waiter.correlation_id) is None
@@ -0,0 +1,104 @@
+import pytest
+from prometheus_client import REGISTRY
+
+from exceptions.gateway_exceptions import UpstreamResponseError
+from models.player_model import PlayerDataInput
+from service.gateway_service import GatewayService
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    responses = {}
+
+    async def execute(url, document, variables=None, headers=None):
+        return responses[document.operation_name]
+
+    monkeypatch.setattr(GatewayService, "execute", staticmethod(execute))
+    return responses
+
+
+@pytest.mark.asyncio
+async def test_upstream_players_are_validated_into_plain_dicts(upstream):
+    upstream["GetPlayers"] = {
+        "data": {
+            "get_players": {
+                "team_id": "7",
+                "team_name": "alpha",
+                "players_data": [{"player_id": 1, "player_name": "ana"}],
+            }
+        }
+    }
+    players = await GatewayService.get_players_name("alpha")
+    assert players == {
+        "team_id": 7,
+        "team_name": "alpha",
+        "players_data": [{"player_id": 1, "player_name": "ana"}],
+    }
+    assert type(players) is dict
+
+
+@pytest.mark.asyncio
+async def test_malformed_upstream_payload_is_a_bad_gateway(upstream):
+    upstream["GetPlayersRating"] = {
+        "data": {"get_players_rating": {"team_id": 7, "players_data": "oops"}}
+    }
+    with pytest.raises(UpstreamResponseError) as excinfo:
+        await GatewayService.get_players_rating(7)
+    assert excinfo.value.status_code == 502
+    assert excinfo.value.service == "rating"
+    assert "rating" in excinfo.value.message
+
+
+def degraded_ratings() -> float:
+    return (
+        REGISTRY.get_sample_value(
+            "gateway_degraded_responses_total", {"missing": "ratings"}
+        )
+        or 0.0
+    )
+
+
+@pytest.mark.asyncio
+async def test_failed_ratings_degrade_without_a_serial_retry(monkeypatch):
+    sent = []
+
+    async def execute(url, document, variables=None, headers=None):
+        sent.append(document.operation_name)
+        if document.operation_name == "GetPlayersRating":
+            return {
+                "data": {"get_players_rating": None},
+                "errors": [{"message": "down"}],
+            }
+        return {
+            "data": {
+                "get_players": {
+                    "team_id": 7,
+                    "team_name": "alpha",
+                    "players_data": [{"player_id": 1, "player_name": "ana"}],
+                }
+            }
+        }
+
+    monkeypatch.setattr(GatewayService, "execute", staticmethod(execute))
+    before = degraded_ratings()
+
+    view = await GatewayService.get_players_data(
+        PlayerDataInput(team_name="alpha", player_name=""), team_id=7
+    )
+    assert view["players_data"] == [
+        {"player_name": "ana", "player_average_rating": None}
+    ]
+    assert sorted(sent) == ["GetPlayers", "GetPlayersRating"]
+    assert degraded_ratings() == before + 1
+
+
+@pytest.mark.asyncio
+async def test_team_events_are_validated_once(monkeypatch):
+    result = await GatewayService.handle_message(
+        None,  # type: ignore[arg-type]
+        {
+            "event_type": "team_created",
+            "data": {"team_id": "3", "team_name": "beta", "extra": True},
+        },
+    )
+    assert result == {"team_id": 3, "team_name": "beta"}
@@ -0,0 +1,68 @@
+import threading
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routes import admin_router
+from utils.profiling import NO_SPAN, SpanRecorder, sample_stacks
+
+
+def test_disabled_recorder_returns_shared_no_op_span():
+    recorder = SpanRecorder()
+    with recorder.span("send_request", "GetPlayers") as span:
+        assert span is None
+    assert recorder.span("send_request") is NO_SPAN
+    assert recorder.stats() == {}
+
+
+def test_enabled_recorder_times_spans_by_name():
+    recorder = SpanRecorder()
+    recorder.enabled = True
+    for _ in range(3):
+        with recorder.span("wait_for_event", "team_created"):
+            time.sleep(0.001)
+    stats = recorder.stats()["wait_for_event:team_created"]
+    assert stats["count"] == 3
+    assert stats["p50_ms"] >= 1
+    assert stats["max_ms"] >= stats["p50_ms"]
+
+
+def test_sampler_collapses_stacks_of_the_observed_thread():
+    stop = threading.Event()
+
+    def busy_worker() -> None:
+        while not stop.is_set():
+            sum(range(1000))
+
+    thread = threading.Thread(target=busy_worker)
+    thread.start()
+    try:
+        stacks = sample_stacks(thread.ident, duration=0.05, interval=0.001)  # type: ignore[arg-type]
+    finally:
+        stop.set()
+        thread.join()
+    assert stacks
+    assert all("busy_worker (test_profiling.py)" in stack for stack in stacks)
+
+
+def test_admin_routes_need_the_admin_token(monkeypatch):
+    app = FastAPI()
+    app.include_router(admin_router.admin_router)
+    client = TestClient(app)
+
+    monkeypatch.setattr(admin_router.settings, "ADMIN_TOKEN", "")
+    assert client.post("/admin/spans?seconds=0.01").status_code == 404
+
+    monkeypatch.setattr(admin_router.settings, "ADMIN_TOKEN", "secret")
+    assert (
+        client.post(
+            "/admin/spans?seconds=0.01", headers={"X-Admin-Token": "x"}
+        ).status_code
+        == 403
+    )
+    response = client.post(
+        "/admin/profile?seconds=0.05", headers={"X-Admin-Token": "secret"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
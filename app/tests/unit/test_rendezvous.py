@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from exceptions.gateway_exceptions import EventError
+from service.rendezvous import EventRendezvous
+
+
+@pytest.mark.asyncio
+async def test_concurrent_waiters_get_their_own_event():
+    rendezvous = EventRendezvous(max_waiters=10)
+    first = rendezvous.register("team_created")
+    second = rendezvous.register("team_created")
+
+    waits = asyncio.gather(
+        rendezvous.wait(first, timeout=1), rendezvous.wait(second, timeout=1)
+    )
+    await asyncio.sleep(0)
+    assert rendezvous.resolve("team_created", second.correlation_id, {"team_id": 2})
+    assert rendezvous.resolve("team_created", first.correlation_id, {"team_id": 1})
+
+    assert await waits == [{"team_id": 1}, {"team_id": 2}]
+    assert len(rendezvous) == 0
+
+
+@pytest.mark.asyncio
+async def test_event_without_correlation_id_is_dropped_in_strict_mode():
+    rendezvous = EventRendezvous(max_waiters=10, match_uncorrelated=False)
+    waiter = rendezvous.register("rating_updated")
+
+    assert not rendezvous.resolve("rating_updated", None, {"team_id": 1})
+    assert not waiter.future.done()
+
+
+@pytest.mark.asyncio
+async def test_event_without_correlation_id_resolves_oldest_waiter(caplog):
+    rendezvous = EventRendezvous(max_waiters=10)
+    first = rendezvous.register("rating_updated")
+    second = rendezvous.register("rating_updated")
+
+    assert rendezvous.resolve("rating_updated", None, {"team_id": 1})
+    assert first.future.result() == {"team_id": 1}
+    assert not second.future.done()
+    assert caplog.text.count("has no correlation ID") == 1
+    assert rendezvous.resolve("rating_updated", None, {"team_id": 2})
+    assert second.future.result() == {"team_id": 2}
+    assert caplog.text.count("has no correlation ID") == 1
+
+
+@pytest.mark.asyncio
+async def test_unknown_event_is_not_resolved():
+    rendezvous = EventRendezvous(max_waiters=10)
+    waiter = rendezvous.register("team_created")
+    assert not rendezvous.resolve("rating_updated", waiter.correlation_id, {})
+    assert not rendezvous.resolve("team_created", "other", {})
+
+
+@pytest.mark.asyncio
+async def test_timeout_releases_waiter():
+    rendezvous = EventRendezvous(max_waiters=1)
+    waiter = rendezvous.register("team_created")
+    assert await rendezvous.wait(waiter, timeout=0.01) is None
+    assert len(rendezvous) == 0
+    rendezvous.register("team_created")
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_bounded():
+    rendezvous = EventRendezvous(max_waiters=1)
+    with rendezvous.register("team_created"):
+        with pytest.raises(EventError):
+            rendezvous.register("team_created")
+    assert len(rendezvous) == 0
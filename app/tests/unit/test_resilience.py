@@ -0,0 +1,167 @@
+import httpx
+import pytest
+
+from exceptions.gateway_exceptions import UpstreamUnavailableError
+from service.gateway_service import GatewayService
+from service.http_client import UpstreamClients, UpstreamConfig
+from service.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    AdaptiveLimiter,
+    CircuitBreaker,
+    UpstreamGuard,
+)
+from utils.deadline import deadline_scope
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def breaker(clock: Clock) -> CircuitBreaker:
+    return CircuitBreaker(
+        failure_rate=0.5,
+        window=4,
+        min_calls=4,
+        slow_call_duration=1.0,
+        open_duration=5.0,
+        half_open_calls=2,
+        clock=clock,
+    )
+
+
+def test_breaker_opens_on_failure_rate_and_recovers_after_trials():
+    clock = Clock()
+    circuit = breaker(clock)
+    for success in (True, False, True, False):
+        assert circuit.allow()
+        circuit.record(success, 0.1)
+    assert circuit.state == OPEN
+    assert not circuit.allow()
+
+    clock.now = 5.0
+    assert circuit.allow() and circuit.allow()
+    assert circuit.state == HALF_OPEN
+    assert not circuit.allow()
+    circuit.record(True, 0.1)
+    circuit.record(True, 0.1)
+    assert circuit.state == CLOSED
+
+
+def test_slow_calls_count_as_failures_and_failed_trial_reopens():
+    clock = Clock()
+    circuit = breaker(clock)
+    for _ in range(4):
+        circuit.record(True, 2.0)
+    assert circuit.state == OPEN
+
+    clock.now = 5.0
+    assert circuit.allow()
+    circuit.record(False, 0.1)
+    assert circuit.state == OPEN
+    assert circuit.opened == 2
+
+
+def test_limiter_backs_off_on_failure_and_grows_under_load():
+    limiter = AdaptiveLimiter(
+        initial_limit=4, min_limit=1, max_limit=8, backoff=0.5, latency_threshold=1.0
+    )
+    assert all(limiter.acquire() for _ in range(4))
+    assert not limiter.acquire()
+    limiter.release(False, 0.1)
+    assert limiter.stats()["limit"] == 2
+
+    limiter = AdaptiveLimiter(
+        initial_limit=2, min_limit=1, max_limit=8, backoff=0.5, latency_threshold=1.0
+    )
+    for _ in range(10):
+        limiter.acquire()
+        limiter.acquire()
+        limiter.release(True, 0.1)
+        limiter.release(True, 0.1)
+    assert limiter.stats()["limit"] > 2
+
+
+def test_guard_rejects_with_typed_error_while_circuit_is_open():
+    clock = Clock()
+    guard = UpstreamGuard(
+        "rating",
+        breaker(clock),
+        AdaptiveLimiter(
+            initial_limit=10,
+            min_limit=1,
+            max_limit=10,
+            backoff=0.9,
+            latency_threshold=1,
+        ),
+    )
+    for _ in range(4):
+        guard.release(guard.acquire(), False)
+    with pytest.raises(UpstreamUnavailableError) as error:
+        guard.acquire()
+    assert error.value.status_code == 503
+    assert guard.limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_timeouts_cut_short_by_the_caller_deadline_are_not_upstream_failures(
+    monkeypatch,
+):
+    url = "http://rating/graphql"
+    guard = UpstreamGuard(
+        "rating",
+        CircuitBreaker(
+            failure_rate=0.5,
+            window=4,
+            min_calls=1,
+            slow_call_duration=10,
+            open_duration=5,
+            half_open_calls=1,
+        ),
+        AdaptiveLimiter(
+            initial_limit=20,
+            min_limit=1,
+            max_limit=20,
+            backoff=0.5,
+            latency_threshold=10,
+        ),
+    )
+    clients = UpstreamClients(
+        {
+            "rating": UpstreamConfig(
+                name="rating",
+                url=url,
+                max_connections=2,
+                max_keepalive_connections=2,
+                keepalive_expiry=1,
+                http2=False,
+                timeout=1,
+            )
+        },
+        {"rating": guard},
+    )
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    await clients.clients["rating"].aclose()
+    clients.clients["rating"] = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler)
+    )
+    monkeypatch.setattr(GatewayService, "http_clients", clients)
+
+    with deadline_scope(0.5):
+        assert await GatewayService.post_request(url, {"query": "{ ok }"}) == {}
+    assert guard.limiter.in_flight == 0
+    assert guard.limiter.limit == 20
+    assert guard.breaker.state == CLOSED
+
+    assert await GatewayService.post_request(url, {"query": "{ ok }"}) == {}
+    assert guard.limiter.limit == 10
+    assert guard.breaker.state == OPEN
+    await clients.close()
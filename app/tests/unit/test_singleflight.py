@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from service.gateway_service import GatewayService
+from utils.deadline import deadline_scope, remaining_budget
+from utils.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight(max_tracked_keys=10)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"ok": True}
+
+    results = await asyncio.gather(*[flight.do("key", "key", call) for _ in range(5)])
+    assert calls == 1
+    assert results == [{"ok": True}] * 5
+    assert flight.stats()["keys"]["key"] == {"calls": 1, "shared": 4}
+    assert flight.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_caller():
+    flight = SingleFlight(max_tracked_keys=10)
+
+    async def call():
+        await asyncio.sleep(0.01)
+        raise ValueError("down")
+
+    results = await asyncio.gather(
+        *[flight.do("key", "key", call) for _ in range(3)], return_exceptions=True
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_send_request_never_coalesces_mutations(monkeypatch):
+    calls = []
+
+    async def post_request(url, payload, headers=None):
+        calls.append(payload["query"])
+        await asyncio.sleep(0.01)
+        return {"data": {}}
+
+    monkeypatch.setattr(GatewayService, "post_request", post_request)
+    query = {"query": 'query { get_players (team_name: "team") { team_id } }'}
+    mutation = {"query": "\n mutation { create_team { team_id } }"}
+    await asyncio.gather(
+        *[GatewayService.send_request("http://team", query) for _ in range(3)],
+        *[GatewayService.send_request("http://team", mutation) for _ in range(3)],
+    )
+    assert calls.count(query["query"]) == 1
+    assert calls.count(mutation["query"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_callers_with_a_later_deadline_do_not_join_a_shorter_flight():
+    flight = SingleFlight(max_tracked_keys=10, deadline_slack=0.05)
+    budgets = []
+
+    async def call():
+        budgets.append(remaining_budget(10.0))
+        await asyncio.sleep(0.01)
+        return {"ok": True}
+
+    async def caller(budget: float):
+        with deadline_scope(budget):
+            return await flight.do("key", "key", call)
+
+    results = await asyncio.gather(caller(0.5), caller(5.0), caller(1.0), caller(5.0))
+    assert results == [{"ok": True}] * 4
+    assert len(budgets) == 2
+    assert budgets[0] <= 0.5 and budgets[1] > 4.0
+    assert flight.stats()["keys"]["key"] == {"calls": 2, "shared": 2}
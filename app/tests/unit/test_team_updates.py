@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+
+from exceptions.gateway_exceptions import EventError
+from models.payloads import TeamDetailsPayload
+from service.gateway_service import GatewayService
+from service.team_updates import TeamUpdateHub, team_delta
+
+
+def view(**ratings: float) -> TeamDetailsPayload:
+    return {
+        "team_id": 1,
+        "team_name": "team",
+        "players_data": [
+            {"player_name": name, "player_average_rating": rating}
+            for name, rating in ratings.items()
+        ],
+    }
+
+
+def test_delta_holds_changed_and_removed_players():
+    delta = team_delta(view(alice=1.0, bob=2.0), view(alice=3.0, carol=1.0))
+    assert delta is not None
+    assert [player["player_name"] for player in delta["players_data"]] == [
+        "alice",
+        "carol",
+    ]
+    assert delta["removed_players"] == ["bob"]
+    assert team_delta(view(alice=1.0), view(alice=1.0)) is None
+
+
+@pytest.mark.asyncio
+async def test_publish_fans_out_to_team_subscribers_only():
+    hub = TeamUpdateHub(queue_size=4, max_subscribers=10)
+    first = hub.subscribe("team")
+    second = hub.subscribe("team")
+    other = hub.subscribe("other")
+    hub.remember(view(alice=1.0))
+
+    hub.publish(view(alice=2.0))
+
+    for subscription in (first, second):
+        update = await subscription.next(0.1)
+        assert update is not None
+        assert update["players_data"] == [
+            {"player_name": "alice", "player_average_rating": 2.0}
+        ]
+    assert await other.next(0.01) is None
+    assert hub.stats()["delivered"] == 2
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_dropped_without_blocking_others():
+    hub = TeamUpdateHub(queue_size=1, max_subscribers=10)
+    slow = hub.subscribe("team")
+    fast = hub.subscribe("team")
+
+    hub.publish(view(alice=1.0))
+    await fast.next(0.1)
+    hub.publish(view(alice=2.0))
+
+    assert slow.dropped
+    assert not fast.dropped
+    assert hub.stats()["dropped"] == 1
+    assert hub.stats()["subscribers"] == 1
+
+
+def test_subscriber_limit_and_unsubscribe():
+    hub = TeamUpdateHub(queue_size=1, max_subscribers=1)
+    with hub.subscribe("team"):
+        with pytest.raises(EventError, match="Too many update subscribers"):
+            hub.subscribe("team")
+    assert not hub.has_subscribers("team")
+    hub.subscribe("team")
+
+
+@pytest.mark.asyncio
+async def test_refreshes_during_a_refresh_are_merged():
+    hub = TeamUpdateHub(queue_size=1, max_subscribers=1)
+    calls = 0
+
+    async def refresh() -> None:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+
+    for _ in range(5):
+        hub.schedule_refresh("team", refresh)
+    while hub.stats()["refreshing"]:
+        await asyncio.sleep(0.01)
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_rating_event_refreshes_team_once_for_all_subscribers(monkeypatch):
+    hub = TeamUpdateHub(queue_size=4, max_subscribers=10)
+    monkeypatch.setattr(GatewayService, "team_updates", hub)
+    subscriptions = [hub.subscribe("team") for _ in range(3)]
+    hub.remember(view(alice=1.0))
+    loads = 0
+
+    async def get_players_data(player_data, team_id=None):
+        nonlocal loads
+        loads += 1
+        return view(alice=4.0)
+
+    monkeypatch.setattr(GatewayService, "get_players_data", get_players_data)
+    GatewayService.team_views.clear()
+
+    await GatewayService.handle_message(
+        None,
+        {"event_type": "rating_updated", "data": {"team_id": 1}},  # type: ignore[arg-type]
+    )
+    updates = [await subscription.next(0.5) for subscription in subscriptions]
+
+    assert loads == 1
+    assert all(
+        update is not None and update["players_data"][0]["player_average_rating"] == 4.0
+        for update in updates
+    )
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from models.payloads import TeamDetailsPayload
+from service.team_view_cache import TeamViewCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Loader:
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self) -> TeamDetailsPayload:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return {"team_id": 1, "team_name": "team", "players_data": []}
+
+
+def cache(clock: Clock, **kwargs) -> TeamViewCache:
+    options = {"max_entries": 10, "max_bytes": 10_000, "ttl": 1, "stale_ttl": 10}
+    options.update(kwargs)
+    return TeamViewCache(clock=clock, **options)  # type: ignore[arg-type]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load():
+    views = cache(Clock())
+    loader = Loader()
+    results = await asyncio.gather(*[views.get("team", loader) for _ in range(5)])
+    assert loader.calls == 1
+    assert all(result["team_id"] == 1 for result in results)
+    assert views.stats()["coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_while_refreshing():
+    clock = Clock()
+    views = cache(clock)
+    loader = Loader()
+    await views.get("team", loader)
+
+    clock.now = 2
+    await views.get("team", loader)
+    assert views.stats()["stale_hits"] == 1
+    await asyncio.sleep(0.02)
+    assert loader.calls == 2
+
+    await views.get("team", loader)
+    assert views.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidate_by_team_id():
+    views = cache(Clock())
+    loader = Loader()
+    await views.get("team", loader)
+    views.invalidate(team_id=1)
+    await views.get("team", loader)
+    assert loader.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_bounded_by_size():
+    views = cache(Clock(), max_bytes=10)
+    await views.get("team", Loader())
+    assert views.stats()["entries"] == 0
@@ -0,0 +1,189 @@
+import json
+from typing import Any, Dict, List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routes import admin_router
+from service.gateway_service import GatewayService
+from utils.profiling import NO_SPAN
+from utils.tracing import Tracer, TracingMiddleware, tracing
+
+pytest.importorskip("opentelemetry.sdk")
+
+PARENT_TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+TRACEPARENT = f"00-{PARENT_TRACE_ID}-00f067aa0ba902b7-01"
+
+
+@pytest.fixture
+def tracer():
+    tracer = Tracer()
+    tracer.configure(True, "api-gateway", sample_ratio=1.0, exporter="memory")
+    yield tracer
+    tracer.shutdown()
+
+
+def test_disabled_tracer_is_a_no_op():
+    tracer = Tracer()
+    headers: Dict[str, str] = {}
+    tracer.inject(headers)
+    assert tracer.span("send_request") is NO_SPAN
+    assert headers == {}
+    assert tracer.extract({"traceparent": TRACEPARENT}) is None
+    assert tracer.finished_spans(10) is None
+
+
+def test_injected_traceparent_continues_the_current_span(tracer):
+    headers: Dict[str, str] = {}
+    with tracer.span("send_request GetTeam", kind="client") as span:
+        tracer.inject(headers)
+    context = span.get_span_context()
+    assert headers["traceparent"] == (
+        f"00-{context.trace_id:032x}-{context.span_id:016x}-{context.trace_flags:02x}"
+    )
+
+
+def test_amqp_headers_are_extracted_as_parent(tracer):
+    with tracer.span(
+        "process rating_updated",
+        {"messaging.message.conversation_id": None},
+        kind="consumer",
+        context=tracer.extract({"traceparent": TRACEPARENT.encode()}),
+    ):
+        pass
+    (finished,) = tracer.memory.spans()
+    assert f"{finished.context.trace_id:032x}" == PARENT_TRACE_ID
+    assert finished.parent.span_id == 0x00F067AA0BA902B7
+    assert "messaging.message.conversation_id" not in finished.attributes
+
+
+def test_sampling_ratio_defers_to_the_parent_decision():
+    tracer = Tracer()
+    tracer.configure(True, "api-gateway", sample_ratio=0.0, exporter="memory")
+    with tracer.span("root"):
+        pass
+    with tracer.span("child", context=tracer.extract({"traceparent": TRACEPARENT})):
+        pass
+    assert [span.name for span in tracer.memory.spans()] == ["child"]
+    tracer.shutdown()
+
+
+def test_file_exporter_writes_otlp_json_lines(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer()
+    tracer.configure(
+        True, "api-gateway", sample_ratio=1.0, exporter="file", export_file=str(path)
+    )
+    with tracer.span(
+        "wait_for_event team_created",
+        context=tracer.extract({"traceparent": TRACEPARENT}),
+    ):
+        pass
+    tracer.shutdown()
+
+    (line,) = path.read_text().splitlines()
+    (resource_spans,) = json.loads(line)["resourceSpans"]
+    (span,) = resource_spans["scopeSpans"][0]["spans"]
+    assert span["name"] == "wait_for_event team_created"
+    assert span["traceId"] == PARENT_TRACE_ID
+    assert span["parentSpanId"] == "00f067aa0ba902b7"
+
+
+@pytest.mark.asyncio
+async def test_middleware_names_server_span_after_route():
+    tracer = Tracer()
+    tracer.configure(True, "api-gateway", sample_ratio=1.0, exporter="memory")
+
+    class Route:
+        path = "/v1/team/{team_name}"
+
+    async def app(scope, receive, send) -> None:
+        scope["route"] = Route()
+        await send({"type": "http.response.start", "status": 502, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    sent: List[Dict[str, Any]] = []
+
+    async def send(message: Dict[str, Any]) -> None:
+        sent.append(message)
+
+    middleware = TracingMiddleware(app, tracer)
+    for path in ("/v1/team/red", "/health/ready"):
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": path,
+            "headers": [(b"traceparent", TRACEPARENT.encode())],
+        }
+        await middleware(scope, None, send)
+
+    (span,) = tracer.memory.spans()
+    assert span.name == "GET /v1/team/{team_name}"
+    assert span.attributes["http.response.status_code"] == 502
+    assert not span.status.is_ok
+    assert f"{span.context.trace_id:032x}" == PARENT_TRACE_ID
+    tracer.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_event_stream_span_ends_when_the_response_starts(tracer):
+    async def app(scope, receive, send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"text/event-stream; charset=utf-8")],
+            }
+        )
+        # The span is exported while the stream is still open
+        assert len(tracer.memory.spans()) == 1
+        await send({"type": "http.response.body", "body": b"data: {}\n\n"})
+
+    async def send(message: Dict[str, Any]) -> None:
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": "/v1/team/red/updates"}
+    await TracingMiddleware(app, tracer)(scope, None, send)
+
+    (span,) = tracer.memory.spans()
+    assert span.attributes["http.response.status_code"] == 200
+
+
+def test_traces_route_is_served_without_profiling(tracer, monkeypatch):
+    monkeypatch.setattr(admin_router, "tracing", tracer)
+    monkeypatch.setattr(admin_router.settings, "ADMIN_TOKEN", "secret")
+    app = FastAPI()
+    app.include_router(admin_router.traces_router)
+    with tracer.span("send_request"):
+        pass
+
+    response = TestClient(app).get("/admin/traces", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert [span["name"] for span in response.json()] == ["send_request"]
+    assert TestClient(app).post("/admin/spans").status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_send_request_span_carries_the_operation(monkeypatch):
+    tracing.configure(True, "api-gateway", sample_ratio=1.0, exporter="memory")
+    seen: List[Dict[str, str]] = []
+
+    async def post_request(url, payload, headers=None):
+        outgoing: Dict[str, str] = dict(headers or {})
+        tracing.inject(outgoing)
+        seen.append(outgoing)
+        return {"data": {}}
+
+    monkeypatch.setattr(GatewayService, "post_request", post_request)
+    try:
+        await GatewayService.send_request(
+            "http://team-service/graphql",
+            {"query": "mutation CreateTeam { x }", "operationName": "CreateTeam"},
+        )
+        (span,) = tracing.memory.spans()
+    finally:
+        tracing.shutdown()
+    assert span.name == "send_request CreateTeam"
+    assert span.attributes["graphql.operation.type"] == "mutation"
+    assert seen[0]["traceparent"].split("-")[2] == f"{span.context.span_id:016x}"